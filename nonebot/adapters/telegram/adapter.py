@@ -1,15 +1,14 @@
 from dataclasses import dataclass
 import imp
 import json
+import time
 import asyncio
 import inspect
 import traceback
 import httpx
-import aiocache
 from typing import Any, Dict, List, Type, Union, Callable, Optional, cast
 from io import BytesIO
 
-from pygtrie import StringTrie
 from nonebot.typing import overrides
 from nonebot.log import logger
 from nonebot.exception import WebSocketClosed
@@ -47,7 +46,23 @@ from .event import (
 from .message import Message, MessageSegment
 from .exception import NetworkError, ApiNotAvailable, ActionFailed, TelegramAdapterConfigException, MessageNotAcceptable
 from .utils import log
+from .compat import model_dump, model_validate
 from .cache import TelegramCache, TelegramUserNameIdCache
+from .redis_manager import RedisManager
+from .entity import mention_usernames, strip_bot_mentions
+from .command import CommandIndex
+from .interceptor import ApiRequest, ApiResponse, InterceptorChain, load_interceptor
+from .ratelimit import RateLimiter
+from .mediagroup import MediaGroupAggregator
+from .preprocess import PhotoPreprocessor
+from .middleware import (
+    TAGS_KEY,
+    ROUTE_KEY,
+    MiddlewareChain,
+    ChatFilter,
+    StaleUpdateFilter,
+    bot_sender_filter
+)
 
 from fastapi import FastAPI
 from fastapi.requests import Request as FastAPIRequest
@@ -61,17 +76,40 @@ class Adapter(BaseAdapter):
 
     telegram_config: TelegramConfig
     bot_name: str
+    bot_id: Optional[int]
     use_long_polling: bool
+    redis: RedisManager
     cache: TelegramCache
     username_cache: TelegramUserNameIdCache
+    command_index: CommandIndex
+    middlewares: MiddlewareChain
+    media_groups: Optional[MediaGroupAggregator]
+    photo_preprocessor: Optional[PhotoPreprocessor]
+    interceptors: InterceptorChain
+    rate_limiter: Optional[RateLimiter]
 
     @overrides(BaseAdapter)
     def __init__(self, driver: Driver, **kwargs: Any):
         super().__init__(driver, **kwargs)
         self.telegram_config: TelegramConfig = TelegramConfig(
-            **self.config.dict())
+            **model_dump(self.config))
         self.tasks: List["asyncio.Task"] = []
+        self.bot_id = None
         self._check_config()
+        # setup api interceptors
+        self.interceptors = InterceptorChain(self._send_request)
+        if self.telegram_config.telegram_adapter_debug:
+            self.interceptors.add(load_interceptor("log"))
+        self.rate_limiter = None
+        if self.telegram_config.telegram_rate_limit:
+            self.rate_limiter = RateLimiter(
+                global_rate=self.telegram_config.telegram_rate_limit_global,
+                chat_rate=self.telegram_config.telegram_rate_limit_chat,
+                group_rate=self.telegram_config.telegram_rate_limit_group,
+                max_retries=self.telegram_config.telegram_rate_limit_max_retries)
+            self.interceptors.add(self.rate_limiter)
+        for spec in self.telegram_config.telegram_api_interceptors or ():
+            self.interceptors.add(load_interceptor(spec))
         #loop = asyncio.get_event_loop()
         #loop.run_until_complete(self._call_api(None, "deleteWebhook"))
         #self.bot_name = loop.run_until_complete(self._call_api(None, "getMe"))["username"]
@@ -98,12 +136,70 @@ class Adapter(BaseAdapter):
             else:
                 log("WARNING", f"fastapi is required to use telegram_mount_media future, media mount will be disabled")
         # setup cache
-        self.cache = TelegramCache()
-        self.username_cache = TelegramUserNameIdCache()
+        self.redis = RedisManager(
+            url=self.telegram_config.telegram_redis_url,
+            db=self.telegram_config.telegram_redis_db,
+            ssl=self.telegram_config.telegram_redis_ssl,
+            ssl_ca_certs=self.telegram_config.telegram_redis_ssl_ca_certs,
+            pool_size=self.telegram_config.telegram_redis_pool_size,
+            sentinels=self.telegram_config.telegram_redis_sentinels,
+            sentinel_master=self.telegram_config.telegram_redis_sentinel_master,
+            cluster=self.telegram_config.telegram_redis_cluster,
+            health_check_interval=self.telegram_config.telegram_redis_health_check_interval,
+            reconnect_interval=self.telegram_config.telegram_redis_reconnect_interval)
+        self.cache = TelegramCache(
+            self.redis,
+            chat_ttl=self.telegram_config.telegram_chat_cache_ttl,
+            file_link_size=self.telegram_config.telegram_file_link_cache_size,
+            file_link_negative_ttl=self.telegram_config.telegram_file_link_negative_ttl)
+        self.username_cache = TelegramUserNameIdCache(
+            self.redis,
+            self.telegram_config.telegram_username_cache_size,
+            self.telegram_config.telegram_username_cache_ttl,
+            self.telegram_config.telegram_username_negative_ttl,
+            self.telegram_config.telegram_username_flush_interval / 1000,
+            self.telegram_config.telegram_username_flush_batch)
+        self.command_index = CommandIndex(self.config.command_start, self.config.command_sep)
+        # setup update middlewares
+        self.middlewares = MiddlewareChain()
+        if self.telegram_config.telegram_ignore_bot_messages:
+            self.middlewares.add(bot_sender_filter)
+        if self.telegram_config.telegram_allow_chats or self.telegram_config.telegram_deny_chats:
+            self.middlewares.add(ChatFilter(self.telegram_config.telegram_allow_chats,
+                                            self.telegram_config.telegram_deny_chats), "chat_filter")
+        if self.telegram_config.telegram_stale_update_seconds:
+            self.middlewares.add(StaleUpdateFilter(self.telegram_config.telegram_stale_update_seconds),
+                                 "stale_update_filter")
+        # setup media group aggregation
+        self.media_groups = None
+        if self.telegram_config.telegram_media_group_window:
+            self.media_groups = MediaGroupAggregator(
+                self._handle_media_group,
+                self.telegram_config.telegram_media_group_window / 1000,
+                self.telegram_config.telegram_media_group_max_pending)
+        # setup outgoing photo preprocessing
+        self.photo_preprocessor = None
+        if self.telegram_config.telegram_photo_preprocess:
+            self.photo_preprocessor = PhotoPreprocessor(
+                max_side=self.telegram_config.telegram_photo_max_side,
+                quality=self.telegram_config.telegram_photo_quality,
+                max_size=self.telegram_config.telegram_photo_max_size,
+                workers=self.telegram_config.telegram_photo_preprocess_workers,
+                cache_bytes=self.telegram_config.telegram_photo_cache_size * 1024 * 1024)
         self.driver.on_startup(self._setup_adapter_async)
+        self.driver.on_shutdown(self._shutdown_adapter_async)
 
     async def _setup_adapter_async(self):
-        await self.username_cache.init(self.telegram_config.telegram_redis_db)
+        await self.redis.connect()
+        self.username_cache.start()
+
+    async def _shutdown_adapter_async(self):
+        if self.media_groups is not None:
+            await self.media_groups.close()
+        if self.photo_preprocessor is not None:
+            self.photo_preprocessor.close()
+        await self.username_cache.stop()
+        await self.redis.close()
 
     @classmethod
     @overrides(BaseAdapter)
@@ -123,18 +219,50 @@ class Adapter(BaseAdapter):
         api = api.split("_", maxsplit=1)[0] + "".join(
             s.capitalize() for s in api.split("_")[1:]
         )
-        if self.use_long_polling and api == "getUpdates":
-            api_timeout = self.telegram_config.telegram_long_polling_timeout
-        else:
-            api_timeout = self.config.api_timeout
-        log("DEBUG", f"Calling API <y>{api}</y>")
         # print(data)
-        headers = {"Content-Type": "application/json"}
         if not data:
             data = {}
             #raise ValueError("data not found")
         if data.get("data") != None and len(data) == 1:
             data = data.get("data")
+        if not self.interceptors:
+            return await self._post_json(api, data)
+        return (await self.interceptors(ApiRequest(api, data, bot=bot))).result
+
+    async def _call_multipart_form_data_api(self, api: str, file: dict, data: dict):
+        try:
+            if not self.interceptors:
+                return await self._post_multipart(api, file, data)
+            return (await self.interceptors(ApiRequest(api, data, files=file))).result
+        finally:
+            for file_obj in file.values():
+                if isinstance(file_obj, tuple):
+                    file_obj = file_obj[-1]
+                try:
+                    file_obj.close()
+                except:
+                    pass
+
+    async def _send_request(self, request: ApiRequest) -> ApiResponse:
+        """拦截器链的最内层，实际发送请求"""
+        start = time.perf_counter()
+        if request.files is None:
+            result = await self._post_json(request.api, request.data)
+        else:
+            result = await self._post_multipart(request.api, request.files, request.data)
+        return ApiResponse(request, result, time.perf_counter() - start)
+
+    @staticmethod
+    def _action_failed(result: dict) -> ActionFailed:
+        parameters = result.get("parameters") or {}
+        return ActionFailed(result.get("error_code"), result.get("description"), parameters.get("retry_after"))
+
+    async def _post_json(self, api: str, data: dict) -> Any:
+        if self.use_long_polling and api == "getUpdates":
+            api_timeout = self.telegram_config.telegram_long_polling_timeout
+        else:
+            api_timeout = self.config.api_timeout
+        headers = {"Content-Type": "application/json"}
         try:
             async with httpx.AsyncClient(headers=headers, proxies=self.telegram_config.telegram_bot_api_proxy) as client:
                 response = await client.post(f"{self.telegram_config.telegram_bot_api_server_addr}/bot{self.telegram_config.bot_token}/{api}",
@@ -145,8 +273,7 @@ class Adapter(BaseAdapter):
                 if isinstance(result, dict):
                     if result.get("ok") != True:
                         # print(result)
-                        raise ActionFailed(result.get(
-                            "error_code"), result.get("description"))
+                        raise self._action_failed(result)
                     # print(result["result"])
                     return result["result"]
             raise NetworkError(f"HTTP request received unexpected "
@@ -156,29 +283,37 @@ class Adapter(BaseAdapter):
         except httpx.HTTPError:
             raise NetworkError("HTTP request failed")
 
-    async def _call_multipart_form_data_api(self, api: str, file: dict, data: dict):
-        log("DEBUG", f"Calling API <y>{api}</y>")
+    async def _post_multipart(self, api: str, file: dict, data: dict) -> Any:
         # print(data)
-        for key in data:
-            if isinstance(data[key], int) or isinstance(data[key], float):
-                data[key] = str(data[key])
-            elif not isinstance(data[key], str):
+        form = {}
+        for key, value in data.items():
+            if isinstance(value, int) or isinstance(value, float):
+                form[key] = str(value)
+            elif isinstance(value, str):
+                form[key] = value
+            else:
                 try:
-                    data[key] = json.dumps(data[key])
+                    form[key] = json.dumps(value)
                 except:
-                    del data[key]
+                    pass
+        # 重试时需要从头读取文件
+        for file_obj in file.values():
+            if isinstance(file_obj, tuple):
+                file_obj = file_obj[-1]
+            if hasattr(file_obj, "seek"):
+                file_obj.seek(0)
         try:
             async with httpx.AsyncClient(proxies=self.telegram_config.telegram_bot_api_proxy) as client:
                 response = await client.post(f"{self.telegram_config.telegram_bot_api_server_addr}/bot{self.telegram_config.bot_token}/{api}",
                                              files=file,
-                                             data=data,
+                                             data=form,
                                              timeout=self.config.api_timeout)
             if 200 <= response.status_code < 500:
                 result = response.json()
                 # print(result)
                 if isinstance(result, dict):
                     if result.get("ok") != True:
-                        raise ActionFailed()
+                        raise self._action_failed(result)
                     # print(result["result"])
                     return result["result"]
             # print(result)
@@ -188,12 +323,6 @@ class Adapter(BaseAdapter):
             raise NetworkError("API root url invalid")
         except httpx.HTTPError:
             raise NetworkError("HTTP request failed")
-        finally:
-            for file_obj in file.values():
-                try:
-                    file_obj.close()
-                except:
-                    pass
 
     def _check_config(self):
         if not self.telegram_config.bot_token:
@@ -229,16 +358,23 @@ class Adapter(BaseAdapter):
                           methods=["GET"]
                           )
 
+    async def _fetch_me(self):
+        """getMe，缓存 bot 的 username 与 user id"""
+        me = await self._call_api(None, "getMe")
+        self.bot_name = me["username"]
+        self.bot_id = me["id"]
+
     async def _setup_webhook(self):
         await self._call_api(None, "deleteWebhook")
-        username = (await self._call_api(None, "getMe"))["username"]
-        self.bot_name = username
+        await self._fetch_me()
         await self._call_api(None, "setWebhook", url=f"{self.telegram_config.webhook_addr}/{self.telegram_config.bot_token}/")
 
     async def _handle_webhook(self, request: Request) -> Response:
         data = request.content
         json_data = json.loads(data)
         event = await self.json_to_event(json_data)
+        if event is None:
+            return Response(200)
         try:
             await handle_event(Bot(self, self.bot_name), event)
         except Exception as e:
@@ -248,53 +384,102 @@ class Adapter(BaseAdapter):
         return Response(200)
 
     def _pre_process_event(self, event: MessageEvent):
-        if isinstance(event, GroupMessageEvent):
-            if event.message.text:
-                if f"@{self.bot_name}" in event.message.text:
-                    event.message.text = event.message.text.replace(
-                        f"@{self.bot_name}", "").strip()
-                    event.to_me = True
-                    # remove at entities
-                    event.message.entities.pop(0)
-                    # print(f"event.message.text:{event.message.text}")
+        if not isinstance(event, GroupMessageEvent) or not event.message:
+            return
+        message = event.message
+        # 回复 bot 自己发出的消息
+        if message.reply_to_message and message.reply_to_message.from_ and \
+                self.bot_id is not None and message.reply_to_message.from_.id == self.bot_id:
+            event.to_me = True
+        # @bot / /cmd@bot，移除后重新计算其余实体的偏移
+        bot_name = getattr(self, "bot_name", None)
+        for text_field, entities_field in (("text", "entities"), ("caption", "caption_entities")):
+            text = getattr(message, text_field)
+            if not text:
+                continue
+            text, entities, to_me = strip_bot_mentions(text, getattr(message, entities_field), bot_name, self.bot_id)
+            if to_me:
+                setattr(message, text_field, text)
+                setattr(message, entities_field, entities)
+                event.to_me = True
+
+    @staticmethod
+    def _collect_mentions(message: dict) -> List[str]:
+        mentions = mention_usernames(message)
+        if "reply_to_message" in message:
+            mentions.extend(mention_usernames(message["reply_to_message"]))
+        return mentions
 
     async def json_to_event(self, json_data: Any) -> Optional[Event]:
+        # 缓存失效在中间件之前进行，被过滤的 Update（如 bot 发送的入群 / 退群消息）同样会使缓存失效
+        await self.cache.process_update(json_data)
+        json_data = await self.middlewares.run(json_data)
+        if json_data is None:
+            return
+        # 相册的各条 Update 先缓冲，合并后由 _handle_media_group 处理
+        if self.media_groups is not None and self.media_groups.add(json_data):
+            return
+        return await self._update_to_event(json_data)
+
+    async def _handle_media_group(self, json_data: dict) -> None:
+        event = await self._update_to_event(json_data)
+        if event is None:
+            return
+        try:
+            await handle_event(Bot(self, self.bot_name), event)
+        except Exception as e:
+            logger.opt(colors=True, exception=e).error(
+                f"<r><bg #f8bbd0>Failed to handle event. Raw: {json_data}</bg #f8bbd0></r>"
+            )
+
+    async def _update_to_event(self, json_data: dict) -> Optional[Event]:
+        tags = json_data.pop(TAGS_KEY, None)
+        event_type = json_data.pop(ROUTE_KEY, None)
         try:
             # print(json_data)
-            if "callback_query" in json_data:
-                if json_data["callback_query"]["from"]["is_bot"]:
-                    return
-                event = CallbackQueryEvent.parse_obj(json_data)
+            if event_type is not None:
+                event = model_validate(event_type, json_data)
+            elif "callback_query" in json_data:
+                self.username_cache.record_user(json_data["callback_query"]["from"])
+                event = model_validate(CallbackQueryEvent, json_data)
             elif "message" in json_data:
-                if json_data["message"]["from"]["is_bot"]:
-                    return
                 json_data["user_id"] = json_data["message"]["from"]["id"]
                 json_data["group_id"] = json_data["message"]["chat"]["id"]
-                if "username" in json_data["message"]["from"]:
-                    await self.username_cache.update_cache(json_data["message"]["from"]["username"], json_data["message"]["from"]["id"])
+                self.username_cache.record_user(json_data["message"]["from"])
+                if "reply_to_message" in json_data["message"] and "from" in json_data["message"]["reply_to_message"]:
+                    self.username_cache.record_user(json_data["message"]["reply_to_message"]["from"])
+                if self.telegram_config.telegram_command_only and \
+                        not self.command_index.accepts(json_data["message"], getattr(self, "bot_name", None)):
+                    return
+                if mentions := self._collect_mentions(json_data["message"]):
+                    await self.username_cache.resolve(mentions)
                 if json_data["message"]["chat"]["type"] == "private":
-                    event = PrivateMessageEvent.parse_obj(json_data)
+                    event = model_validate(PrivateMessageEvent, json_data)
                 elif "group" in json_data["message"]["chat"]["type"]:
                     if "new_chat_members" in json_data["message"]:
-                        event = NewChatMembersEvent.parse_obj(json_data)
+                        event = model_validate(NewChatMembersEvent, json_data)
                     elif "left_chat_member" in json_data["message"]:
-                        event = LeafChatMemberEvent.parse_obj(json_data)
+                        event = model_validate(LeafChatMemberEvent, json_data)
                     elif "new_chat_title" in json_data["message"]:
-                        event = NewChatTitleEvent.parse_obj(json_data)
+                        event = model_validate(NewChatTitleEvent, json_data)
                     elif "voice_chat_started" in json_data["message"]:
-                        event = VideoChatStartedEvent.parse_obj(json_data)
+                        event = model_validate(VideoChatStartedEvent, json_data)
                     elif "voice_chat_ended" in json_data["message"]:
-                        event = VideoChatEndedEvent.parse_obj(json_data)
+                        event = model_validate(VideoChatEndedEvent, json_data)
                     else:
-                        event = GroupMessageEvent.parse_obj(json_data)
+                        event = model_validate(GroupMessageEvent, json_data)
             else:
-                raise MessageNotAcceptable("")
+                raise MessageNotAcceptable(f"Unsupported update: {', '.join(json_data)}")
                 #event = MessageEvent.parse_obj(message)
             self._pre_process_event(event)
+            if tags:
+                event.tags.update(tags)
             return event
+        except MessageNotAcceptable:
+            raise
         except Exception as e:
             log("ERROR", "Event Parser Error", e)
-            raise MessageNotAcceptable("")
+            raise MessageNotAcceptable(str(e))
 
     async def _stop_polling(self) -> None:
         try:
@@ -317,8 +502,7 @@ class Adapter(BaseAdapter):
 
         async def polling():
             await self._call_api(None, "deleteWebhook")
-            username = (await self._call_api(None, "getMe"))["username"]
-            self.bot_name = username
+            await self._fetch_me()
             bot = Bot(self, self.bot_name)
             log("INFO", "Reset Update...")
             await self._call_api(None, "getUpdates", offset=-1, timeout=self.telegram_config.telegram_long_polling_timeout)
@@ -332,6 +516,8 @@ class Adapter(BaseAdapter):
                             offset = message["update_id"] + 1
                             #print(f"offset update to {offset}")
                         event = await self.json_to_event(message)
+                        if event is None:
+                            continue
                         try:
                             loop = asyncio.get_event_loop()
                             loop.create_task(
@@ -0,0 +1,124 @@
+"""
+相册（media group）发送
+
+``sendMediaGroup`` 每组 2~10 个媒体，photo / video 可以混合，document 与 audio 只能与同类型组成相册。
+本模块负责把消息段分组、构建 ``InputMedia``，以及为本地文件计算指纹以复用已上传文件的 ``file_id``。
+"""
+import os
+import base64
+import hashlib
+from io import BytesIO
+from math import ceil
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .message import MessageSegment
+from .compat import model_dump
+
+ALBUM_MEDIA_TYPES = ("photo", "video", "document", "audio")
+MAX_ALBUM_SIZE = 10
+
+# 各类 InputMedia 中除 type / media 外允许的字段，接收到的消息段中的 file_size 等字段不会被发送
+INPUT_MEDIA_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "photo": ("caption", "parse_mode", "caption_entities", "has_spoiler"),
+    "video": ("caption", "parse_mode", "caption_entities", "has_spoiler",
+              "width", "height", "duration", "supports_streaming"),
+    "document": ("caption", "parse_mode", "caption_entities", "disable_content_type_detection"),
+    "audio": ("caption", "parse_mode", "caption_entities", "duration", "performer", "title"),
+}
+
+
+def album_kind(type_: str) -> str:
+    """可以放在同一个相册中的媒体类型属于同一种类"""
+    return "visual" if type_ in ("photo", "video") else type_
+
+
+def chunk_album(segments: List[MessageSegment]) -> List[List[MessageSegment]]:
+    """
+    :说明:
+
+      按顺序把媒体消息段分为可以放入同一个相册的若干组：种类变化处断开，
+      超过 10 个时平均拆分（如 11 个拆为 6 + 5），避免拆出只有一个媒体的组。
+    """
+    runs: List[List[MessageSegment]] = []
+    for ms in segments:
+        if runs and album_kind(runs[-1][-1].type) == album_kind(ms.type):
+            runs[-1].append(ms)
+        else:
+            runs.append([ms])
+    chunks: List[List[MessageSegment]] = []
+    for run in runs:
+        count = ceil(len(run) / MAX_ALBUM_SIZE)
+        size, extra = divmod(len(run), count)
+        start = 0
+        for i in range(count):
+            end = start + size + (1 if i < extra else 0)
+            chunks.append(run[start:end])
+            start = end
+    return chunks
+
+
+def local_path(value: str) -> str:
+    """``file:///`` 链接对应的本地路径"""
+    file_path = value[len("file:///"):]
+    if not os.path.exists(file_path) and os.path.exists("/" + file_path):
+        return "/" + file_path
+    return file_path
+
+
+def media_fingerprint(value: Any) -> Optional[str]:
+    """
+    :说明:
+
+      需要上传的媒体（本地文件、bytes、BytesIO、base64）的指纹，用于查找已上传文件的 ``file_id``。
+      本地文件以路径、修改时间与大小为指纹，其余以内容的 sha1 为指纹。
+      ``file_id`` / URL 等无需上传的媒体返回 ``None``。
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return "sha1:" + hashlib.sha1(value).hexdigest()
+    if isinstance(value, BytesIO):
+        return "sha1:" + hashlib.sha1(value.getbuffer()).hexdigest()
+    if isinstance(value, str):
+        if value.startswith("file:///"):
+            file_path = local_path(value)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return None
+            return f"file:{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+        if value.startswith("base64://"):
+            return "sha1:" + hashlib.sha1(value.encode()).hexdigest()
+    return None
+
+
+def open_media(value: Any, file_name: Optional[str] = None) -> Tuple[str, Any]:
+    """需要上传的媒体对应的 ``(文件名, 文件对象)``"""
+    if isinstance(value, str) and value.startswith("file:///"):
+        file_path = local_path(value)
+        return file_name or os.path.basename(file_path), open(file_path, "rb")
+    if isinstance(value, str) and value.startswith("base64://"):
+        value = base64.b64decode(value[len("base64://"):])
+    if isinstance(value, (bytes, bytearray)):
+        value = BytesIO(value)
+    return file_name or "file", value
+
+
+def sent_file_id(message: Dict[str, Any], type_: str) -> Optional[str]:
+    """发送成功后返回的 Message 中媒体的 ``file_id``"""
+    media = message.get(type_)
+    if isinstance(media, list):
+        media = media[-1] if media else None
+    return media.get("file_id") if media else None
+
+
+def input_media(ms: MessageSegment, media: str) -> Dict[str, Any]:
+    """由消息段构建 ``InputMedia``"""
+    item: Dict[str, Any] = {"type": ms.type, "media": media}
+    for key in INPUT_MEDIA_FIELDS[ms.type]:
+        value = ms.data.get(key)
+        if value is not None:
+            if isinstance(value, list):
+                value = [model_dump(v, exclude_none=True) if isinstance(v, BaseModel) else v for v in value]
+            item[key] = value
+    return item
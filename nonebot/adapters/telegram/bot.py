@@ -2,14 +2,13 @@ import json
 import urllib.parse
 import asyncio
 import os
-import imghdr
 from os import path
 from io import BytesIO
 import base64
 
 from datetime import datetime
 import time
-from typing import Any, List, Union, Optional, Tuple, TYPE_CHECKING
+from typing import Any, Callable, Dict, Iterable, List, Union, Optional, Tuple, TYPE_CHECKING
 
 import httpx
 from nonebot.log import logger
@@ -38,12 +37,22 @@ from .event import (
 )
 
 from .models import *
+from .compat import model_dump, model_validate
+from .album import chunk_album, input_media, media_fingerprint, open_media, sent_file_id
+from .entity import MAX_CAPTION_LENGTH, utf16_len
+from .broadcast import Broadcaster, BroadcastJournal, BroadcastProgress
+from .stream import MessageStream
+from .render import PlannedRequest, RenderPlan, edit_request, message_type, render_message, split_caption
 
 if TYPE_CHECKING:
     from nonebot.config import Config
     from nonebot.drivers import Driver
 
 
+# getFile 的这些错误短时间内重试也不会成功，会被缓存
+NEGATIVE_CACHED_FILE_ERRORS = ("file is too big", "not found", "invalid file_id", "wrong file_id")
+
+
 class Bot(BaseBot):
     """
     telegram 协议 Bot 适配。继承属性参考 `BaseBot <./#class-basebot>`_ 。
@@ -55,7 +64,7 @@ class Bot(BaseBot):
     @classmethod
     def register(cls, driver: "Driver", config: "Config", **kwargs):
         super().register(driver, config)
-        cls.telegram_config = TelegramConfig(**config.dict())
+        cls.telegram_config = TelegramConfig(**model_dump(config))
         resp = httpx.post(
             url=f"{cls.telegram_config.telegram_bot_api_server_addr}/bot{cls.telegram_config.bot_token}/deleteWebhook")
         log("info", resp.json())
@@ -104,7 +113,7 @@ class Bot(BaseBot):
                    message: Union[str, "Message", "MessageSegment"],
                    at_sender: bool = False,
                    reply_message: bool = False,
-                   **kwargs) -> Any:
+                   **kwargs) -> Union[MessageBody, List[MessageBody]]:
         """
         :说明:
 
@@ -120,7 +129,7 @@ class Bot(BaseBot):
 
         :返回:
 
-          - ``Any``: API 调用返回数据
+          - ``Union[MessageBody, List[MessageBody]]``: 发送的消息；以相册发送或拆分为多条时为列表
 
         :异常:
 
@@ -131,11 +140,135 @@ class Bot(BaseBot):
         msg: Message = message if isinstance(
             message, Message) else Message(message)
         # process Message
-        await self._process_send_message(event, msg, at_sender, reply_message)
+        return await self._process_send_message(event, msg, at_sender, reply_message)
 
     async def call_multipart_form_data_api(self, api: str, file: dict, data: dict):
         return await self.adapter._call_multipart_form_data_api(api, file, data)
 
+    async def send_media_group(self,
+                               chat_id: Union[int, str],
+                               segments: Iterable[MessageSegment],
+                               reply_to_message_id: Optional[int] = None,
+                               **kwargs) -> List[dict]:
+        """
+        :说明:
+
+          以相册发送多个 photo / video / document / audio 消息段。
+
+          消息段按顺序分组（photo 与 video 可以混合，每组最多 10 个），每组通过一次 ``sendMediaGroup`` 发送，
+          组内需要上传的文件在同一个 multipart 请求中上传，上传过的文件直接使用缓存的 ``file_id``；
+          只有一个媒体的组使用对应的 ``send*`` API 发送。``reply_to_message_id`` 只作用于第一组。
+          超出长度上限的 caption 截为第一段，其余部分在相册之后以文本消息发送。
+          启用 ``telegram_photo_preprocess`` 时超出照片限制的图片先被缩小。
+
+        :参数:
+
+          * ``chat_id: Union[int, str]``: 目标 chat
+          * ``segments: Iterable[MessageSegment]``: 媒体消息段
+          * ``reply_to_message_id: Optional[int]``: 回复的消息
+          * ``**kwargs``: 其他 ``sendMediaGroup`` 参数
+
+        :返回:
+
+          - ``List[dict]``: 发送得到的全部 Message
+        """
+        preprocessor = self.adapter.photo_preprocessor
+        if preprocessor is not None:
+            segments = [await preprocessor.process(ms) for ms in segments]
+        return await self._send_album(chat_id, segments, reply_to_message_id, **kwargs)
+
+    async def _send_album(self,
+                          chat_id: Union[int, str],
+                          segments: Iterable[MessageSegment],
+                          reply_to_message_id: Optional[int] = None,
+                          **kwargs) -> List[dict]:
+        """分组发送已经预处理过的媒体消息段，超长的 caption 拆为随后的文本消息"""
+        album: List[MessageSegment] = []
+        overflow: List[Tuple[str, List[dict]]] = []
+        for ms in segments:
+            if "caption" in ms.data and "parse_mode" not in ms.data \
+                    and utf16_len(ms.data["caption"]) > MAX_CAPTION_LENGTH:
+                data = dict(ms.data)
+                overflow.extend(split_caption(data))
+                ms = MessageSegment(ms.type, data)
+            album.append(ms)
+        sent: List[dict] = []
+        for chunk in chunk_album(album):
+            sent.extend(await self._send_album_chunk(chat_id, chunk, reply_to_message_id, **kwargs))
+            reply_to_message_id = None
+        sent.extend(await self._send_text_chunks(chat_id, overflow))
+        return sent
+
+    async def _send_album_chunk(self,
+                                chat_id: Union[int, str],
+                                chunk: List[MessageSegment],
+                                reply_to_message_id: Optional[int],
+                                **kwargs) -> List[dict]:
+        uploaded_file_cache = self.adapter.cache.uploaded_file_cache
+        single = len(chunk) == 1
+        files: Dict[str, Any] = {}
+        uploads: List[Tuple[int, str, str]] = []
+        media: List[dict] = []
+        for i, ms in enumerate(chunk):
+            value = ms.data[ms.type]
+            fingerprint = media_fingerprint(value)
+            if fingerprint is None:
+                if not isinstance(value, str):
+                    raise MessageNotSupport()
+                media.append(input_media(ms, value))
+                continue
+            key = f"{ms.type}|{fingerprint}"
+            if file_id := await uploaded_file_cache.get(key):
+                media.append(input_media(ms, file_id))
+                continue
+            attach = ms.type if single else f"file{i}"
+            files[attach] = open_media(value, ms.data.get("file_name"))
+            uploads.append((i, ms.type, key))
+            media.append(input_media(ms, f"attach://{attach}"))
+        data: Dict[str, Any] = {"chat_id": chat_id, **kwargs}
+        if reply_to_message_id is not None:
+            data["reply_to_message_id"] = reply_to_message_id
+        if single:
+            ms, item = chunk[0], media[0]
+            api = f"send{ms.type.capitalize()}"
+            data.update((k, v) for k, v in item.items() if k not in ("type", "media"))
+            if not files:
+                data[ms.type] = item["media"]
+            messages = [await self.call_multipart_form_data_api(api, files, data) if files
+                        else await self.call_api(api, **data)]
+        else:
+            data["media"] = media
+            messages = await self.call_multipart_form_data_api("sendMediaGroup", files, data) if files \
+                else await self.call_api("sendMediaGroup", **data)
+        for i, type_, key in uploads:
+            if file_id := sent_file_id(messages[i], type_):
+                await uploaded_file_cache.set(key, file_id)
+        return messages
+
+    async def _send_text_chunks(self,
+                                chat_id: Union[int, str],
+                                chunks: List[Tuple[str, List[dict]]],
+                                **kwargs) -> List[dict]:
+        """
+        :说明:
+
+          按顺序逐条发送拆分后的文本。每条都等待上一条发送完成，保证在聊天中的顺序；
+          ``reply_to_message_id`` 只作用于第一条，``reply_markup`` 只作用于最后一条。
+        """
+        reply_to_message_id = kwargs.pop("reply_to_message_id", None)
+        reply_markup = kwargs.pop("reply_markup", None)
+        sent: List[dict] = []
+        for i, (text, entities) in enumerate(chunks):
+            data: Dict[str, Any] = {"chat_id": chat_id, "text": text, **kwargs}
+            if entities:
+                data["entities"] = entities
+            if i == 0 and reply_to_message_id is not None:
+                data["reply_to_message_id"] = reply_to_message_id
+            if i == len(chunks) - 1 and reply_markup is not None:
+                data["reply_markup"] = reply_markup
+            sent.append(await self.call_api("sendMessage", **data))
+        return sent
+
     # 获取到的下载链接有效期一小时，应当在获取后立即下载
     async def get_file_download_link(self, file: Union[str, PhotoSize, List[PhotoSize], Document]) -> str:
         if isinstance(file, PhotoSize) or isinstance(file, Document):
@@ -145,19 +278,41 @@ class Bot(BaseBot):
                 file_id = file[-1].file_id
         elif isinstance(file, str):
             file_id = file
-        if link := await self.adapter.cache.get_media_downloadlink(file_id):
-            return link
-        result = await self.call_api("getFile", file_id=file_id)
+        if error := await self.adapter.cache.download_link_error_cache.get(file_id):
+            raise ActionFailed(*error)
+        return await self.adapter.cache.download_link_cache.get_or_load(
+            file_id,
+            lambda: self._fetch_file_download_link(file_id),
+            refresh_ahead=self.adapter.telegram_config.telegram_file_link_refresh_ahead)
+
+    async def _fetch_file_download_link(self, file_id: str) -> str:
+        try:
+            result = await self.call_api("getFile", file_id=file_id)
+        except ActionFailed as e:
+            errmsg = (e.errmsg or "").lower()
+            if any(reason in errmsg for reason in NEGATIVE_CACHED_FILE_ERRORS):
+                await self.adapter.cache.download_link_error_cache.set(file_id, [e.errcode, e.errmsg])
+            raise
         if not result['file_path']:
             raise ActionFailed(403, "getFile not return correctly")
         if result['file_path'].startswith("/"):  # local bot api
-            await self.adapter.cache.set_media_downloadlink(
-                file_id, result['file_path'])
             return result['file_path']
-        else:
-            await self.adapter.cache.set_media_downloadlink(
-                file_id, f"{self.adapter.telegram_config.telegram_bot_api_server_addr}/file/bot{self.adapter.telegram_config.bot_token}/{result['file_path']}")
-            return f"{self.adapter.telegram_config.telegram_bot_api_server_addr}/file/bot{self.adapter.telegram_config.bot_token}/{result['file_path']}"
+        return f"{self.adapter.telegram_config.telegram_bot_api_server_addr}/file/bot{self.adapter.telegram_config.bot_token}/{result['file_path']}"
+
+    async def get_chat(self, chat_id: Union[int, str]) -> dict:
+        """getChat，优先使用缓存"""
+        return await self.adapter.cache.chat_cache.get_or_load(
+            str(chat_id), lambda: self.call_api("getChat", chat_id=chat_id))
+
+    async def get_chat_member(self, chat_id: Union[int, str], user_id: Union[int, str]) -> dict:
+        """getChatMember，优先使用缓存"""
+        return await self.adapter.cache.chat_member_cache.get_or_load(
+            f"{chat_id}|{user_id}", lambda: self.call_api("getChatMember", chat_id=chat_id, user_id=user_id))
+
+    async def get_chat_administrators(self, chat_id: Union[int, str]) -> List[dict]:
+        """getChatAdministrators，优先使用缓存"""
+        return await self.adapter.cache.chat_admins_cache.get_or_load(
+            str(chat_id), lambda: self.call_api("getChatAdministrators", chat_id=chat_id))
 
     async def answer_callback_query(self, event: CallbackQueryEvent) -> None:
         await self.call_api("answerCallbackQuery", callback_query_id=event.callback_query.id)
@@ -184,216 +339,225 @@ class Bot(BaseBot):
             except httpx.HTTPError:
                 raise NetworkError("HTTP request failed")
 
-    def _process_at(self, data: dict, at_user: User):
-        if "text" in data:
-            if at_user.username:
-                data["text"] = f"@{at_user.username} " + data["text"]
-            else:  # some people may not have username
-                data["text"] = f"{at_user.first_name} " + data["text"]  # 没测试
-                if not "entities" in data:
-                    data["entities"] = []
-                data["entities"].append({
-                    "type": "text_mention",
-                    "offset": 0,
-                    "length": len(at_user.first_name),
-                    "user": at_user.dict()
-                })
-        elif "caption" in data:
-            if at_user.username:
-                data["caption"] = f"@{at_user.username} " + data["caption"]
-            else:  # some people may not have username
-                data["caption"] = f"{at_user.first_name} " + \
-                    data["caption"]  # 没测试
-                if not "caption_entities" in data:
-                    data["caption_entities"] = []
-                data["caption_entities"].append({
-                    "type": "text_mention",
-                    "offset": 0,
-                    "length": len(at_user.first_name),
-                    "user": at_user.dict()
-                })
+    async def _resolve_at_users(self,
+                                message: Message,
+                                users: Optional[Dict[str, dict]] = None) -> Dict[str, dict]:
+        """从入站更新积累的用户缓存中批量查询消息中 ``at`` 的用户，不调用 Telegram API"""
+        users = dict(users or {})
+        ids = {str(ms.data["id"]) for ms in message if ms.type == "at"} - users.keys()
+        if ids:
+            found = await self.adapter.username_cache.resolve_users(ids)
+            users.update((user_id, user) for user_id, user in found.items() if user)
+        return users
+
+    async def _preprocess_photos(self, message: Message) -> Message:
+        """启用 ``telegram_photo_preprocess`` 时处理超出照片限制的图片"""
+        preprocessor = self.adapter.photo_preprocessor
+        if preprocessor is None or not any(ms.type == "photo" for ms in message):
+            return message
+        return Message([await preprocessor.process(ms) for ms in message])
+
+    async def render(self, message: Union[str, Message, MessageSegment]) -> RenderPlan:
+        """
+        :说明:
+
+          把消息渲染为发送计划。计划不包含目标 chat，可以缓存后通过 ``send_plan`` 发送到多个 chat，
+          其中上传过的文件会复用 ``file_id``。
+
+        :参数:
+
+          * ``message: Union[str, Message, MessageSegment]``: 要发送的消息
+        """
+        message = await self._preprocess_photos(message if isinstance(message, Message) else Message(message))
+        return render_message(message, await self._resolve_at_users(message))
+
+    async def send_plan(self,
+                        plan: RenderPlan,
+                        chat_id: Union[int, str],
+                        reply_to_message_id: Optional[int] = None) -> List[Any]:
+        """
+        :说明:
+
+          按顺序执行发送计划，``reply_to_message_id`` 只作用于第一条消息。
+
+        :返回:
+
+          - ``List[Any]``: 各次调用返回的 Message
+        """
+        if plan.album is not None:
+            # 图片在 render 时已经预处理过
+            sent = await self._send_album(chat_id, plan.album, reply_to_message_id)
+            plan.use_file_ids(sent)
+            return sent
+        results: List[Any] = []
+        for request in plan.requests:
+            params = {"chat_id": chat_id, **request.params}
+            if reply_to_message_id is not None and not results:
+                params["reply_to_message_id"] = reply_to_message_id
+            results.append(await self._send_planned(request, params))
+        return results
+
+    async def broadcast(self,
+                        message: Union[str, Message, MessageSegment],
+                        chat_ids: Iterable[Union[int, str]],
+                        journal: Optional[Union[str, BroadcastJournal]] = None,
+                        concurrency: int = 20,
+                        on_progress: Optional[Callable[[BroadcastProgress], Any]] = None,
+                        progress_interval: float = 5.0) -> BroadcastProgress:
+        """
+        :说明:
+
+          把同一条消息发送到多个 chat。消息只渲染一次，需要上传的文件只上传一次，之后复用 ``file_id``；
+          发送按 ``telegram_rate_limit_global`` 排队，启用限流时还受单个 chat 的限流约束。
+          每个 chat 的结果写入 ``journal``，使用同一个日志文件重新运行时跳过已发送与返回 403 的 chat。
+
+        :参数:
+
+          * ``message: Union[str, Message, MessageSegment]``: 要发送的消息
+          * ``chat_ids: Iterable[Union[int, str]]``: 目标 chat，重复的会被忽略
+          * ``journal: Optional[Union[str, BroadcastJournal]]``: 群发日志或其文件路径
+          * ``concurrency: int``: 并发数
+          * ``on_progress: Optional[Callable[[BroadcastProgress], Any]]``: 进度回调，可以是协程函数
+          * ``progress_interval: float``: 进度回调与日志的间隔（秒）
+
+        :返回:
+
+          - ``BroadcastProgress``: 发送、跳过、被屏蔽、失败的数量与吞吐
+        """
+        plan = await self.render(message)
+        own_journal = isinstance(journal, str)
+        if own_journal:
+            journal = BroadcastJournal(journal)
+        broadcaster = Broadcaster(
+            lambda chat_id: self.send_plan(plan, chat_id),
+            rate=self.adapter.telegram_config.telegram_rate_limit_global,
+            cost=len(plan.album) if plan.album is not None else len(plan.requests),
+            concurrency=concurrency,
+            journal=journal,
+            on_progress=on_progress,
+            progress_interval=progress_interval)
+        try:
+            return await broadcaster.run(chat_ids)
+        finally:
+            if own_journal:
+                journal.close()
+
+    def stream_message(self,
+                       event: MessageEvent,
+                       interval: Optional[float] = None,
+                       reply_message: bool = False) -> MessageStream:
+        """
+        :说明:
+
+          创建流式消息，追加的文本以不断编辑的消息显示，超出长度上限时转到新消息。用法参考 ``MessageStream``。
+
+        :参数:
+
+          * ``event: MessageEvent``: Event 对象
+          * ``interval: Optional[float]``: 同一条消息两次编辑的最小间隔（秒），默认为 ``telegram_stream_interval``
+          * ``reply_message: bool``: 第一条消息是否回复原消息
+        """
+        if interval is None:
+            interval = self.adapter.telegram_config.telegram_stream_interval
+        return MessageStream(self, event, interval, reply_message=reply_message)
+
+    async def _send_planned(self, request: PlannedRequest, params: Dict[str, Any]) -> Any:
+        if not request.files:
+            return await self.call_api(request.method, **params)
+        uploaded_file_cache = self.adapter.cache.uploaded_file_cache
+        files: Dict[str, Any] = {}
+        uploads: List[str] = []
+        for field, (file_name, source) in request.files.items():
+            if field == request.media and request.fingerprint:
+                key = f"{field}|{request.fingerprint}"
+                if file_id := await uploaded_file_cache.get(key):
+                    params[field] = file_id
+                    request.use_file_id(file_id)
+                    continue
+                uploads.append(key)
+            files[field] = open_media(source, file_name)
+        if not files:
+            return await self.call_api(request.method, **params)
+        result = await self.call_multipart_form_data_api(request.method, files, params)
+        for key in uploads:
+            if file_id := sent_file_id(result, request.media):
+                await uploaded_file_cache.set(key, file_id)
+                request.use_file_id(file_id)
+        return result
 
     async def _process_send_message(self, event: MessageEvent, message: Message, at_sender: bool = False, reply_message: bool = False):
-        ms_list: List[MessageSegment] = []
-        core_ms: MessageSegment = None
-        media_message_count: int = 0
-        media_message_list: List[MessageSegment] = []
-        inlineKeyboardMarkupArray = None
-        media_tpye = ["photo", "audio", "document",
-                      "video", "animation", "voice", "video_note"]
         if event.message:
             chat_id = event.message.chat.id
         elif event.callback_query:
             chat_id = event.callback_query.message.chat.id
-        for ms in message:
-            if ms.type == "photo":
-                media_message_count += 1
-                media_message_list.append(ms)
-            ms_list.append(ms)
-        if len(ms_list) > 1:
-            for ms in ms_list:
-                if ms.type in media_tpye:
-                    core_ms = ms
-                elif ms.type == "text":
-                    if core_ms != None:
-                        if core_ms.type in media_tpye:
-                            if not "caption" in core_ms.data:
-                                core_ms.data["caption"] = ms.data["text"]
-                            else:
-                                core_ms.data["caption"] += ms.data["text"]
-                    else:
-                        core_ms = ms
-                elif ms.type == "markup":
-                    inlineKeyboardMarkupArray = ms.data["inline_keyboard"]
-        else:
-            core_ms = ms_list[0]
-        data = {}
-        files = {}
-        if media_message_count > 1:  # fix need
-            # send as media group 咕咕咕
-            data["chat_id"] = str(chat_id)
-            data["media"] = []
-            if reply_message:
-                if event.message:
-                    data["reply_to_message_id"] = event.message.message_id
-                elif event.callback_query.message.reply_to_message:
-                    data["reply_to_message_id"] = event.callback_query.message.reply_to_message["message_id"]
-            files = {}
-            file_attach_num_name = 0
-            for ms in media_message_list:  # fix need
-                file_attach_num_name += 1
-                if ms.type != "photo":
-                    raise MessageNotSupport()
-                inputMediaPhoto: dict = {"type": "photo"}
-                if "caption" in ms.data:
-                    inputMediaPhoto["caption"] = ms.data["caption"]
-                if isinstance(ms.data["photo"], str):
-                    if ms.data["photo"].startswith("file:///"):
-                        file_path: str = core_ms.data[core_ms.type].replace(
-                            "file:///", "")
-                        file_name = path.basename(file_path)
-                        inputMediaPhoto["media"] = f"attach://{file_name}"
-                        try:
-                            files[file_name] = open(file_path, "rb")
-                        except:
-                            files[file_name] = open("/" + file_path, "rb")
-                    elif ms.data["photo"].startswith("base64://"):
-                        file_data: str = core_ms.data[core_ms.type].replace(
-                            "base64://", "")
-                        inputMediaPhoto["media"] = f"attach://{file_attach_num_name}"
-                        files[file_attach_num_name] = BytesIO(
-                            base64.b64decode(file_data))
-                    else:
-                        inputMediaPhoto["media"] = ms.data["photo"]
-                elif isinstance(core_ms.data[core_ms.type], bytes):
-                    inputMediaPhoto["media"] = f"attach://{file_attach_num_name}"
-                    files[file_attach_num_name] = BytesIO(
-                        core_ms.data[core_ms.type])
-                elif isinstance(core_ms.data[core_ms.type], BytesIO):
-                    inputMediaPhoto["media"] = f"attach://{file_attach_num_name}"
-                    files[file_attach_num_name] = core_ms.data[core_ms.type]
-                else:
-                    raise MessageNotSupport()
-                data["media"].append(inputMediaPhoto)
-            if len(files.keys()) > 0:
-                await self.call_multipart_form_data_api("sendMediaGroup", files, data)
-            else:
-                await self.call_api("sendMediaGroup", **data)
-            return
-        # print(core_ms)
-        data.update(core_ms.data)
-        if "thumb" in data:
-            if data["thumb"].startswith("file:///"):
-                file_path: str = data["thumb"].replace("file:///", "")
-                file_name = path.basename(file_path)
-                data["thumb"] = f"attach://{file_name}"
+        users: Dict[str, dict] = {}
+        if at_sender and isinstance(event, GroupMessageEvent):
+            sender = model_dump(event.message.from_, exclude_none=True)
+            users[str(sender["id"])] = sender
+            message = MessageSegment.at(sender["id"]) + message
+        reply_to_message_id = None
+        if reply_message:
+            if event.message:
+                reply_to_message_id = event.message.message_id
+            elif event.callback_query.message.reply_to_message:
+                reply_to_message_id = event.callback_query.message.reply_to_message.message_id
+        message = await self._preprocess_photos(message)
+        plan = render_message(message, await self._resolve_at_users(message, users))
+        results = await self.send_plan(plan, chat_id, reply_to_message_id)
+        return await self._record_sent(event, results, plan.album is not None)
+
+    async def _record_sent(self,
+                           event: Event,
+                           results: List[Any],
+                           album: bool = False) -> Union[MessageBody, List[MessageBody]]:
+        """解析发送结果，并记录为该会话中 bot 最后发送的消息"""
+        messages = [model_validate(MessageBody, result) for result in results if isinstance(result, dict)]
+        if messages:
+            try:
+                session = event.get_session_id()
+            except ValueError:
+                session = None
+            if session is not None:
+                last = results[-1]
+                await self.adapter.cache.set_session_last_message(session, {
+                    "chat_id": last["chat"]["id"], "message_id": last["message_id"], "type": message_type(last)})
+        return messages if album or len(messages) != 1 else messages[0]
+
+    async def edit_or_send(self,
+                           event: MessageEvent,
+                           message: Union[str, Message, MessageSegment],
+                           reply_message: bool = False) -> Union[MessageBody, List[MessageBody], None]:
+        """
+        :说明:
+
+          编辑 bot 在该会话中最后发送的消息，无法编辑（没有记录、超过可编辑时限、内容类型不兼容等）时发送新消息。
+          适合用于更新进度等状态，避免刷屏。文本可以替换文本或媒体的 caption，单个媒体可以替换媒体。
+
+        :参数:
+
+          * ``event: MessageEvent``: Event 对象
+          * ``message: Union[str, Message, MessageSegment]``: 新的消息内容
+          * ``reply_message: bool``: 发送新消息时是否回复原消息
+
+        :返回:
+
+          - ``Union[MessageBody, List[MessageBody], None]``: 编辑后或新发送的消息，内容未变化时为 ``None``
+        """
+        msg = message if isinstance(message, Message) else Message(message)
+        try:
+            last = await self.adapter.cache.get_session_last_message(event.get_session_id())
+        except ValueError:
+            last = None
+        if last:
+            edit = edit_request(await self.render(msg), last["type"])
+            if edit is not None:
+                params = {"chat_id": last["chat_id"], "message_id": last["message_id"], **edit.params}
                 try:
-                    files[file_name] = open(file_path, "rb")
-                except:
-                    files[file_name] = open("/" + file_path, "rb")
-
-        if core_ms.type == "text" or core_ms.type in media_tpye:
-            if reply_message:
-                if event.message:
-                    data["reply_to_message_id"] = event.message.message_id
-                elif event.callback_query.message.reply_to_message:
-                    data["reply_to_message_id"] = event.callback_query.message.reply_to_message["message_id"]
-            if inlineKeyboardMarkupArray:
-                data["reply_markup"] = {}
-                data["reply_markup"]["inline_keyboard"] = inlineKeyboardMarkupArray
-        if core_ms.type == "text":
-            data["chat_id"] = chat_id
-            if at_sender and isinstance(event, GroupMessageEvent):
-                self._process_at(data, event.message.from_)
-            # process at and text mixed message
-            data["text"] = ""
-            for ms in ms_list:
-                if ms.type == "text":
-                    data["text"] += ms.data["text"]
-                elif ms.type == "at":
-                    user_info = await self.call_api("getChatMember", chat_id=event.group_id, user_id=ms.data["id"])
-                    if "username" in user_info["user"]:
-                        data["text"] += f" @{user_info['user']['username']} "
-                    else:
-                        if not "entities" in data:
-                            data["entities"] = []
-                        data["entities"].append({
-                            "type": "text_mention",
-                            "offset": len(data["text"]),
-                            "length": len(user_info["user"]["first_name"]),
-                            "user": ms.data["id"]
-                        })
-                        data["text"] += user_info["user"]["first_name"]
-            await self.call_api("sendMessage", **data)
-            return
-        if core_ms.type in media_tpye:
-            data["chat_id"] = str(chat_id)
-            if "caption" in core_ms.data:
-                if at_sender and isinstance(event, GroupMessageEvent):
-                    self._process_at(data, event.message.from_)
-            if isinstance(core_ms.data[core_ms.type], bytes):
-                bio = BytesIO(core_ms.data[core_ms.type])
-                if "file_name" in core_ms.data:
-                    files[core_ms.type] = (core_ms.data["file_name"], bio)
-                else:
-                    files[core_ms.type] = bio
-                del data[core_ms.type]
-            elif isinstance(core_ms.data[core_ms.type], BytesIO):
-                bio = core_ms.data[core_ms.type]
-                if "file_name" in core_ms.data:
-                    files[core_ms.type] = (core_ms.data["file_name"], bio)
+                    result = await self._send_planned(edit, params)
+                except ActionFailed as e:
+                    if "not modified" in (e.errmsg or ""):
+                        return None
+                    log("DEBUG", f"Editing message {last['message_id']} failed, sending a new one: {e.errmsg}")
                 else:
-                    files[core_ms.type] = bio
-                del data[core_ms.type]
-            elif isinstance(core_ms.data[core_ms.type], str):
-                if core_ms.data[core_ms.type].startswith("file:///"):
-                    del data[core_ms.type]
-                    file_path: str = core_ms.data[core_ms.type].replace(
-                        "file:///", "")
-                    try:
-                        files[core_ms.type] = open(file_path, "rb")
-                    except:
-                        files[core_ms.type] = open("/" + file_path, "rb")
-                elif core_ms.data[core_ms.type].startswith("base64://"):
-                    del data[core_ms.type]
-                    file_data: str = core_ms.data[core_ms.type].replace(
-                        "base64://", "")
-                    bio = BytesIO(base64.b64decode(file_data))
-                    if "file_name" in core_ms.data:
-                        files[core_ms.type] = (core_ms.data["file_name"], bio)
-                    else:
-                        files[core_ms.type] = bio
-            else:
-                raise MessageNotSupport()
-            if len(files.keys()) > 0:
-                if core_ms.type == "photo": #Detect gif
-                    if isinstance(files[core_ms.type], bytes) or isinstance(files[core_ms.type], BytesIO):
-                        imgfmt = imghdr.what(files[core_ms.type])
-                        if imgfmt == "gif":
-                            files["animation"] = ("1.gif", files.pop(core_ms.type))
-                            await self.call_multipart_form_data_api(f"sendAnimation", files, data)
-                            return
-                await self.call_multipart_form_data_api(f"send{core_ms.type[0].upper()+core_ms.type[1:]}", files, data)
-            else:
-                await self.call_api(f"send{core_ms.type[0].upper()+core_ms.type[1:]}", **data)
-            return
+                    return await self._record_sent(event, [result])
+        return await self.send(event, msg, reply_message=reply_message)
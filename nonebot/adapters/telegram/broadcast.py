@@ -0,0 +1,216 @@
+"""
+群发
+
+``Broadcaster`` 把同一条消息发送到大量 chat：按全局速率排队、有限并发发送，每个 chat 的结果写入日志文件，
+中断后使用同一个日志文件重新运行会跳过已完成的 chat。返回 403（bot 被屏蔽或移出）的 chat 会被记录并跳过。
+"""
+import os
+import json
+import time
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from .exception import ActionFailed
+from .ratelimit import TokenBucket
+from .utils import log
+
+ChatId = Union[int, str]
+
+# 日志中的 chat 状态，前两种在恢复时被跳过
+STATUS_OK = "ok"
+STATUS_BLOCKED = "blocked"
+STATUS_FAILED = "failed"
+
+
+class BroadcastJournal:
+    """
+    :说明:
+
+      群发日志，每行一个 JSON 记录 ``{"chat_id", "status", ...}``，追加写入。
+      同一 chat 以最后一条记录为准，状态为 ``ok`` / ``blocked`` 的 chat 视为已完成。
+
+    :参数:
+
+      * ``path: str``: 日志文件路径，不存在时创建
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.status: Dict[str, str] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as fp:
+                for line in fp:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # 崩溃时可能留下写了一半的最后一行
+                        continue
+                    self.status[str(record["chat_id"])] = record["status"]
+        self._fp = open(path, "a", encoding="utf-8")
+
+    def done(self, chat_id: ChatId) -> bool:
+        return self.status.get(str(chat_id)) in (STATUS_OK, STATUS_BLOCKED)
+
+    def record(self, chat_id: ChatId, status: str, **extra: Any) -> None:
+        self.status[str(chat_id)] = status
+        self._fp.write(json.dumps({"chat_id": chat_id, "status": status, **extra}, ensure_ascii=False) + "\n")
+        self._fp.flush()
+
+    def close(self) -> None:
+        self._fp.close()
+
+
+class BroadcastProgress:
+    """群发进度与吞吐"""
+    __slots__ = ("total", "sent", "skipped", "blocked", "failed", "start_time", "end_time")
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.sent = 0
+        self.skipped = 0
+        self.blocked = 0
+        self.failed = 0
+        self.start_time = time.monotonic()
+        self.end_time: Optional[float] = None
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.skipped + self.blocked + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        return (self.end_time or time.monotonic()) - self.start_time
+
+    @property
+    def throughput(self) -> float:
+        """每秒成功发送的 chat 数"""
+        elapsed = self.elapsed
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "blocked": self.blocked,
+            "failed": self.failed,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+        }
+
+    def __repr__(self) -> str:
+        return (f"<BroadcastProgress {self.processed}/{self.total} sent={self.sent} blocked={self.blocked} "
+                f"failed={self.failed} {self.throughput:.1f}/s>")
+
+
+class Broadcaster:
+    """
+    :说明:
+
+      群发执行器。先逐个发送直到第一次成功（使需要上传的文件只上传一次，之后复用 ``file_id``），
+      再以 ``concurrency`` 个并发按全局速率发送其余 chat。
+      429 由适配器的限流按 ``retry_after`` 逐条重试；仍然返回 429 的 chat 记为失败并暂停全局速率，不会重新排队：
+      一个 chat 的计划可能包含多条请求，整体重发会让已经送达的消息重复。
+
+    :参数:
+
+      * ``send: Callable[[ChatId], Awaitable[Any]]``: 向单个 chat 发送
+      * ``rate: float``: 每秒发送的请求数上限
+      * ``cost: int``: 每个 chat 的请求数（如长文本拆分为多条）
+      * ``concurrency: int``: 并发数
+      * ``journal: Optional[BroadcastJournal]``: 群发日志
+      * ``on_progress: Optional[Callable[[BroadcastProgress], Any]]``: 进度回调，可以是协程函数
+      * ``progress_interval: float``: 进度回调与日志的间隔（秒）
+    """
+
+    def __init__(self,
+                 send: Callable[[ChatId], Awaitable[Any]],
+                 rate: float = 30,
+                 cost: int = 1,
+                 concurrency: int = 20,
+                 journal: Optional[BroadcastJournal] = None,
+                 on_progress: Optional[Callable[[BroadcastProgress], Any]] = None,
+                 progress_interval: float = 5.0) -> None:
+        self.send = send
+        self.bucket = TokenBucket(rate, rate)
+        self.cost = cost
+        self.concurrency = concurrency
+        self.journal = journal
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+
+    async def run(self, chat_ids: Iterable[ChatId]) -> BroadcastProgress:
+        pending: List[ChatId] = []
+        seen = set()
+        for chat_id in chat_ids:
+            key = str(chat_id)
+            if key not in seen:
+                seen.add(key)
+                pending.append(chat_id)
+        progress = BroadcastProgress(len(pending))
+        queue: "asyncio.Queue[ChatId]" = asyncio.Queue()
+        for chat_id in pending:
+            if self.journal is not None and self.journal.done(chat_id):
+                progress.skipped += 1
+            else:
+                queue.put_nowait(chat_id)
+        reporter = asyncio.create_task(self._report(progress))
+        try:
+            # 第一次成功之前逐个发送，之后的发送直接使用已上传文件的 file_id
+            while not queue.empty() and progress.sent == 0:
+                await self._send_one(queue.get_nowait(), progress)
+            workers = [asyncio.create_task(self._worker(queue, progress)) for _ in range(self.concurrency)]
+            await asyncio.gather(*workers)
+        finally:
+            reporter.cancel()
+            progress.end_time = time.monotonic()
+            await self._notify(progress)
+        return progress
+
+    async def _worker(self, queue: "asyncio.Queue[ChatId]", progress: BroadcastProgress) -> None:
+        while not queue.empty():
+            await self._send_one(queue.get_nowait(), progress)
+
+    async def _send_one(self, chat_id: ChatId, progress: BroadcastProgress) -> None:
+        delay = self.bucket.reserve(self.cost)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            await self.send(chat_id)
+        except ActionFailed as e:
+            if e.errcode == 429:
+                self.bucket.pause(e.retry_after or 1)
+            if e.errcode == 403:
+                progress.blocked += 1
+                self._record(chat_id, STATUS_BLOCKED, error=e.errmsg)
+            else:
+                progress.failed += 1
+                self._record(chat_id, STATUS_FAILED, error=e.errmsg)
+        except Exception as e:
+            progress.failed += 1
+            self._record(chat_id, STATUS_FAILED, error=repr(e))
+        else:
+            progress.sent += 1
+            self._record(chat_id, STATUS_OK)
+
+    def _record(self, chat_id: ChatId, status: str, **extra: Any) -> None:
+        if self.journal is not None:
+            self.journal.record(chat_id, status, **extra)
+
+    async def _report(self, progress: BroadcastProgress) -> None:
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            await self._notify(progress)
+
+    async def _notify(self, progress: BroadcastProgress) -> None:
+        log("INFO", f"Broadcast {progress.processed}/{progress.total}: sent {progress.sent}, "
+                    f"skipped {progress.skipped}, blocked {progress.blocked}, failed {progress.failed}, "
+                    f"{progress.throughput:.1f} chats/s")
+        if self.on_progress is not None:
+            try:
+                result = self.on_progress(progress)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                log("ERROR", "Broadcast progress callback failed", e)
@@ -1,33 +1,392 @@
+import sys
+import json
+import time
 import asyncio
-import aiocache
-import redis
-from redis import asyncio as aioredis
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple, Union
 from redis.asyncio import Redis
 from .utils import log
+from .exception import RedisUnavailable
+from .redis_manager import RedisManager
 
-from aiocache import Cache
+
+MISSING = object()
+
+
+class LRUCache:
+    """
+    进程内有界 LRU 缓存，条目可带 TTL，超出条目数 ``maxsize`` 或总大小 ``maxbytes`` 时淘汰最久未使用的条目。
+
+    值可以为 ``None``（用于缓存否定结果），未命中时 ``get`` 返回 ``default``（默认为 ``MISSING``）。
+    """
+
+    def __init__(self,
+                 maxsize: int = 1024,
+                 ttl: Optional[float] = None,
+                 maxbytes: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = sys.getsizeof) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.currbytes = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, Tuple[Optional[float], Any, int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expire_at, value, _ = item
+        if expire_at is not None and expire_at <= time.monotonic():
+            self.delete(key)
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def expire_at(self, key: Hashable) -> Optional[float]:
+        """条目的过期时间（``time.monotonic()`` 时间），不存在或永不过期时为 ``None``"""
+        item = self._data.get(key)
+        return item[0] if item else None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = MISSING) -> None:
+        if ttl is MISSING:
+            ttl = self.ttl
+        size = self.sizeof(value) if self.maxbytes is not None else 0
+        self.delete(key)
+        self._data[key] = (time.monotonic() + ttl if ttl is not None else None, value, size)
+        self.currbytes += size
+        while len(self._data) > self.maxsize or (self.maxbytes is not None and self.currbytes > self.maxbytes and len(self._data) > 1):
+            _, (_, _, evicted_size) = self._data.popitem(last=False)
+            self.currbytes -= evicted_size
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self.currbytes -= item[2]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.currbytes = 0
+
+
+class TieredCache:
+    """
+    :说明:
+
+      两级缓存：进程内 ``LRUCache``（L1）在前，可选的 redis（L2）在后。
+
+      * key 在 redis 中以 ``{namespace}|{key}`` 命名
+      * 值经 ``serializer`` / ``deserializer`` 写入 / 读出 redis，默认为 json
+      * 从 L2 读出的条目写入 L1 时使用其在 L2 中的剩余有效期，不会比 L2 中的条目更晚过期
+      * ``get_or_load`` 对同一 key 的并发加载只执行一次 loader（防止缓存击穿）
+      * ``metrics`` 记录各级命中、未命中与淘汰次数
+
+      redis 不可用时只使用 L1。
+
+    :参数:
+
+      * ``namespace: str``: 命名空间
+      * ``redis: Optional[RedisManager]``: L2，为 ``None`` 时仅使用进程内缓存
+      * ``maxsize: int``: L1 最大条目数
+      * ``maxbytes: Optional[int]``: L1 最大总大小（字节），为 ``None`` 时不限制
+      * ``ttl: Optional[float]``: 默认有效期（秒），为 ``None`` 时永不过期
+      * ``l2_ttl: Optional[float]``: L2 中的默认有效期（秒），不指定时与 ``ttl`` 相同
+    """
+
+    def __init__(self,
+                 namespace: str,
+                 redis: Optional[RedisManager] = None,
+                 maxsize: int = 1024,
+                 maxbytes: Optional[int] = None,
+                 ttl: Optional[float] = None,
+                 l2_ttl: Optional[float] = MISSING,
+                 serializer: Callable[[Any], Any] = json.dumps,
+                 deserializer: Callable[[Any], Any] = json.loads) -> None:
+        self.namespace = namespace
+        self.redis = redis
+        self.ttl = ttl
+        self.l2_ttl = ttl if l2_ttl is MISSING else l2_ttl
+        self.serializer = serializer
+        self.deserializer = deserializer
+        self.local = LRUCache(maxsize, ttl, maxbytes)
+        self.stats: Dict[str, int] = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "loads": 0, "refreshes": 0, "l2_errors": 0}
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        return {**self.stats, "evictions": self.local.evictions, "size": len(self.local), "bytes": self.local.currbytes}
+
+    @property
+    def l2_on(self) -> bool:
+        return self.redis is not None and self.redis.available
+
+    def redis_key(self, key: Hashable) -> str:
+        return f"{self.namespace}|{key}"
+
+    def _l2_ttl(self, ttl: Optional[float]) -> Optional[int]:
+        if ttl is MISSING:
+            ttl = self.l2_ttl
+        return max(int(ttl), 1) if ttl is not None else None
+
+    def _l1_ttl(self, remaining: Optional[float]) -> Optional[float]:
+        """从 L2 读出的条目在 L1 中的有效期：不超过其在 L2 中的剩余时间"""
+        if remaining is None:
+            return self.ttl
+        return remaining if self.ttl is None else min(self.ttl, remaining)
+
+    def _l2_failed(self, e: Exception) -> None:
+        self.stats["l2_errors"] += 1
+        if not isinstance(e, RedisUnavailable):
+            log("WARNING", f"Cache {self.namespace} redis operation failed: {e}")
+
+    def get_local(self, key: Hashable, default: Any = MISSING) -> Any:
+        """只查询 L1"""
+        return self.local.get(key, default)
+
+    def set_local(self, key: Hashable, value: Any, ttl: Optional[float] = MISSING) -> None:
+        """只写入 L1"""
+        self.local.set(key, value, ttl)
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self.local.get(key)
+        if value is not MISSING:
+            self.stats["l1_hits"] += 1
+            return value
+        if self.l2_on:
+            try:
+                (raw, remaining), = await self.redis.mget_ttl([self.redis_key(key)])
+            except Exception as e:
+                self._l2_failed(e)
+            else:
+                if raw is not None:
+                    self.stats["l2_hits"] += 1
+                    value = self.deserializer(raw)
+                    self.local.set(key, value, self._l1_ttl(remaining))
+                    return value
+        self.stats["misses"] += 1
+        return default
+
+    async def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """批量查询，L1 未命中的部分通过一次 pipeline 查询 L2（值与剩余有效期），两级都未命中的 key 不出现在结果中"""
+        result: Dict[Hashable, Any] = {}
+        misses: List[Hashable] = []
+        for key in keys:
+            value = self.local.get(key)
+            if value is MISSING:
+                misses.append(key)
+            else:
+                result[key] = value
+        self.stats["l1_hits"] += len(result)
+        l2_hits = 0
+        if misses and self.l2_on:
+            try:
+                values = await self.redis.mget_ttl([self.redis_key(key) for key in misses])
+            except Exception as e:
+                self._l2_failed(e)
+            else:
+                for key, (raw, remaining) in zip(misses, values):
+                    if raw is not None:
+                        value = self.deserializer(raw)
+                        self.local.set(key, value, self._l1_ttl(remaining))
+                        result[key] = value
+                        l2_hits += 1
+        self.stats["l2_hits"] += l2_hits
+        self.stats["misses"] += len(misses) - l2_hits
+        return result
+
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float] = MISSING) -> None:
+        self.local.set(key, value, ttl)
+        if self.l2_on:
+            try:
+                await self.redis.run(lambda client: client.set(self.redis_key(key), self.serializer(value), ex=self._l2_ttl(ttl)))
+            except Exception as e:
+                self._l2_failed(e)
+
+    async def set_many(self, mapping: Dict[Hashable, Any], ttl: Optional[float] = MISSING, local: bool = True) -> None:
+        """
+        :说明:
+
+          批量写入，L2 通过一次 pipeline 写入。
+
+        :异常:
+
+          - ``RedisUnavailable``: L2 不可用，调用方可以稍后重试（L1 已写入）
+        """
+        if local:
+            for key, value in mapping.items():
+                self.local.set(key, value, ttl)
+        if self.redis is None:
+            return
+        ex = self._l2_ttl(ttl)
+
+        async def write(client: Redis):
+            async with client.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    pipe.set(self.redis_key(key), self.serializer(value), ex=ex)
+                await pipe.execute()
+
+        await self.redis.run(write)
+
+    async def delete(self, key: Hashable) -> None:
+        self.local.delete(key)
+        if self.l2_on:
+            try:
+                await self.redis.run(lambda client: client.delete(self.redis_key(key)))
+            except Exception as e:
+                self._l2_failed(e)
+
+    async def get_or_load(self,
+                          key: Hashable,
+                          loader: Callable[[], Awaitable[Any]],
+                          ttl: Optional[float] = MISSING,
+                          refresh_ahead: Optional[float] = None) -> Any:
+        """
+        :说明:
+
+          查询缓存，未命中时调用 ``loader`` 加载并写入缓存。同一 key 同时只有一个 loader 在执行，
+          其余调用者等待其结果；loader 抛出的异常会传递给所有等待者且不会被缓存。
+
+          指定 ``refresh_ahead`` 时，命中的条目若将在 ``refresh_ahead`` 秒内过期，
+          会直接返回当前值并在后台重新加载。从 L2 读出的条目按其在 L2 中的剩余有效期判断，
+          因此其他进程写入、即将过期的条目同样会被提前刷新。
+        """
+        value = await self.get(key, MISSING)
+        if value is not MISSING:
+            if refresh_ahead is not None and key not in self._loading:
+                # L1 的过期时间不晚于 L2（见 _l1_ttl），即条目的真实剩余有效期
+                expire_at = self.local.expire_at(key)
+                if expire_at is not None and expire_at - time.monotonic() < refresh_ahead:
+                    self._refresh(key, loader, ttl)
+            return value
+        if key in self._loading:
+            return await asyncio.shield(self._loading[key])
+        return await self._load(key, loader, ttl)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            self.stats["loads"] += 1
+            value = await loader()
+            await self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            del self._loading[key]
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> None:
+        async def refresh():
+            try:
+                await self._load(key, loader, ttl)
+            except Exception as e:
+                log("DEBUG", f"Cache {self.namespace} background refresh of {key} failed: {e}")
+
+        self.stats["refreshes"] += 1
+        task = asyncio.create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def clear(self) -> None:
+        """清空 L1 与本命名空间下的 L2"""
+        self.local.clear()
+        if self.l2_on:
+            async def scan_delete(client: Redis):
+                keys = [key async for key in client.scan_iter(match=f"{self.namespace}|*")]
+                if keys:
+                    await client.delete(*keys)
+            try:
+                await self.redis.run(scan_delete)
+            except Exception as e:
+                self._l2_failed(e)
 
 
 class TelegramCache:
+    """适配器内部使用的通用缓存"""
 
-    def __init__(self) -> None:
-        self.session_message_cache = aiocache.Cache(Cache.MEMORY)
-        self.download_link_cache = aiocache.Cache(Cache.MEMORY)
+    def __init__(self,
+                 redis: Optional[RedisManager] = None,
+                 chat_ttl: Optional[float] = 300,
+                 file_link_size: int = 10000,
+                 file_link_negative_ttl: Optional[float] = 60) -> None:
+        # 每个会话中 bot 最后发送的消息 {"chat_id", "message_id", "type"}，供编辑 / 删除
+        self.session_message_cache = TieredCache("session_msg", redis, maxsize=10000, ttl=600)
+        # getFile 返回的下载链接有效期为一小时
+        self.download_link_cache = TieredCache("file_link", redis, maxsize=file_link_size, ttl=3540)
+        # getFile 失败（文件过大、file_id 无效等）的结果，值为 [errcode, errmsg]
+        self.download_link_error_cache = TieredCache("file_link_err", redis, maxsize=file_link_size, ttl=file_link_negative_ttl)
+        self.chat_cache = TieredCache("chat", redis, maxsize=2000, ttl=chat_ttl)
+        self.chat_member_cache = TieredCache("chat_member", redis, maxsize=20000, ttl=chat_ttl)
+        self.chat_admins_cache = TieredCache("chat_admins", redis, maxsize=2000, ttl=chat_ttl)
+        # 已上传的本地文件 / 内容指纹 -> file_id，file_id 长期有效
+        self.uploaded_file_cache = TieredCache("uploaded_file", redis, maxsize=10000, ttl=None, l2_ttl=None)
 
-    async def get_session_last_message_id(self, session: str):
+    async def get_session_last_message(self, session: str) -> Optional[dict]:
         return await self.session_message_cache.get(session)
 
-    async def get_session_last_message_id(self, session: str, message_id: str):
-        return await self.session_message_cache.set(session, message_id, ttl=600)
+    async def set_session_last_message(self, session: str, message: dict):
+        return await self.session_message_cache.set(session, message)
+
+    async def get_session_last_message_id(self, session: str) -> Optional[int]:
+        message = await self.session_message_cache.get(session)
+        return message["message_id"] if message else None
 
     async def get_media_downloadlink(self, file_id: str):
         return await self.download_link_cache.get(file_id)
 
     async def set_media_downloadlink(self, file_id: str, download_link: str):
-        return await self.download_link_cache.set(file_id, download_link, ttl=3540)
+        return await self.download_link_cache.set(file_id, download_link)
+
+    async def invalidate_chat(self, chat_id: Union[int, str]):
+        await self.chat_cache.delete(str(chat_id))
+        await self.chat_admins_cache.delete(str(chat_id))
+
+    async def invalidate_chat_member(self, chat_id: Union[int, str], user_id: Union[int, str], member: Optional[dict] = None):
+        """成员状态变化时调用，提供了新的 ``ChatMember`` 时直接写入缓存，管理员列表总是失效"""
+        if member is None:
+            await self.chat_member_cache.delete(f"{chat_id}|{user_id}")
+        else:
+            await self.chat_member_cache.set(f"{chat_id}|{user_id}", member)
+        await self.chat_admins_cache.delete(str(chat_id))
+
+    async def process_update(self, update: dict):
+        """根据收到的 update 精确失效 chat / chat member 缓存"""
+        for key in ("chat_member", "my_chat_member"):
+            if member_updated := update.get(key):
+                await self.invalidate_chat_member(
+                    member_updated["chat"]["id"],
+                    member_updated["new_chat_member"]["user"]["id"],
+                    member_updated["new_chat_member"])
+        if message := update.get("message"):
+            chat_id = message["chat"]["id"]
+            for user in message.get("new_chat_members") or ():
+                await self.invalidate_chat_member(chat_id, user["id"])
+            if left_chat_member := message.get("left_chat_member"):
+                await self.invalidate_chat_member(chat_id, left_chat_member["id"])
+            if any(key in message for key in ("new_chat_title", "new_chat_photo", "delete_chat_photo", "migrate_to_chat_id")):
+                await self.invalidate_chat(chat_id)
 
 
 class TelegramUserNameIdCache:
+    """
+    username -> user_id 缓存，以及发送时解析 ``at`` 所用的 user_id -> User（id / first_name / username）缓存
+
+    基于 ``TieredCache``（命名空间 ``uname`` / ``uid``）。事件解析时只读取进程内缓存，
+    redis 查询由 ``resolve`` 在构建事件前异步批量完成（包括缓存否定结果），不会阻塞事件循环。
+
+    写入为 write-behind：``record`` 只更新进程内缓存并记录脏条目，映射未变化时直接跳过，
+    脏条目由后台任务每 ``flush_interval`` 秒或累计 ``flush_batch`` 条时通过 pipeline 批量写入 redis。
+    redis 不可用时退回纯内存行为，脏条目保留到重新连接后写回。
+    """
 
     instance: "TelegramUserNameIdCache"
 
@@ -35,38 +394,143 @@ class TelegramUserNameIdCache:
     def get_inst() -> "TelegramUserNameIdCache":
         return TelegramUserNameIdCache.instance
 
-    def __init__(self) -> None:
-        self.redis: Redis = None
-        self.redis_sync = None
-        self.redis_on = False
-        pass
+    def __init__(self,
+                 redis: Optional[RedisManager] = None,
+                 maxsize: int = 10000,
+                 ttl: Optional[float] = 3600,
+                 negative_ttl: Optional[float] = 60,
+                 flush_interval: float = 1.0,
+                 flush_batch: int = 100) -> None:
+        self.redis = redis
+        self.cache = TieredCache("uname", redis, maxsize=maxsize, ttl=ttl, l2_ttl=None)
+        self.users = TieredCache("uid", redis, maxsize=maxsize, ttl=ttl, l2_ttl=None)
+        self.negative_ttl = negative_ttl
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.writes_saved = 0
+        self.writes_flushed = 0
+        self._dirty: Dict[str, int] = {}
+        self._dirty_users: Dict[str, dict] = {}
+        self._flush_wakeup: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        if redis is not None:
+            redis.on_available(self.flush)
+        TelegramUserNameIdCache.instance = self
 
-    async def init(self, redis_db: int) -> bool:
-        try:
-            self.redis_sync = redis.from_url("redis://localhost",  db=redis_db)
-            self.redis = await aioredis.from_url("redis://localhost",  db=redis_db)
-            self.redis_sync.get("uname")
-            self.redis_on = True
-            TelegramUserNameIdCache.instance = self
-            log("INFO", f"Redis init success!")
-            return True
-        except:
-            log("WARNING", f"Redis init failed, some function may not work like username to user_id")
-            return False
+    @property
+    def redis_on(self) -> bool:
+        return self.cache.l2_on
 
     async def flush_cache(self):
-        if self.redis_on:
-            await self.redis.flushdb()
+        self._dirty.clear()
+        self._dirty_users.clear()
+        await self.cache.clear()
+        await self.users.clear()
+
+    def record(self, username: str, user_id: int) -> None:
+        """记录 username -> user_id，不等待 redis"""
+        if self.cache.get_local(username) == user_id:
+            self.writes_saved += 1
+            return
+        self.cache.set_local(username, user_id)
+        if self.redis is not None and len(self._dirty) < self.cache.local.maxsize:
+            self._dirty[username] = user_id
+            if len(self._dirty) >= self.flush_batch and self._flush_wakeup:
+                self._flush_wakeup.set()
+
+    def record_user(self, user: dict) -> None:
+        """记录收到的 User（同时记录其 username），不等待 redis"""
+        if user.get("username"):
+            self.record(user["username"], user["id"])
+        key = str(user["id"])
+        compact = {k: user[k] for k in ("id", "first_name", "username") if k in user}
+        if self.users.get_local(key) == compact:
+            self.writes_saved += 1
+            return
+        self.users.set_local(key, compact)
+        if self.redis is not None and len(self._dirty_users) < self.users.local.maxsize:
+            self._dirty_users[key] = compact
+            if len(self._dirty_users) >= self.flush_batch and self._flush_wakeup:
+                self._flush_wakeup.set()
 
     async def update_cache(self, username: str, user_id: int):
-        if self.redis_on:
-            await self.redis.set(f"uname|{username}", user_id)
-
-    def get_user_id(self, username: str) -> int:
-        if self.redis_on:
-            user_id = self.redis_sync.get(f"uname|{username}")
-            if not user_id:
-                return None
-            return user_id if isinstance(user_id, int) else int(user_id)
-        else:
-            return None
+        self.record(username, user_id)
+
+    def start(self) -> None:
+        if self._flush_task is None:
+            self._flush_wakeup = asyncio.Event()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """将脏条目通过 pipeline 批量写入 redis，失败的条目会保留到下一次写入"""
+        if not (self._dirty or self._dirty_users) or not self.redis_on:
+            return
+        dirty, self._dirty = self._dirty, {}
+        dirty_users, self._dirty_users = self._dirty_users, {}
+        try:
+            if dirty:
+                await self.cache.set_many(dirty, local=False)
+            if dirty_users:
+                await self.users.set_many(dirty_users, local=False)
+            self.writes_flushed += len(dirty) + len(dirty_users)
+        except Exception as e:
+            if not isinstance(e, RedisUnavailable):
+                log("WARNING", f"Failed to flush username cache to redis: {e}")
+            dirty.update(self._dirty)
+            self._dirty = dirty
+            dirty_users.update(self._dirty_users)
+            self._dirty_users = dirty_users
+
+    def get_user_id(self, username: str) -> Optional[int]:
+        """仅查询进程内缓存，未命中或已知不存在时返回 ``None``"""
+        return self.cache.get_local(username, None)
+
+    async def resolve(self, usernames: Iterable[str]) -> Dict[str, Optional[int]]:
+        """
+        :说明:
+
+          批量解析 username，进程内缓存未命中的部分通过一次 redis ``MGET`` 查询并回填，
+          查询不到的 username 会以 ``negative_ttl`` 缓存为否定结果。
+        """
+        usernames = set(usernames)
+        misses = [username for username in usernames if self.cache.get_local(username) is MISSING]
+        if misses and self.redis_on:
+            found = await self.cache.get_many(misses)
+            if self.redis_on:
+                for username in misses:
+                    if username not in found:
+                        self.cache.set_local(username, None, ttl=self.negative_ttl)
+        return {username: self.get_user_id(username) for username in usernames}
+
+    async def resolve_users(self, user_ids: Iterable[Union[int, str]]) -> Dict[str, Optional[dict]]:
+        """
+        :说明:
+
+          批量查询 user_id 对应的 User，与 ``resolve`` 相同：进程内缓存未命中的部分通过一次 redis ``MGET`` 查询，
+          查询不到的 user_id 以 ``negative_ttl`` 缓存为否定结果。不会调用 Telegram API。
+        """
+        keys = {str(user_id) for user_id in user_ids}
+        misses = [key for key in keys if self.users.get_local(key) is MISSING]
+        if misses and self.redis_on:
+            found = await self.users.get_many(misses)
+            if self.redis_on:
+                for key in misses:
+                    if key not in found:
+                        self.users.set_local(key, None, ttl=self.negative_ttl)
+        return {key: self.users.get_local(key, None) for key in keys}
@@ -0,0 +1,107 @@
+"""
+命令索引
+
+``telegram_command_only`` 开启时，适配器在解析 Update 之前用已注册命令构建的前缀树过滤原始数据，
+不是命令的消息不会进入 pydantic 解析与 matcher 的规则检查。
+"""
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from pygtrie import CharTrie
+from nonebot.matcher import matchers
+from nonebot.rule import CommandRule, ShellCommandRule
+
+from .entity import utf16_index
+
+# 这些服务消息对应通知事件，不受命令过滤影响
+NOTICE_MESSAGE_KEYS = (
+    "new_chat_members",
+    "left_chat_member",
+    "new_chat_title",
+    "new_chat_photo",
+    "delete_chat_photo",
+    "voice_chat_started",
+    "voice_chat_ended",
+)
+
+
+def first_command(message: Dict[str, Any]) -> Optional[str]:
+    """原始 Message 字典中第一个 ``bot_command`` 实体的文本（含 ``@botname``），没有时返回 ``None``"""
+    for text_key, entities_key in (("text", "entities"), ("caption", "caption_entities")):
+        for entity in message.get(entities_key) or ():
+            if entity.get("type") != "bot_command":
+                continue
+            text: str = message.get(text_key) or ""
+            start, end = entity["offset"], entity["offset"] + entity["length"]
+            if index := utf16_index(text):
+                start, end = index[min(start, len(index) - 1)], index[min(end, len(index) - 1)]
+            return text[start:end]
+    return None
+
+
+class CommandIndex:
+    """
+    :说明:
+
+      已注册命令（``on_command`` / ``on_shell_command``）的前缀树。
+
+      已注册的 matcher 变化（增删、重载插件后替换为同样数量的新 matcher）时自动重建；有临时 matcher（``got`` / ``receive`` 等待中的会话）时放行所有消息，
+      以免会话中的后续回复被过滤。
+
+    :参数:
+
+      * ``command_start: Iterable[str]``: 命令起始符，即 nonebot 的 ``COMMAND_START``
+      * ``command_sep: Iterable[str]``: 命令分隔符，即 nonebot 的 ``COMMAND_SEP``
+    """
+
+    def __init__(self, command_start: Iterable[str], command_sep: Iterable[str]) -> None:
+        self.command_start = tuple(command_start)
+        self.command_sep = tuple(command_sep)
+        self.trie = CharTrie()
+        self._signature: Optional[Tuple[Tuple[type, ...], ...]] = None
+
+    @staticmethod
+    def _commands() -> Iterable[Tuple[str, ...]]:
+        for priority_matchers in matchers.values():
+            for matcher in priority_matchers:
+                for checker in matcher.rule.checkers:
+                    if isinstance(checker.call, (CommandRule, ShellCommandRule)):
+                        yield from checker.call.cmds
+
+    def refresh(self) -> None:
+        # 以 matcher 本身而不是数量比较：重载插件可能在同一优先级换入数量相同的其他命令
+        signature = tuple(map(tuple, matchers.values()))
+        if signature == self._signature:
+            return
+        self._signature = signature
+        self.trie = CharTrie()
+        for cmd in self._commands():
+            for start in self.command_start:
+                for sep in self.command_sep or (".",):
+                    self.trie[start + sep.join(cmd)] = cmd
+
+    @staticmethod
+    def waiting_session() -> bool:
+        """是否存在等待后续消息的临时 matcher"""
+        return any(matcher.temp for matcher in matchers.get(0, ()))
+
+    def match(self, command: str) -> bool:
+        """命令（已去除 ``@botname``）是否可能触发某个已注册命令"""
+        self.refresh()
+        return bool(self.trie.shortest_prefix(command)) or self.trie.has_subtrie(command)
+
+    def accepts(self, message: Dict[str, Any], bot_name: Optional[str]) -> bool:
+        """
+        :说明:
+
+          原始 Message 是否需要继续处理：通知类服务消息、会话等待中、或第一个 ``bot_command`` 是已注册命令。
+          发给其他 bot 的命令（``/cmd@other_bot``）不会被接受。
+        """
+        if any(key in message for key in NOTICE_MESSAGE_KEYS) or self.waiting_session():
+            return True
+        command = first_command(message)
+        if not command:
+            return False
+        command, _, target = command.partition("@")
+        if target and bot_name and target.lower() != bot_name.lower():
+            return False
+        return self.match(command)
@@ -0,0 +1,79 @@
+"""
+pydantic v1 / v2 兼容层
+
+适配器内所有模型相关的调用都应当经由本模块，避免直接使用某个版本独有的 API。
+在 pydantic v2 下会直接使用其编译内核进行校验（``model_validate``），
+在 v1 下则退回到 ``parse_obj`` / ``dict``。
+"""
+from typing import Any, Callable, Iterable, Set, Type, TypeVar
+
+from pydantic import VERSION, BaseModel
+
+PYDANTIC_V2 = int(VERSION.split(".", 1)[0]) == 2
+
+M = TypeVar("M", bound=BaseModel)
+
+__all__ = (
+    "PYDANTIC_V2",
+    "ConfigDict",
+    "pre_validator",
+    "model_validate",
+    "model_dump",
+    "model_fields_set",
+    "model_field_names",
+    "model_rebuild",
+    "model_copy",
+)
+
+if PYDANTIC_V2:
+    from pydantic import ConfigDict, model_validator
+
+    def pre_validator(func: Callable) -> Any:
+        """在字段校验前对原始输入进行处理（v1 的 ``root_validator(pre=True)``）"""
+        return model_validator(mode="before")(func)
+
+    def model_validate(model: Type[M], obj: Any) -> M:
+        return model.model_validate(obj)
+
+    def model_dump(model: BaseModel, **kwargs: Any) -> dict:
+        return model.model_dump(**kwargs)
+
+    def model_fields_set(model: BaseModel) -> Set[str]:
+        return model.model_fields_set
+
+    def model_field_names(model: Type[BaseModel]) -> Iterable[str]:
+        return model.model_fields.keys()
+
+    def model_rebuild(model: Type[BaseModel]) -> None:
+        model.model_rebuild()
+
+    def model_copy(model: M, **kwargs: Any) -> M:
+        return model.model_copy(**kwargs)
+
+else:
+    from pydantic import root_validator
+
+    class ConfigDict(dict):
+        """v1 下不存在 ``ConfigDict``，仅作为占位以保持导入一致"""
+
+    def pre_validator(func: Callable) -> Any:
+        """在字段校验前对原始输入进行处理（v1 的 ``root_validator(pre=True)``）"""
+        return root_validator(pre=True, allow_reuse=True)(func)
+
+    def model_validate(model: Type[M], obj: Any) -> M:
+        return model.parse_obj(obj)
+
+    def model_dump(model: BaseModel, **kwargs: Any) -> dict:
+        return model.dict(**kwargs)
+
+    def model_fields_set(model: BaseModel) -> Set[str]:
+        return model.__fields_set__
+
+    def model_field_names(model: Type[BaseModel]) -> Iterable[str]:
+        return model.__fields__.keys()
+
+    def model_rebuild(model: Type[BaseModel]) -> None:
+        model.update_forward_refs()
+
+    def model_copy(model: M, **kwargs: Any) -> M:
+        return model.copy(**kwargs)
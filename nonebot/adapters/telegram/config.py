@@ -1,8 +1,10 @@
 from nonebot import adapters
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import Field, BaseModel
 
+from .compat import PYDANTIC_V2, ConfigDict
+
 
 class Config(BaseModel):
     """
@@ -12,7 +14,27 @@ class Config(BaseModel):
 
       - ``webhook_host`` / ``telegram_webhook_host``: webhook的host
       - ``bot_token`` / ``telegram_bot_token``: bot_token
-      - ``telegram_command_only`` / ``telegram_command_only``: 不处理非command的消息 #还无效先占着
+      - ``telegram_command_only`` / ``telegram_command_only``: 只处理以已注册命令开头的消息（第一个bot_command实体），其余消息在解析前即被丢弃，默认为False；通知事件、callback_query与等待中的会话不受影响
+      - ``telegram_ignore_bot_messages`` / ``telegram_ignore_bot_messages``: 忽略其他bot发送的消息与callback_query，默认为True
+      - ``telegram_allow_chats`` / ``telegram_allow_chats``: 只处理这些chat id的Update，默认为None即不限制
+      - ``telegram_deny_chats`` / ``telegram_deny_chats``: 不处理这些chat id的Update，优先于telegram_allow_chats，默认为None
+      - ``telegram_stale_update_seconds`` / ``telegram_stale_update_seconds``: 丢弃早于该秒数的消息（如停机期间积压的Update），默认为None即不丢弃
+      - ``telegram_adapter_debug`` / ``telegram_adapter_debug``: 以DEBUG级别记录每次API调用及耗时，默认为False
+      - ``telegram_api_interceptors`` / ``telegram_api_interceptors``: API调用拦截器列表，内置拦截器名称（log、metrics）或module:attr形式的导入路径，默认为None
+      - ``telegram_rate_limit`` / ``telegram_rate_limit``: 按telegram的频率限制对发送类API排队，并在429时按retry_after重试，默认为True
+      - ``telegram_rate_limit_global`` / ``telegram_rate_limit_global``: 全局每秒发送数，默认为30
+      - ``telegram_rate_limit_chat`` / ``telegram_rate_limit_chat``: 单个私聊每秒发送数，默认为1
+      - ``telegram_rate_limit_group`` / ``telegram_rate_limit_group``: 单个群/频道每分钟发送数，默认为20
+      - ``telegram_rate_limit_max_retries`` / ``telegram_rate_limit_max_retries``: 429后的最大重试次数，默认为3
+      - ``telegram_stream_interval`` / ``telegram_stream_interval``: 流式消息同一条消息两次编辑的最小间隔（秒），默认为1
+      - ``telegram_photo_preprocess`` / ``telegram_photo_preprocess``: 发送前在进程池中缩小并重新压缩超出照片限制（10 MB、宽高之和超过10000、宽高比超过20）的图片，需要安装Pillow，默认为False
+      - ``telegram_photo_max_side`` / ``telegram_photo_max_side``: 预处理后图片的最长边（像素），默认为2560
+      - ``telegram_photo_quality`` / ``telegram_photo_quality``: 预处理后图片的JPEG质量，默认为90
+      - ``telegram_photo_max_size`` / ``telegram_photo_max_size``: 预处理后图片的最大字节数，默认为10485760
+      - ``telegram_photo_preprocess_workers`` / ``telegram_photo_preprocess_workers``: 预处理的进程数，默认为2
+      - ``telegram_photo_cache_size`` / ``telegram_photo_cache_size``: 预处理结果缓存的总大小（MB），默认为64
+      - ``telegram_media_group_window`` / ``telegram_media_group_window``: 收到相册的第一条Update后等待其余Update的时间（毫秒），之后合并为一个事件，默认为800，为0时不合并
+      - ``telegram_media_group_max_pending`` / ``telegram_media_group_max_pending``: 同时缓冲的相册数量上限，超出时最早的相册立即交付，默认为1000
       - ``telegram_bot_server_addr`` / ``telegram_bot_server_addr``: telegram bot api服务器地址，默认为官方
       - ``telegram_bot_api_proxy`` / ``telegram_bot_api_proxy``: 代理服务器地址，需满足httpx代理的格式，默认为None
       - ``telegram_polling_interval`` / ``telegram_polling_interval``: (仅HTTP轮训模式)HTTP轮训间隔，默认为0，即启用长轮训
@@ -20,11 +42,48 @@ class Config(BaseModel):
       - ``telegram_mount_media`` / ``telegram_mount_media``: 在fastapi上挂载本地媒体下载api，开启后可以实时获取图片的本地下载链接
       - ``telegram_media_public_addr`` / ``telegram_media_public_addr``: 媒体下载链接使用公开地址而不是私有地址使插件可以像ob11那样来处理图片，注意潜在的被刷流量风险(x exapmle:https://example.com
       - ``telegram_redis_db`` / ``telegram_redis_db``: 使用redis的db，默认为2以防止和现有应用冲突 
+      - ``telegram_redis_url`` / ``telegram_redis_url``: redis地址，默认为redis://localhost，使用rediss://以启用TLS，url中指定的db优先于telegram_redis_db
+      - ``telegram_redis_ssl`` / ``telegram_redis_ssl``: 是否使用TLS连接redis，默认为False
+      - ``telegram_redis_ssl_ca_certs`` / ``telegram_redis_ssl_ca_certs``: TLS CA证书路径，默认为None
+      - ``telegram_redis_pool_size`` / ``telegram_redis_pool_size``: redis连接池最大连接数，默认为10
+      - ``telegram_redis_sentinels`` / ``telegram_redis_sentinels``: redis sentinel地址列表（host:port），设置后通过sentinel连接，默认为None
+      - ``telegram_redis_sentinel_master`` / ``telegram_redis_sentinel_master``: sentinel中主节点的服务名，默认为mymaster
+      - ``telegram_redis_cluster`` / ``telegram_redis_cluster``: redis是否为cluster，默认为False
+      - ``telegram_redis_health_check_interval`` / ``telegram_redis_health_check_interval``: redis健康检查间隔（秒），默认为30
+      - ``telegram_redis_reconnect_interval`` / ``telegram_redis_reconnect_interval``: redis不可用时的重连间隔（秒），默认为5，不可用期间缓存退回内存
+      - ``telegram_username_cache_size`` / ``telegram_username_cache_size``: 进程内username缓存的最大条目数，默认为10000
+      - ``telegram_username_cache_ttl`` / ``telegram_username_cache_ttl``: 进程内username缓存的有效期（秒），默认为3600
+      - ``telegram_username_negative_ttl`` / ``telegram_username_negative_ttl``: 查询不到的username的缓存有效期（秒），默认为60
+      - ``telegram_username_flush_interval`` / ``telegram_username_flush_interval``: username缓存批量写入redis的间隔（毫秒），默认为1000
+      - ``telegram_username_flush_batch`` / ``telegram_username_flush_batch``: username缓存累计多少条待写入时立即写入redis，默认为100
+      - ``telegram_chat_cache_ttl`` / ``telegram_chat_cache_ttl``: getChat/getChatMember/getChatAdministrators结果的缓存有效期（秒），默认为300，收到成员变动等事件时会提前失效
+      - ``telegram_file_link_cache_size`` / ``telegram_file_link_cache_size``: 文件下载链接缓存的最大条目数，默认为10000
+      - ``telegram_file_link_negative_ttl`` / ``telegram_file_link_negative_ttl``: getFile失败（文件过大、file_id无效等）结果的缓存有效期（秒），默认为60
+      - ``telegram_file_link_refresh_ahead`` / ``telegram_file_link_refresh_ahead``: 下载链接剩余有效期少于该值（秒）时在后台刷新，默认为300
     """
     webhook_addr: Optional[str] = Field(default=None, alias="telegram_webhook_host")
     bot_token: Optional[str] = Field(default=None, alias="telegram_bot_token")
     telegram_adapter_debug: Optional[bool] = Field(default=False, alias="telegram_adapter_debug")
+    telegram_api_interceptors: Optional[List[str]] = Field(default=None, alias="telegram_api_interceptors")
+    telegram_rate_limit: Optional[bool] = Field(default=True, alias="telegram_rate_limit")
+    telegram_rate_limit_global: Optional[float] = Field(default=30, alias="telegram_rate_limit_global")
+    telegram_rate_limit_chat: Optional[float] = Field(default=1, alias="telegram_rate_limit_chat")
+    telegram_rate_limit_group: Optional[float] = Field(default=20, alias="telegram_rate_limit_group")
+    telegram_rate_limit_max_retries: Optional[int] = Field(default=3, alias="telegram_rate_limit_max_retries")
+    telegram_stream_interval: Optional[float] = Field(default=1.0, alias="telegram_stream_interval")
+    telegram_photo_preprocess: Optional[bool] = Field(default=False, alias="telegram_photo_preprocess")
+    telegram_photo_max_side: Optional[int] = Field(default=2560, alias="telegram_photo_max_side")
+    telegram_photo_quality: Optional[int] = Field(default=90, alias="telegram_photo_quality")
+    telegram_photo_max_size: Optional[int] = Field(default=10 * 1024 * 1024, alias="telegram_photo_max_size")
+    telegram_photo_preprocess_workers: Optional[int] = Field(default=2, alias="telegram_photo_preprocess_workers")
+    telegram_photo_cache_size: Optional[int] = Field(default=64, alias="telegram_photo_cache_size")
+    telegram_media_group_window: Optional[float] = Field(default=800, alias="telegram_media_group_window")
+    telegram_media_group_max_pending: Optional[int] = Field(default=1000, alias="telegram_media_group_max_pending")
     telegram_command_only: Optional[bool] = Field(default=False, alias="telegram_command_only")
+    telegram_ignore_bot_messages: Optional[bool] = Field(default=True, alias="telegram_ignore_bot_messages")
+    telegram_allow_chats: Optional[List[int]] = Field(default=None, alias="telegram_allow_chats")
+    telegram_deny_chats: Optional[List[int]] = Field(default=None, alias="telegram_deny_chats")
+    telegram_stale_update_seconds: Optional[float] = Field(default=None, alias="telegram_stale_update_seconds")
     telegram_bot_api_server_addr: Optional[str] = Field(default="https://api.telegram.org", alias="telegram_bot_server_addr")
     telegram_bot_api_proxy: Optional[str] = Field(default=None, alias="telegram_bot_api_proxy")
     telegram_polling_interval: Optional[int] = Field(default=0, alias="telegram_polling_interval")
@@ -32,8 +91,29 @@ class Config(BaseModel):
     telegram_mount_media: Optional[bool] = Field(default=True, alias="telegram_mount_media")
     telegram_media_public_addr: Optional[str] = Field(default=None, alias="telegram_media_public_addr")
     telegram_redis_db: Optional[int] = Field(default=2, alias="telegram_redis_db")
+    telegram_redis_url: Optional[str] = Field(default="redis://localhost", alias="telegram_redis_url")
+    telegram_redis_ssl: Optional[bool] = Field(default=False, alias="telegram_redis_ssl")
+    telegram_redis_ssl_ca_certs: Optional[str] = Field(default=None, alias="telegram_redis_ssl_ca_certs")
+    telegram_redis_pool_size: Optional[int] = Field(default=10, alias="telegram_redis_pool_size")
+    telegram_redis_sentinels: Optional[List[str]] = Field(default=None, alias="telegram_redis_sentinels")
+    telegram_redis_sentinel_master: Optional[str] = Field(default="mymaster", alias="telegram_redis_sentinel_master")
+    telegram_redis_cluster: Optional[bool] = Field(default=False, alias="telegram_redis_cluster")
+    telegram_redis_health_check_interval: Optional[float] = Field(default=30, alias="telegram_redis_health_check_interval")
+    telegram_redis_reconnect_interval: Optional[float] = Field(default=5, alias="telegram_redis_reconnect_interval")
+    telegram_username_cache_size: Optional[int] = Field(default=10000, alias="telegram_username_cache_size")
+    telegram_username_cache_ttl: Optional[float] = Field(default=3600, alias="telegram_username_cache_ttl")
+    telegram_username_negative_ttl: Optional[float] = Field(default=60, alias="telegram_username_negative_ttl")
+    telegram_username_flush_interval: Optional[int] = Field(default=1000, alias="telegram_username_flush_interval")
+    telegram_username_flush_batch: Optional[int] = Field(default=100, alias="telegram_username_flush_batch")
+    telegram_chat_cache_ttl: Optional[float] = Field(default=300, alias="telegram_chat_cache_ttl")
+    telegram_file_link_cache_size: Optional[int] = Field(default=10000, alias="telegram_file_link_cache_size")
+    telegram_file_link_negative_ttl: Optional[float] = Field(default=60, alias="telegram_file_link_negative_ttl")
+    telegram_file_link_refresh_ahead: Optional[float] = Field(default=300, alias="telegram_file_link_refresh_ahead")
     #telegram_use_webhook:Optional[bool] = Field(default=False, alias="telegram_adapter_debug")
 
-    class Config:
-        extra = "ignore"
-        allow_population_by_field_name = True
+    if PYDANTIC_V2:
+        model_config = ConfigDict(extra="ignore", populate_by_name=True)
+    else:
+        class Config:
+            extra = "ignore"
+            allow_population_by_field_name = True
@@ -0,0 +1,304 @@
+"""
+消息实体（MessageEntity）解析
+
+Telegram 中实体的 ``offset`` / ``length`` 以 UTF-16 码元计，而 Python 字符串以码位索引，
+文本中出现 BMP 以外的字符（大部分 emoji）时两者不再一致，不能直接用 offset 切片。
+"""
+import re
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from .message import Message, MessageSegment, TextData, AtData
+from .models import MessageEntity
+from .compat import model_copy, model_dump
+
+UsernameResolver = Callable[[str], Optional[int]]
+
+# sendMessage 的文本与各类媒体的 caption 的长度上限（UTF-16 码元）
+MAX_TEXT_LENGTH = 4096
+MAX_CAPTION_LENGTH = 1024
+# 拆分长文本时依次尝试的断点：段落、行、词
+SPLIT_SEPARATORS = ("\n\n", "\n", " ")
+ASTRAL_CHAR = re.compile("[\U00010000-\U0010FFFF]")
+# 拆分时不应从中间断开的实体
+ATOMIC_ENTITY_TYPES = frozenset({"mention", "hashtag", "cashtag", "bot_command", "url", "email",
+                                 "phone_number", "text_mention", "custom_emoji"})
+
+
+def utf16_len(text: str) -> int:
+    """文本的 UTF-16 码元长度"""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def utf16_index(text: str) -> Optional[List[int]]:
+    """
+    构建 UTF-16 码元下标到码位下标的映射表（长度为 ``utf16_len(text) + 1``）。
+
+    文本不含 BMP 以外的字符时两种下标一致，返回 ``None``。
+    """
+    if text.isascii() or utf16_len(text) == len(text):
+        return None
+    index: List[int] = []
+    for i, char in enumerate(text):
+        index.append(i)
+        if ord(char) > 0xFFFF:
+            index.append(i)
+    index.append(len(text))
+    return index
+
+
+def mention_usernames(message: Dict[str, Any]) -> List[str]:
+    """从原始 Message 字典（未经模型解析）中提取所有 ``mention`` 实体的 username"""
+    text: str = message.get("text") or ""
+    entities: List[Dict[str, Any]] = [
+        entity for entity in message.get("entities") or () if entity.get("type") == "mention"
+    ]
+    if not entities:
+        return []
+    index = utf16_index(text)
+    usernames = []
+    for entity in entities:
+        start, end = entity["offset"], entity["offset"] + entity["length"]
+        if index:
+            start, end = index[min(start, len(index) - 1)], index[min(end, len(index) - 1)]
+        usernames.append(text[start + 1:end])
+    return usernames
+
+
+def _entity_segment(entity: MessageEntity, source: str, resolve_username: Optional[UsernameResolver]) -> MessageSegment:
+    type_ = entity.type.value if hasattr(entity.type, "value") else entity.type
+    if type_ == "text_mention" and entity.user:
+        return MessageSegment("at", AtData(str(entity.user.id), text=source, user=entity.user))
+    if type_ == "mention":
+        username = source[1:]
+        if resolve_username and (user_id := resolve_username(username)):
+            return MessageSegment("at", AtData(str(user_id), text=source, username=username))
+        return MessageSegment("mention", TextData(source, username=username))
+    data = TextData(source)
+    if entity.url:
+        data["url"] = entity.url
+    if entity.language:
+        data["language"] = entity.language
+    if entity.custom_emoji_id:
+        data["custom_emoji_id"] = entity.custom_emoji_id
+    return MessageSegment(type_, data)
+
+
+def parse_entities(text: str,
+                   entities: Optional[Iterable[MessageEntity]],
+                   resolve_username: Optional[UsernameResolver] = None) -> Message:
+    """
+    :说明:
+
+      将文本与其实体列表在一次线性扫描中转换为消息段。
+
+      最外层实体各自成为一个消息段（类型即实体类型，``mention`` / ``text_mention`` 解析为 ``at``），
+      被其包含的嵌套实体以相对该段的 UTF-16 偏移记录在段的 ``entities`` 中，实体之间的文本为 ``text`` 段。
+      跨过外层实体末尾的嵌套实体在末尾处截断，其余部分归入之后的消息段。
+
+    :参数:
+
+      * ``text: str``: 消息文本
+      * ``entities: Optional[Iterable[MessageEntity]]``: 消息实体
+      * ``resolve_username: Optional[Callable[[str], Optional[int]]]``: username -> user_id，无法解析时返回 ``None``
+    """
+    if not entities:
+        return Message(MessageSegment.text(text)) if text else Message()
+    index = utf16_index(text)
+    last = len(index) - 1 if index else len(text)
+    segments: List[MessageSegment] = []
+    cursor = 0
+    parent: Optional[MessageSegment] = None
+    parent_start = parent_end = 0
+    # 按 offset 升序处理，同一起点时外层实体更长；截断后剩余的部分重新放入队列
+    queue = [(entity.offset, -entity.length, i, entity) for i, entity in enumerate(entities)]
+    heapq.heapify(queue)
+    seq = len(queue)
+    while queue:
+        entity = heapq.heappop(queue)[3]
+        start16 = min(entity.offset, last)
+        end16 = min(entity.offset + entity.length, last)
+        if parent is not None and start16 < parent_end:
+            update = {"offset": start16 - parent_start}
+            if end16 > parent_end:
+                heapq.heappush(queue, (parent_end, parent_end - end16, seq, model_copy(
+                    entity, update={"offset": parent_end, "length": end16 - parent_end})))
+                seq += 1
+                update["length"] = parent_end - start16
+            parent.data.setdefault("entities", []).append(model_copy(entity, update=update))
+            continue
+        start = index[start16] if index else start16
+        end = index[end16] if index else end16
+        if start > cursor:
+            segments.append(MessageSegment.text(text[cursor:start]))
+        parent = _entity_segment(entity, text[start:end], resolve_username)
+        parent_start, parent_end = start16, end16
+        segments.append(parent)
+        cursor = end
+    if cursor < len(text):
+        segments.append(MessageSegment.text(text[cursor:]))
+    return Message(segments)
+
+
+def strip_bot_mentions(text: str,
+                       entities: Optional[List[MessageEntity]],
+                       bot_name: Optional[str],
+                       bot_id: Optional[int]) -> Tuple[str, Optional[List[MessageEntity]], bool]:
+    """
+    :说明:
+
+      根据实体找出文本中指向本 bot 的部分并移除，返回 ``(新文本, 新实体列表, 是否指向本 bot)``。
+
+      * ``mention`` 为 ``@bot_name`` 或 ``text_mention`` 的用户为本 bot 时，移除该实体及其后的一个空白
+      * ``bot_command`` 为 ``/cmd@bot_name`` 时，移除 ``@bot_name`` 后缀
+
+      移除后去掉首尾空白，其余实体的 offset / length 按 UTF-16 重新计算，与被移除部分重叠的实体会相应缩短。
+
+    :参数:
+
+      * ``text: str``: 消息文本或 caption
+      * ``entities: Optional[List[MessageEntity]]``: 对应的实体
+      * ``bot_name: Optional[str]``: bot 的 username
+      * ``bot_id: Optional[int]``: bot 的 user id
+    """
+    if not entities:
+        return text, entities, False
+    index = utf16_index(text)
+    last = len(index) - 1 if index else len(text)
+
+    def to_index(pos16: int) -> int:
+        pos16 = min(pos16, last)
+        return index[pos16] if index else pos16
+
+    name = f"@{bot_name}".lower() if bot_name else None
+    removed: List[Tuple[int, int]] = []
+    kept: List[MessageEntity] = []
+    for entity in sorted(entities, key=lambda e: e.offset):
+        type_ = entity.type.value if hasattr(entity.type, "value") else entity.type
+        start16, end16 = entity.offset, entity.offset + entity.length
+        if type_ == "mention" and name and text[to_index(start16):to_index(end16)].lower() == name or \
+                type_ == "text_mention" and entity.user and bot_id is not None and entity.user.id == bot_id:
+            if end16 < last and text[to_index(end16)].isspace():
+                end16 += 1
+            removed.append((start16, end16))
+            continue
+        if type_ == "bot_command" and name and text[to_index(start16):to_index(end16)].lower().endswith(name):
+            removed.append((end16 - len(name), end16))
+        kept.append(entity)
+    if not removed:
+        return text, entities, False
+
+    pieces: List[str] = []
+    cursor = 0
+    for start16, end16 in removed:
+        pieces.append(text[to_index(cursor):to_index(start16)])
+        cursor = end16
+    pieces.append(text[to_index(cursor):])
+    joined = "".join(pieces)
+    new_text = joined.strip()
+    # 空白字符都在 BMP 内，码位数即 UTF-16 码元数
+    lead = len(joined) - len(joined.lstrip())
+    new_len = utf16_len(new_text)
+
+    def shift(pos16: int) -> int:
+        result = pos16
+        for start16, end16 in removed:
+            if start16 >= pos16:
+                break
+            result -= min(end16, pos16) - start16
+        return result - lead
+
+    new_entities: List[MessageEntity] = []
+    for entity in kept:
+        start = max(shift(entity.offset), 0)
+        end = min(shift(entity.offset + entity.length), new_len)
+        if end > start:
+            new_entities.append(model_copy(entity, update={"offset": start, "length": end - start}))
+    return new_text, new_entities, True
+
+
+def split_text(text: str,
+               entities: Optional[Iterable[Union[MessageEntity, Dict[str, Any]]]] = None,
+               limit: int = MAX_TEXT_LENGTH,
+               first_limit: Optional[int] = None) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    :说明:
+
+      把超出长度上限的文本拆分为多段，返回 ``[(文本, 实体列表), ...]``，实体为可直接发送的字典。
+
+      长度按 UTF-16 码元计。每段在不超过上限的前提下优先在段落、换行、空格处断开（断点不早于该段的一半），
+      断点处的分隔符被丢弃；断点不会落在 mention / url 等实体中间。跨越断点的实体被截为两部分，
+      各段的实体 offset 相对该段重新计算。各段去掉首尾空白，只有空白的段被丢弃。
+
+    :参数:
+
+      * ``text: str``: 文本
+      * ``entities: Optional[Iterable[Union[MessageEntity, dict]]]``: 实体
+      * ``limit: int``: 每段的长度上限
+      * ``first_limit: Optional[int]``: 第一段的长度上限（如作为 caption 时），默认与 ``limit`` 相同
+    """
+    entities = [model_dump(e, exclude_none=True) if isinstance(e, BaseModel) else dict(e) for e in entities or ()]
+    if utf16_len(text) <= (first_limit if first_limit is not None else limit):
+        return [(text, entities)]
+    # BMP 以外的字符（占两个 UTF-16 码元）的码位下标与 UTF-16 起止偏移，用于两种下标的换算
+    astral = [m.start() for m in ASTRAL_CHAR.finditer(text)] if not text.isascii() else []
+    starts16 = [pos + i for i, pos in enumerate(astral)]
+    ends16 = [pos + 2 for pos in starts16]
+
+    def to16(pos: int) -> int:
+        return pos + bisect_left(astral, pos) if astral else pos
+
+    def to_index(pos16: int) -> int:
+        """不超过该 UTF-16 偏移的最大码位下标"""
+        if not astral:
+            return pos16
+        k = bisect_right(ends16, pos16)
+        # 落在代理对中间时退回到该字符
+        return pos16 - k - (1 if k < len(starts16) and starts16[k] < pos16 else 0)
+
+    atomic = [(e["offset"], e["offset"] + e["length"]) for e in entities
+              if getattr(e["type"], "value", e["type"]) in ATOMIC_ENTITY_TYPES]
+    entities.sort(key=lambda e: e["offset"])
+    offsets = [e["offset"] for e in entities]
+    chunks: List[Tuple[str, List[Dict[str, Any]]]] = []
+    first = 0
+    start = 0
+    while start < len(text):
+        lim = first_limit if first_limit is not None and not chunks else limit
+        hard = min(max(to_index(to16(start) + lim), start + 1), len(text))
+        cut, skip = hard, 0
+        if hard < len(text):
+            half = start + (hard - start) // 2
+            for sep in SPLIT_SEPARATORS:
+                pos = text.rfind(sep, start, hard)
+                if pos > half:
+                    cut, skip = pos, len(sep)
+                    break
+            cut16 = to16(cut)
+            for begin16, end16 in atomic:
+                if to16(start) < begin16 < cut16 < end16:
+                    cut, skip = to_index(begin16), 0
+                    break
+        piece = text[start:cut]
+        stripped = piece.strip()
+        if stripped:
+            # 空白字符都在 BMP 内，码位数即 UTF-16 码元数
+            begin16 = to16(start) + len(piece) - len(piece.lstrip())
+            end16 = begin16 + utf16_len(stripped)
+            # 跳过已经结束的实体，只检查起点在本段结束之前的实体
+            while first < len(entities) and entities[first]["offset"] + entities[first]["length"] <= begin16:
+                first += 1
+            chunk_entities: List[Dict[str, Any]] = []
+            for entity in entities[first:bisect_left(offsets, end16)]:
+                e_start = entity["offset"] if entity["offset"] > begin16 else begin16
+                e_end = entity["offset"] + entity["length"]
+                if e_end > end16:
+                    e_end = end16
+                if e_end > e_start:
+                    chunk_entities.append({**entity, "offset": e_start - begin16, "length": e_end - e_start})
+            chunks.append((stripped, chunk_entities))
+        start = cut + skip
+    return chunks
@@ -2,18 +2,21 @@ from copy import Error
 from enum import Enum
 from re import S
 from ssl import OP_ALL
-from typing import Dict, List, Optional, Text, Union
+import sys
+from typing import Dict, List, Optional, Set, Text, Type, Union
 from typing_extensions import Literal
 from typing import Any
 from xmlrpc.client import boolean
-from pydantic import BaseModel, root_validator
+from pydantic import BaseModel, PrivateAttr
 
 from nonebot.typing import overrides
 from nonebot.adapters import Event as BaseEvent
 
-from .message import Message, MessageSegment
+from .message import Message, MessageSegment, MediaData
 from .models import *
+from .compat import PYDANTIC_V2, model_dump, model_validate
 from .cache import TelegramUserNameIdCache
+from .entity import parse_entities
 from .utils import log
 
 class Event(BaseEvent):
@@ -21,6 +24,13 @@ class Event(BaseEvent):
     telegram协议事件。
     """
 
+    _tags: Set[str] = PrivateAttr(default_factory=set)
+
+    @property
+    def tags(self) -> Set[str]:
+        """Update 中间件为该事件添加的标签"""
+        return self._tags
+
     @overrides(BaseEvent)
     def get_type(self) -> Literal["message", "notice", "request", "meta_event"]:
         raise ValueError("Event has no type!")
@@ -53,49 +63,106 @@ class Event(BaseEvent):
     def is_tome(self) -> bool:
         return True
 
-    # patch pydantic validate, ignore dict check(not recommand to use, just lazy) #For nb2 before https://github.com/nonebot/nonebot2/pull/876
-    @classmethod
-    @overrides(BaseModel)
-    def validate(cls: BaseModel, value: Any) -> BaseModel:
-        if isinstance(value, cls):
-            if cls.__config__.copy_on_model_validation:
-                return value._copy_and_set_values(value.__dict__, value.__fields_set__, deep=False)
-            else:
+    def freeze(self) -> "FrozenEvent":
+        """
+        :说明:
+
+          将事件冻结为紧凑形式，适合需要长期保留大量事件（上下文、回复查找）的场景。
+
+          仅保留值不为 ``None`` 的字段，聊天标题 / 用户名等重复出现的字符串会被驻留，
+          ``message_struct`` 等可由原始数据重新得到的内容不会被保留。通过 ``FrozenEvent.thaw`` 还原。
+        """
+        return FrozenEvent(type(self), _compact(model_dump(self, exclude_none=True, exclude={"message_struct"})))
+
+    # 事件在一次分发中只会被构建一次，注入到各个处理函数参数时应当共享同一实例，
+    # 而不是在每次依赖注入校验时复制整棵模型树。
+    # pydantic v2 默认 revalidate_instances="never"，已经直接返回实例，只需处理 v1
+    if not PYDANTIC_V2:
+        # patch pydantic validate, ignore dict check(not recommand to use, just lazy) #For nb2 before https://github.com/nonebot/nonebot2/pull/876
+        @classmethod
+        @overrides(BaseModel)
+        def validate(cls: BaseModel, value: Any) -> BaseModel:
+            if isinstance(value, cls):
+                # identity-preserving, ignore copy_on_model_validation
                 return value
+            if isinstance(value, BaseEvent):
+                raise TypeError(f"{value} is incompatible with Event type {cls}")
 
-        value = cls._enforce_dict_if_root(value)
+            value = cls._enforce_dict_if_root(value)
 
-        if isinstance(value, dict):
-            return cls(**value)
-        elif cls.__config__.orm_mode:
-            return cls.from_orm(value)
-        else:
-            # ignore dict check, directly throw wrror
-            raise TypeError()
+            if isinstance(value, dict):
+                return cls(**value)
+            elif cls.__config__.orm_mode:
+                return cls.from_orm(value)
+            else:
+                # ignore dict check, directly throw wrror
+                raise TypeError()
+
+
+# 冻结事件时需要驻留的字符串字段，这些值在同一聊天的事件之间大量重复
+INTERNED_FIELDS = frozenset(("title", "username", "first_name", "last_name", "language_code"))
+
+
+def _compact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: sys.intern(item) if key in INTERNED_FIELDS and isinstance(item, str) else _compact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_compact(item) for item in value]
+    return value
+
+
+class FrozenEvent:
+    """
+    :说明:
+
+      ``Event.freeze`` 得到的紧凑事件，只保存事件类型与出现过的字段。
+
+    :参数:
+
+      * ``event_type: Type[Event]``: 原事件类型
+      * ``data: Dict[str, Any]``: 事件中值不为 ``None`` 的字段
+    """
+    __slots__ = ("event_type", "data")
+
+    def __init__(self, event_type: Type[Event], data: Dict[str, Any]) -> None:
+        self.event_type = event_type
+        self.data = data
+
+    def thaw(self) -> Event:
+        """重新构建完整的事件"""
+        return model_validate(self.event_type, self.data)
+
+    def __repr__(self) -> str:
+        return f"<FrozenEvent {self.event_type.__name__} {self.data.get('update_id')}>"
 
 
 class MessageEvent(Event):
     """消息事件，是Update结构的超集"""
     update_id: "int"
-    message: Optional["MessageBody"]
-    edited_message: Optional["MessageBody"]
-    channel_post: Optional["MessageBody"]
-    edited_channel_post: Optional["MessageBody"]
-    inline_query: Optional["InlineQuery"]
-    chosen_inline_result: Optional["ChosenInlineResult"]
-    callback_query: Optional["CallbackQuery"]
-    shipping_query: Optional["ShippingQuery"]
-    pre_checkout_query: Optional["PreCheckoutQuery"]
-    poll: Optional["Poll"]
-    poll_answer: Optional["PollAnswer"]
-    my_chat_member: Optional["ChatMemberUpdated"]
-    chat_member: Optional["ChatMemberUpdated"]
-    chat_join_request: Optional["ChatJoinRequest"]
-
-    message_struct: Optional[Message]
-
-    user_id: Optional[int]
-    group_id: Optional[int]
+    message: Optional["MessageBody"] = None
+    edited_message: Optional["MessageBody"] = None
+    channel_post: Optional["MessageBody"] = None
+    edited_channel_post: Optional["MessageBody"] = None
+    inline_query: Optional["InlineQuery"] = None
+    chosen_inline_result: Optional["ChosenInlineResult"] = None
+    callback_query: Optional["CallbackQuery"] = None
+    shipping_query: Optional["ShippingQuery"] = None
+    pre_checkout_query: Optional["PreCheckoutQuery"] = None
+    poll: Optional["Poll"] = None
+    poll_answer: Optional["PollAnswer"] = None
+    my_chat_member: Optional["ChatMemberUpdated"] = None
+    chat_member: Optional["ChatMemberUpdated"] = None
+    chat_join_request: Optional["ChatJoinRequest"] = None
+
+    message_struct: Optional[Message] = None
+    # 适配器合并相册后，相册中的全部消息（按 message_id 排序，第一条即 message）
+    media_group: Optional[List["MessageBody"]] = None
+
+    user_id: Optional[int] = None
+    group_id: Optional[int] = None
 
     to_me: bool = True
 
@@ -119,87 +186,50 @@ class MessageEvent(Event):
                 max_index = i
         return file_list[max_index]
 
+    @staticmethod
+    def _resolve_username(username: str) -> Optional[int]:
+        if username_cache := getattr(TelegramUserNameIdCache, "instance", None):
+            return username_cache.get_user_id(username)
+        return None
+
     def get_message_struct_in_message(self, message: MessageBody) -> Message:
         if message.text:
-            text_msg = message.text
-            msg_list: List[MessageSegment] = []
-            current_start_offset = 0
-            if message.entities:
-                for entitiy in message.entities:
-                    if entitiy.type == "mention":
-                        if entitiy.user:
-                            msg_list.append(MessageSegment.at(entitiy.user.id))
-                        else:
-                            at_username = text_msg[current_start_offset+entitiy.offset +
-                                                1:current_start_offset+entitiy.offset+entitiy.length]
-                            if user_id := TelegramUserNameIdCache.get_inst().get_user_id(at_username):
-                                msg_list.append(MessageSegment.text(
-                                    text_msg[current_start_offset:current_start_offset+entitiy.offset]))
-                                current_start_offset += entitiy.offset+entitiy.length
-                                msg_list.append(MessageSegment.at(user_id))
-                            else:
-                                log("WARNING",f"Get user_id of @{at_username} failed")
-            if current_start_offset < len(message.text):
-                msg_list.append(MessageSegment.text(
-                    text_msg[current_start_offset:]))
-            return Message(msg_list)
-        data = {}
-        if message.caption:
-            data["caption"] = message.caption
+            return parse_entities(message.text, message.entities, self._resolve_username)
+        data = {"caption": message.caption} if message.caption else {}
         if message.photo:
             max_size_photo: PhotoSize = MessageEvent.get_max_size_file(
                 message.photo)
-            data.update(max_size_photo.dict())
-            data["photo"] = max_size_photo.file_id
-            return Message(MessageSegment("photo", data))
-        elif message.document:
-            data.update(message.document.dict())
-            data["document"] = message.document.file_id
-            return Message(MessageSegment("document", data))
-        elif message.sticker:
-            data.update(message.sticker.dict())
-            data["sticker"] = message.sticker.file_id
-            return Message(MessageSegment("sticker", data))
-        elif message.voice:
-            data.update(message.voice.dict())
-            data["voice"] = message.voice.file_id
-            return Message(MessageSegment("voice", data))
-        elif message.audio:
-            data.update(message.audio.dict())
-            data["audio"] = message.audio.file_id
-            return Message(MessageSegment("audio", data))
-        elif message.animation:
-            data.update(message.animation.dict())
-            data["animation"] = message.animation.file_id
-            return Message(MessageSegment("animation", data))
-        elif message.video:
-            data.update(message.video.dict())
-            data["video"] = message.video.file_id
-            return Message(MessageSegment("video", data))
-        elif message.video_note:
-            data.update(message.video_note.dict())
-            data["video_note"] = message.video_note.file_id
-            return Message(MessageSegment("video_note", data))
+            return Message(MessageSegment("photo", MediaData("photo", max_size_photo, **data)))
+        for type_ in ("document", "sticker", "voice", "audio", "animation", "video", "video_note"):
+            media = getattr(message, type_)
+            if media:
+                return Message(MessageSegment(type_, MediaData(type_, media, **data)))
         return None
 
     def get_message_struct(self) -> Message:
+        if self.media_group:
+            album = Message()
+            for message in self.media_group:
+                album.extend(self.get_message_struct_in_message(message) or ())
+            return album
         ret_msg: MessageBody = None
         if ret_msg := self.get_message_struct_in_message(self.message):
             return ret_msg
-        elif ret_msg := self.get_message_struct_in_message(MessageBody.parse_obj(self.message.reply_to_message)):
+        elif self.message.reply_to_message and (ret_msg := self.get_message_struct_in_message(self.message.reply_to_message)):
             return ret_msg
         else:
             return Message("")
 
     @overrides(Event)
     def get_message(self) -> Message:
-        if not self.message_struct:
+        if self.message_struct is None:
             msg_struct: Message = self.get_message_struct()
             self.message_struct = msg_struct
         return self.message_struct
 
     @overrides(Event)
     def get_plaintext(self) -> str:
+        # get_message() 返回的消息可以被处理函数修改，每次重新提取
         return self.get_message().extract_plain_text()
 
     @overrides(Event)
@@ -222,7 +252,7 @@ class PrivateMessageEvent(MessageEvent):
 
 class GroupMessageEvent(MessageEvent):
     """群聊消息"""
-    to_me = False
+    to_me: bool = False
     # @overrides(MessageEvent)
     # def is_tome(self) -> bool:
     #    return self.isInAtList
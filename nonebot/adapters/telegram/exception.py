@@ -44,14 +44,17 @@ class ActionFailed(BaseActionFailed, TelegramAdapterException):
 
       * ``errcode: Optional[int]``: 错误码
       * ``errmsg: Optional[str]``: 错误信息
+      * ``retry_after: Optional[float]``: 触发频率限制（429）时需要等待的秒数
     """
 
     def __init__(self,
                  errcode: Optional[int] = None,
-                 errmsg: Optional[str] = None):
+                 errmsg: Optional[str] = None,
+                 retry_after: Optional[float] = None):
         super().__init__()
         self.errcode = errcode
         self.errmsg = errmsg
+        self.retry_after = retry_after
 
     def __repr__(self):
         return f"<ApiError errcode={self.errcode} errmsg=\"{self.errmsg}\">"
@@ -64,7 +67,21 @@ class ApiNotAvailable(BaseApiNotAvailable, TelegramAdapterException):
     pass
 
 class MessageNotAcceptable(BaseActionFailed, TelegramAdapterException):
-  pass
+    """
+    :说明:
+
+      无法解析为事件的 Update
+    """
+
+    def __init__(self, msg: Optional[str] = None):
+        super().__init__()
+        self.msg = msg
+
+    def __repr__(self):
+        return f"<MessageNotAcceptable message={self.msg}>"
+
+    def __str__(self):
+        return self.__repr__()
 
 class MessageNotSupport(BaseActionFailed, TelegramAdapterException):
   pass
@@ -90,6 +107,23 @@ class NetworkError(BaseNetworkError, TelegramAdapterException):
     def __str__(self):
         return self.__repr__()
 
+class RedisUnavailable(TelegramAdapterException):
+    """
+    :说明:
+
+      redis 当前不可用，调用方应退回纯内存行为
+    """
+
+    def __init__(self, msg: Optional[str] = None):
+        super().__init__()
+        self.msg = msg
+
+    def __repr__(self):
+        return f"<RedisUnavailable message={self.msg}>"
+
+    def __str__(self):
+        return self.__repr__()
+
 class MenuHandleFailed(TelegramAdapterException):
     """
     :说明:
@@ -0,0 +1,202 @@
+"""
+API 调用拦截器
+
+拦截器包裹在 ``Adapter._call_api`` / ``_call_multipart_form_data_api`` 与实际的 HTTP 请求之间，
+用于缓存、统计、重试、限流、日志等横切功能，而不需要修改请求本身的实现。
+
+拦截器是一个协程函数 ``interceptor(request, call_next)``：可以修改 ``request``、直接返回 ``ApiResponse``
+而不调用 ``call_next``（如缓存命中）、多次调用 ``call_next``（如重试），或在其前后记录信息。
+没有注册任何拦截器时适配器直接发送请求，不会构建上下文对象。
+"""
+import time
+import importlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from .utils import log
+
+__all__ = (
+    "ApiRequest",
+    "ApiResponse",
+    "Interceptor",
+    "InterceptorChain",
+    "log_interceptor",
+    "MetricsInterceptor",
+    "load_interceptor",
+)
+
+
+class ApiRequest:
+    """
+    :说明:
+
+      一次 API 调用的请求上下文。
+
+    :参数:
+
+      * ``api: str``: API 名称（驼峰式，如 ``sendMessage``）
+      * ``data: Dict[str, Any]``: API 参数
+      * ``files: Optional[Dict[str, Any]]``: multipart 上传的文件，为 ``None`` 时以 json 发送
+      * ``bot: Any``: 发起调用的 Bot，适配器内部调用时为 ``None``
+    """
+    __slots__ = ("api", "data", "files", "bot", "attempt", "start_time", "extra")
+
+    def __init__(self, api: str, data: Dict[str, Any], files: Optional[Dict[str, Any]] = None, bot: Any = None) -> None:
+        self.api = api
+        self.data = data
+        self.files = files
+        self.bot = bot
+        self.attempt = 0
+        self.start_time = time.perf_counter()
+        self.extra: Dict[str, Any] = {}
+
+    @property
+    def multipart(self) -> bool:
+        return self.files is not None
+
+    def __repr__(self) -> str:
+        return f"<ApiRequest {self.api} attempt={self.attempt}>"
+
+
+class ApiResponse:
+    """
+    :说明:
+
+      一次 API 调用的响应上下文。
+
+    :参数:
+
+      * ``request: ApiRequest``: 对应的请求
+      * ``result: Any``: API 返回的 ``result``
+      * ``elapsed: float``: 实际 HTTP 请求耗时（秒），由缓存等直接返回时为 0
+    """
+    __slots__ = ("request", "result", "elapsed", "end_time")
+
+    def __init__(self, request: ApiRequest, result: Any, elapsed: float = 0.0) -> None:
+        self.request = request
+        self.result = result
+        self.elapsed = elapsed
+        self.end_time = time.perf_counter()
+
+    @property
+    def total_time(self) -> float:
+        """从请求创建到响应生成（含外层拦截器中的排队与重试）的耗时（秒），之后读取时不再增长"""
+        return self.end_time - self.request.start_time
+
+    def __repr__(self) -> str:
+        return f"<ApiResponse {self.request.api} elapsed={self.elapsed:.3f}s>"
+
+
+NextCall = Callable[[ApiRequest], Awaitable[ApiResponse]]
+Interceptor = Callable[[ApiRequest, NextCall], Awaitable[ApiResponse]]
+
+
+class InterceptorChain:
+    """
+    :说明:
+
+      有序的拦截器链，先注册的拦截器位于外层。
+
+    :参数:
+
+      * ``transport: NextCall``: 最内层，实际发送请求
+    """
+
+    def __init__(self, transport: NextCall) -> None:
+        self.transport = transport
+        self.interceptors: List[Interceptor] = []
+        self._handler: NextCall = transport
+
+    def __bool__(self) -> bool:
+        return bool(self.interceptors)
+
+    def add(self, interceptor: Interceptor, index: Optional[int] = None) -> Interceptor:
+        """注册拦截器，可作为装饰器使用"""
+        if index is None:
+            self.interceptors.append(interceptor)
+        else:
+            self.interceptors.insert(index, interceptor)
+        self._build()
+        return interceptor
+
+    def remove(self, interceptor: Interceptor) -> None:
+        self.interceptors.remove(interceptor)
+        self._build()
+
+    def _build(self) -> None:
+        handler = self.transport
+        for interceptor in reversed(self.interceptors):
+            handler = self._wrap(interceptor, handler)
+        self._handler = handler
+
+    @staticmethod
+    def _wrap(interceptor: Interceptor, call_next: NextCall) -> NextCall:
+        async def handler(request: ApiRequest) -> ApiResponse:
+            return await interceptor(request, call_next)
+        return handler
+
+    async def __call__(self, request: ApiRequest) -> ApiResponse:
+        return await self._handler(request)
+
+
+async def log_interceptor(request: ApiRequest, call_next: NextCall) -> ApiResponse:
+    """以 DEBUG 级别记录每次 API 调用及其耗时"""
+    try:
+        response = await call_next(request)
+    except Exception as e:
+        log("DEBUG", f"Calling API <y>{request.api}</y> failed: {e!r}")
+        raise
+    log("DEBUG", f"Calling API <y>{request.api}</y> took {response.elapsed * 1000:.1f}ms")
+    return response
+
+
+class MetricsInterceptor:
+    """按 API 统计调用次数、失败次数与耗时"""
+
+    def __init__(self) -> None:
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    async def __call__(self, request: ApiRequest, call_next: NextCall) -> ApiResponse:
+        stats = self.stats.get(request.api)
+        if stats is None:
+            stats = self.stats[request.api] = {"calls": 0, "errors": 0, "total_time": 0.0, "max_time": 0.0}
+        start = time.perf_counter()
+        try:
+            return await call_next(request)
+        except Exception:
+            stats["errors"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stats["calls"] += 1
+            stats["total_time"] += elapsed
+            stats["max_time"] = max(stats["max_time"], elapsed)
+
+    @property
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        return {
+            api: {**stats, "avg_time": stats["total_time"] / stats["calls"] if stats["calls"] else 0.0}
+            for api, stats in self.stats.items()
+        }
+
+
+# 可以在配置中直接使用名称的内置拦截器
+BUILTIN_INTERCEPTORS: Dict[str, Callable[[], Interceptor]] = {
+    "log": lambda: log_interceptor,
+    "metrics": MetricsInterceptor,
+}
+
+
+def load_interceptor(spec: Union[str, Interceptor]) -> Interceptor:
+    """
+    :说明:
+
+      根据配置加载拦截器：内置拦截器名称（``log`` / ``metrics``），或 ``module:attr`` 形式的导入路径。
+      导入得到的对象如果是类则会被实例化。
+    """
+    if not isinstance(spec, str):
+        return spec
+    if spec in BUILTIN_INTERCEPTORS:
+        return BUILTIN_INTERCEPTORS[spec]()
+    module_name, _, attr = spec.partition(":")
+    obj = getattr(importlib.import_module(module_name), attr)
+    return obj() if isinstance(obj, type) else obj
@@ -0,0 +1,99 @@
+"""
+接收相册（media group）的聚合
+
+Telegram 以共享同一 ``media_group_id`` 的多条 Update 投递一个相册。
+``MediaGroupAggregator`` 在一个短时间窗口内缓冲这些 Update，窗口结束（或凑满 10 个）后合并为一条 Update：
+以第一条消息为 ``message``，全部消息按 ``message_id`` 顺序放入 ``media_group``，解析后得到一个包含全部媒体的事件。
+"""
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from .utils import log
+
+RawUpdate = Dict[str, Any]
+
+# 一个相册最多 10 个媒体
+MAX_MEDIA_GROUP_SIZE = 10
+
+
+class MediaGroupAggregator:
+    """
+    :说明:
+
+      按 ``media_group_id`` 缓冲 Update，超时或凑满后通过 ``emit`` 回调交付合并后的 Update。
+      同时缓冲的相册数量超过 ``max_pending`` 时最早的相册会被立即交付，因此内存占用有上限。
+
+    :参数:
+
+      * ``emit: Callable[[dict], Awaitable[Any]]``: 交付合并后 Update 的回调
+      * ``window: float``: 从收到相册第一条 Update 起等待的时间（秒）
+      * ``max_pending: int``: 同时缓冲的相册数量上限
+    """
+
+    def __init__(self, emit: Callable[[RawUpdate], Awaitable[Any]], window: float = 0.8, max_pending: int = 1000) -> None:
+        self.emit = emit
+        self.window = window
+        self.max_pending = max_pending
+        self.pending: "OrderedDict[str, List[RawUpdate]]" = OrderedDict()
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats: Dict[str, int] = {"buffered": 0, "emitted": 0, "timeout_flushes": 0, "overflow_flushes": 0}
+
+    @staticmethod
+    def media_group_id(update: RawUpdate) -> Optional[str]:
+        message = update.get("message")
+        return message.get("media_group_id") if message else None
+
+    def add(self, update: RawUpdate) -> bool:
+        """属于相册的 Update 会被缓冲并返回 ``True``，其余 Update 返回 ``False``"""
+        group_id = self.media_group_id(update)
+        if group_id is None:
+            return False
+        self.stats["buffered"] += 1
+        if group_id not in self.pending:
+            while len(self.pending) >= self.max_pending:
+                self.stats["overflow_flushes"] += 1
+                self._flush(next(iter(self.pending)))
+            self.pending[group_id] = []
+            self._timers[group_id] = asyncio.get_running_loop().call_later(self.window, self._on_timeout, group_id)
+        self.pending[group_id].append(update)
+        if len(self.pending[group_id]) >= MAX_MEDIA_GROUP_SIZE:
+            self._flush(group_id)
+        return True
+
+    def _on_timeout(self, group_id: str) -> None:
+        if group_id in self.pending:
+            self.stats["timeout_flushes"] += 1
+            self._flush(group_id)
+
+    @staticmethod
+    def merge(updates: List[RawUpdate]) -> RawUpdate:
+        """合并同一相册的 Update"""
+        updates = sorted(updates, key=lambda u: u["message"]["message_id"])
+        merged = dict(updates[0])
+        merged["media_group"] = [u["message"] for u in updates]
+        return merged
+
+    def _flush(self, group_id: str) -> None:
+        updates = self.pending.pop(group_id)
+        timer = self._timers.pop(group_id, None)
+        if timer is not None:
+            timer.cancel()
+        self.stats["emitted"] += 1
+        task = asyncio.get_running_loop().create_task(self._emit(self.merge(updates)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _emit(self, update: RawUpdate) -> None:
+        try:
+            await self.emit(update)
+        except Exception as e:
+            log("ERROR", f"Failed to handle media group {update.get('update_id')}", e)
+
+    async def close(self) -> None:
+        """交付所有缓冲中的相册并等待处理完成"""
+        for group_id in list(self.pending):
+            self._flush(group_id)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -1,14 +1,15 @@
 from copy import copy
 from io import BytesIO
 from pathlib import Path
-from typing import Any, Dict, List, Type, Optional, Union, Mapping, Iterable
+from typing import Any, Dict, Iterator, List, Tuple, Type, Optional, Union, Mapping, MutableMapping, Iterable
 from base64 import b64encode
-from functools import reduce
+from functools import lru_cache, reduce
 
 from pydantic.main import BaseModel
 from nonebot.typing import overrides
 from nonebot.adapters import Message as BaseMessage, MessageSegment as BaseMessageSegment
 from .models import *
+from .compat import model_dump, model_field_names
 
 '''
 文字：{"type": "text", "data": {"text": "123"}}
@@ -21,6 +22,213 @@ reply_markup（仅发送）：{"type": "markup", "data": {"type": "inline"(现
 '''          
 
 
+# 由接收消息的实体解析得到、data["text"] 为原文片段的消息段类型
+ENTITY_SEGMENT_TYPES = frozenset(
+    t.value for t in MessageEntityType if t not in (MessageEntityType.text_mention,)
+)
+
+
+class _Deleted:
+    """标记未设置或被删除的键（SegmentData 的槽、MediaData 中的模型字段），复制 / pickle 后仍为同一对象"""
+    __slots__ = ()
+
+    def __reduce__(self) -> str:
+        return "_DELETED"
+
+
+_DELETED = _Deleted()
+
+
+@lru_cache(maxsize=None)
+def _field_names(model: Type[BaseModel]) -> Tuple[str, ...]:
+    return tuple(model_field_names(model))
+
+
+class SegmentData(MutableMapping):
+    """
+    消息段数据的紧凑表示，行为与 ``dict`` 一致。
+
+    常用键存放在 ``__slots__`` 中，其余键放入按需创建的 ``_extra`` 字典，
+    大部分消息段（纯文本、at）因此不再需要为每个段分配一个字典。
+    不存在的键对应的槽为 ``_DELETED``，读取时不需要捕获 ``AttributeError``。
+    """
+    __slots__ = ("_extra",)
+    _keys: Tuple[str, ...] = ()
+
+    def __init__(self, **kwargs: Any) -> None:
+        self._extra: Optional[Dict[str, Any]] = None
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._keys:
+            value = getattr(self, key)
+            if value is _DELETED:
+                raise KeyError(key)
+            return value
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._keys:
+            setattr(self, key, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._keys:
+            if getattr(self, key) is _DELETED:
+                raise KeyError(key)
+            setattr(self, key, _DELETED)
+            return
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._keys:
+            return getattr(self, key) is not _DELETED
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._keys:
+            if getattr(self, key) is not _DELETED:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(self.copy())
+
+    def copy(self) -> Dict[str, Any]:
+        data = {}
+        for key in self._keys:
+            value = getattr(self, key)
+            if value is not _DELETED:
+                data[key] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+
+class TextData(SegmentData):
+    """``text`` 及实体类消息段的数据"""
+    __slots__ = ("text",)
+    _keys = ("text",)
+
+    def __init__(self, text: str, **kwargs: Any) -> None:
+        self.text = text
+        super().__init__(**kwargs)
+
+
+class AtData(SegmentData):
+    """``at`` 消息段的数据，``text`` 仅在由接收消息解析得到时存在"""
+    __slots__ = ("id", "text")
+    _keys = ("id", "text")
+
+    def __init__(self, id: str, **kwargs: Any) -> None:
+        self.id = id
+        self.text = _DELETED
+        super().__init__(**kwargs)
+
+
+class MediaData(SegmentData):
+    """
+    接收到的媒体消息段（photo / document / sticker 等）的数据。
+
+    不在解析时复制模型的 ``dict()``，而是引用源模型，第一次读取时才转换，读出的内容与 ``dict()`` 一致：
+    ``data[type]`` 为 ``file_id``，模型字段均存在（未设置时为 ``None``），嵌套的模型（如 ``thumb``）为 ``dict``。
+    写入的键覆盖模型字段但不修改模型本身，需要模型对象时使用 ``model``。
+    """
+    __slots__ = ("_key", "_model", "_fields")
+
+    def __init__(self, key: str, model: BaseModel, **kwargs: Any) -> None:
+        self._key = key
+        self._model = model
+        self._fields: Optional[Dict[str, Any]] = None
+        super().__init__(**kwargs)
+
+    @property
+    def model(self) -> BaseModel:
+        """源模型"""
+        return self._model
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        """模型的 ``dict()`` 加上 ``data[type]``，第一次使用时转换并保存"""
+        if self._fields is None:
+            model = self._model
+            # pydantic v1 / v2 的字段值都保存在 __dict__ 中，比逐个 getattr 快
+            fields = dict(model.__dict__)
+            for key, value in fields.items():
+                if isinstance(value, (BaseModel, list)):
+                    fields[key] = _plain(value)
+            fields[self._key] = model.file_id
+            self._fields = fields
+        return self._fields
+
+    def overrides(self) -> Dict[str, Any]:
+        """在模型之外写入的键（如 ``caption``），发送时只使用 ``file_id`` 与这些键"""
+        if not self._extra:
+            return {}
+        return {key: value for key, value in self._extra.items() if value is not _DELETED}
+
+    def __getitem__(self, key: str) -> Any:
+        if self._extra is not None and key in self._extra:
+            value = self._extra[key]
+            if value is _DELETED:
+                raise KeyError(key)
+            return value
+        if key == self._key:
+            return self._model.file_id
+        return self.fields[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        self[key]
+        self[key] = _DELETED
+
+    def __contains__(self, key: object) -> bool:
+        if self._extra is not None and key in self._extra:
+            return self._extra[key] is not _DELETED
+        return key == self._key or key in _field_names(type(self._model))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.copy())
+
+    def __len__(self) -> int:
+        return len(self.copy())
+
+    def copy(self) -> Dict[str, Any]:
+        data = self.fields.copy()
+        if self._extra:
+            for key, value in self._extra.items():
+                if value is _DELETED:
+                    data.pop(key, None)
+                else:
+                    data[key] = value
+        return data
+
+
+def _plain(value: Any) -> Any:
+    """与 ``dict()`` 一致，嵌套的模型转换为 dict"""
+    if isinstance(value, BaseModel):
+        return model_dump(value)
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
 class MessageSegment(BaseMessageSegment["Message"]):
     """
     telegram 协议 MessageSegment 适配。
@@ -32,15 +240,17 @@ class MessageSegment(BaseMessageSegment["Message"]):
         return Message
 
     @overrides(BaseMessageSegment)
-    def __init__(self, type_: str, data: Dict[str, Any]) -> None:
+    def __init__(self, type_: str, data: MutableMapping[str, Any]) -> None:
         self.type = type_
         self.data = data
         #super().__init__(type=type_, data=data)
 
     @overrides(BaseMessageSegment) #break change
     def __str__(self) -> str:
-        if self.type == "text":
+        if self.type == "text" or self.type in ENTITY_SEGMENT_TYPES:
             return str(self.data["text"])
+        if self.type == "at" and "text" in self.data:
+            return self.data["text"]
         type_ = self.type
         data = self.data.copy()
         str_dict = {"type":type_, "data": data}
@@ -56,20 +266,17 @@ class MessageSegment(BaseMessageSegment["Message"]):
 
     @overrides(BaseMessageSegment)
     def is_text(self) -> bool:
-        return self.type == "text"
+        return self.type == "text" or self.type in ENTITY_SEGMENT_TYPES
     
     @staticmethod
     def text(text: str, **kwargs) -> "MessageSegment":
         """发送 ``text`` 类型消息"""
-        ms_dict  = {}
-        ms_dict["text"] = text
-        ms_dict.update(kwargs)
-        return MessageSegment("text", ms_dict)
+        return MessageSegment("text", TextData(text, **kwargs))
 
     @staticmethod
     def photo(photo: Union[str, bytes, BytesIO, Path], caption: str = None, obj = None, **kwargs) -> "MessageSegment":
         if obj:
-            return MessageSegment("photo", obj.dict())
+            return MessageSegment("photo", MediaData("photo", obj))
         ms_dict  = {}
         ms_photo = None
         if isinstance(photo, BytesIO):
@@ -91,7 +298,7 @@ class MessageSegment(BaseMessageSegment["Message"]):
     @staticmethod
     def audio(audio: str, caption: str = None, obj = None, **kwargs) -> "MessageSegment":
         if obj:
-            return MessageSegment("audio", obj.dict())
+            return MessageSegment("audio", MediaData("audio", obj))
         ms_dict  = {}
         ms_dict["audio"] = audio
         ms_dict.update(kwargs)
@@ -142,7 +349,7 @@ class MessageSegment(BaseMessageSegment["Message"]):
     @staticmethod
     def sticker(sticker: str, obj:Sticker = None, **kwargs) -> "MessageSegment":
         if obj:
-            return MessageSegment("sticker", obj.dict())
+            return MessageSegment("sticker", MediaData("sticker", obj))
         ms_dict  = {}
         ms_dict["sticker"] = sticker
         ms_dict.update(kwargs)
@@ -160,7 +367,7 @@ class MessageSegment(BaseMessageSegment["Message"]):
     #cqhttp兼容方法
     @staticmethod
     def at(user_id: Union[int, str]) -> "MessageSegment":
-        return MessageSegment("at", {"id": str(user_id)})
+        return MessageSegment("at", AtData(str(user_id)))
 
     #cqhttp兼容方法
     @staticmethod
@@ -187,7 +394,12 @@ class Message(BaseMessage):
 
     @overrides(BaseMessage)
     def extract_plain_text(self) -> str:
-        text = ""
+        parts = []
         for ms in self:
-            text += str(ms)
-        return text
+            data = ms.data
+            # 文本与实体消息段直接读取 text，不经过 __str__ 的类型判断
+            if type(data) is TextData and (ms.type == "text" or ms.type in ENTITY_SEGMENT_TYPES):
+                parts.append(data.text)
+            else:
+                parts.append(str(ms))
+        return "".join(parts)
@@ -0,0 +1,209 @@
+"""
+原始 Update 中间件
+
+中间件按顺序作用于 ``getUpdates`` / webhook 收到的原始 Update 字典，在构建任何模型之前运行。
+每个中间件接收 Update 字典，返回（可能改写过的）字典以继续处理，返回 ``None`` 则丢弃该 Update。
+中间件可以是普通函数或协程函数，可以通过 ``tag`` 为 Update 打标签（解析后可由 ``event.tags`` 读取），
+或通过 ``route`` 指定解析所用的事件类型。
+"""
+import time
+import inspect
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, Type, Union
+
+from .utils import log
+
+RawUpdate = Dict[str, Any]
+UpdateMiddleware = Callable[[RawUpdate], Union[Optional[RawUpdate], Awaitable[Optional[RawUpdate]]]]
+
+# Update 中由中间件写入、在解析前会被取出的保留键
+TAGS_KEY = "_tags"
+ROUTE_KEY = "_route"
+
+# 带有 chat 的 Update 字段
+CHAT_UPDATE_KEYS = ("message", "edited_message", "channel_post", "edited_channel_post",
+                    "my_chat_member", "chat_member", "chat_join_request")
+
+
+def tag(update: RawUpdate, *tags: str) -> RawUpdate:
+    """为 Update 添加标签"""
+    update.setdefault(TAGS_KEY, set()).update(tags)
+    return update
+
+
+def route(update: RawUpdate, event_type: Type[Any]) -> RawUpdate:
+    """指定 Update 解析为的事件类型，跳过适配器默认的分派逻辑"""
+    update[ROUTE_KEY] = event_type
+    return update
+
+
+def update_chat_id(update: RawUpdate) -> Optional[int]:
+    """Update 所属 chat 的 id，没有时返回 ``None``"""
+    for key in CHAT_UPDATE_KEYS:
+        if key in update:
+            return (update[key].get("chat") or {}).get("id")
+    if "callback_query" in update:
+        return ((update["callback_query"].get("message") or {}).get("chat") or {}).get("id")
+    return None
+
+
+def update_sender(update: RawUpdate) -> Optional[Dict[str, Any]]:
+    """Update 的发送者（``from``），没有时返回 ``None``"""
+    for key in ("message", "edited_message", "callback_query", "inline_query",
+                "chosen_inline_result", "my_chat_member", "chat_member", "chat_join_request"):
+        if key in update:
+            return update[key].get("from")
+    return None
+
+
+class MiddlewareStats:
+    """单个中间件的调用计数与耗时"""
+    __slots__ = ("calls", "dropped", "errors", "total_time", "max_time")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.dropped = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "total_time": self.total_time,
+            "avg_time": self.total_time / self.calls if self.calls else 0.0,
+            "max_time": self.max_time,
+        }
+
+
+class MiddlewareChain:
+    """
+    :说明:
+
+      有序的原始 Update 中间件链。中间件抛出异常时记录日志并丢弃该 Update。
+    """
+
+    def __init__(self) -> None:
+        self.middlewares: List[Tuple[str, UpdateMiddleware]] = []
+        self.stats: Dict[str, MiddlewareStats] = {}
+
+    def add(self, middleware: UpdateMiddleware, name: Optional[str] = None, index: Optional[int] = None) -> UpdateMiddleware:
+        """
+        :说明:
+
+          注册中间件，可作为装饰器使用。
+
+        :参数:
+
+          * ``middleware: UpdateMiddleware``: 中间件
+          * ``name: Optional[str]``: 名称，用于统计与移除，默认为函数名 / 类名
+          * ``index: Optional[int]``: 插入位置，默认追加到末尾
+        """
+        name = name or getattr(middleware, "__name__", None) or type(middleware).__name__
+        if name in self.stats:
+            raise ValueError(f"Middleware {name} already registered")
+        if index is None:
+            self.middlewares.append((name, middleware))
+        else:
+            self.middlewares.insert(index, (name, middleware))
+        self.stats[name] = MiddlewareStats()
+        return middleware
+
+    def remove(self, name: str) -> None:
+        self.middlewares = [(n, m) for n, m in self.middlewares if n != name]
+        self.stats.pop(name, None)
+
+    @property
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """各中间件的调用次数、丢弃次数、异常次数与耗时（秒）"""
+        return {name: self.stats[name].as_dict() for name, _ in self.middlewares}
+
+    async def run(self, update: RawUpdate) -> Optional[RawUpdate]:
+        """依次执行中间件，返回最终的 Update，被丢弃时返回 ``None``"""
+        for name, middleware in self.middlewares:
+            stats = self.stats[name]
+            start = time.perf_counter()
+            try:
+                result = middleware(update)
+                if inspect.isawaitable(result):
+                    result = await result
+            except Exception as e:
+                stats.errors += 1
+                log("ERROR", f"Update middleware {name} failed, update dropped", e)
+                result = None
+            finally:
+                elapsed = time.perf_counter() - start
+                stats.calls += 1
+                stats.total_time += elapsed
+                if elapsed > stats.max_time:
+                    stats.max_time = elapsed
+            if result is None:
+                stats.dropped += 1
+                return None
+            update = result
+        return update
+
+
+class ChatFilter:
+    """
+    :说明:
+
+      按 chat id 过滤 Update。设置了允许列表时只放行列表内的 chat；拒绝列表优先。
+      不属于任何 chat 的 Update（如 inline_query）不受影响。
+
+    :参数:
+
+      * ``allow: Optional[Iterable[int]]``: 允许的 chat id
+      * ``deny: Optional[Iterable[int]]``: 拒绝的 chat id
+    """
+
+    def __init__(self, allow: Optional[Iterable[int]] = None, deny: Optional[Iterable[int]] = None) -> None:
+        self.allow: Optional[Set[int]] = set(allow) if allow else None
+        self.deny: Set[int] = set(deny or ())
+
+    def __call__(self, update: RawUpdate) -> Optional[RawUpdate]:
+        chat_id = update_chat_id(update)
+        if chat_id is None:
+            return update
+        if chat_id in self.deny or self.allow is not None and chat_id not in self.allow:
+            return None
+        return update
+
+
+def bot_sender_filter(update: RawUpdate) -> Optional[RawUpdate]:
+    """
+    丢弃由 bot 发送的消息与 callback_query。
+
+    成员变动（``chat_member`` / ``my_chat_member``）、入群申请等 Update 的 ``from`` 是执行操作的管理员，
+    可能是 bot，这类 Update 不会被丢弃。
+    """
+    for key in ("message", "callback_query"):
+        if key in update:
+            sender = update[key].get("from")
+            return None if sender and sender.get("is_bot") else update
+    return update
+
+
+class StaleUpdateFilter:
+    """
+    :说明:
+
+      丢弃过旧的消息（例如 bot 停机期间积压的 Update），以消息的 ``date`` 判断。
+
+    :参数:
+
+      * ``max_age: float``: 允许的最大消息年龄（秒）
+    """
+
+    def __init__(self, max_age: float) -> None:
+        self.max_age = max_age
+
+    def __call__(self, update: RawUpdate) -> Optional[RawUpdate]:
+        for key in ("message", "edited_message", "channel_post", "edited_channel_post"):
+            if key in update:
+                date = update[key].get("edit_date") or update[key].get("date")
+                if date and time.time() - date > self.max_age:
+                    return None
+                break
+        return update
@@ -1,9 +1,11 @@
-from typing import Dict, List, Optional, Text, Union
+from typing import Any, Dict, List, Optional, Text, Union
 from typing_extensions import Literal
 
-from pydantic import BaseModel, root_validator
+from pydantic import BaseModel
 from enum import Enum
 
+from .compat import pre_validator, model_rebuild
+
 class MessageType(str, Enum):
     private = "private"
     group = "group"
@@ -22,6 +24,7 @@ class MessageEntityType(str, Enum):
     italic = "italic"
     underline = "underline"
     strikethrough = "strikethrough"
+    spoiler = "spoiler"
     code = "code"
     pre = "pre"
     text_link = "text_link"
@@ -50,20 +53,20 @@ class Update(BaseModel):
         chat_join_request: Optional. A request to join the chat has been sent. The bot must have the can_invite_users administrator right in the chat to receive these updates.
     '''
     update_id: "int"
-    message: Optional["MessageBody"]
-    edited_message: Optional["MessageBody"]
-    channel_post: Optional["MessageBody"]
-    edited_channel_post: Optional["MessageBody"]
-    inline_query: Optional["InlineQuery"]
-    chosen_inline_result: Optional["ChosenInlineResult"]
-    callback_query: Optional["CallbackQuery"]
-    shipping_query: Optional["ShippingQuery"]
-    pre_checkout_query: Optional["PreCheckoutQuery"]
-    poll: Optional["Poll"]
-    poll_answer: Optional["PollAnswer"]
-    my_chat_member: Optional["ChatMemberUpdated"]
-    chat_member: Optional["ChatMemberUpdated"]
-    chat_join_request: Optional["ChatJoinRequest"]
+    message: Optional["MessageBody"] = None
+    edited_message: Optional["MessageBody"] = None
+    channel_post: Optional["MessageBody"] = None
+    edited_channel_post: Optional["MessageBody"] = None
+    inline_query: Optional["InlineQuery"] = None
+    chosen_inline_result: Optional["ChosenInlineResult"] = None
+    callback_query: Optional["CallbackQuery"] = None
+    shipping_query: Optional["ShippingQuery"] = None
+    pre_checkout_query: Optional["PreCheckoutQuery"] = None
+    poll: Optional["Poll"] = None
+    poll_answer: Optional["PollAnswer"] = None
+    my_chat_member: Optional["ChatMemberUpdated"] = None
+    chat_member: Optional["ChatMemberUpdated"] = None
+    chat_join_request: Optional["ChatJoinRequest"] = None
 
 
 class User(BaseModel):
@@ -86,14 +89,14 @@ class User(BaseModel):
     id: "int"
     is_bot: "bool"
     first_name: "str"
-    last_name: Optional["str"]
-    username: Optional["str"]
-    language_code: Optional["str"]
-    is_premium: Optional["bool"]
-    added_to_attachment_menu: Optional["bool"]
-    can_join_groups: Optional["bool"]
-    can_read_all_group_messages: Optional["bool"]
-    supports_inline_queries: Optional["bool"]
+    last_name: Optional["str"] = None
+    username: Optional["str"] = None
+    language_code: Optional["str"] = None
+    is_premium: Optional["bool"] = None
+    added_to_attachment_menu: Optional["bool"] = None
+    can_join_groups: Optional["bool"] = None
+    can_read_all_group_messages: Optional["bool"] = None
+    supports_inline_queries: Optional["bool"] = None
 
 
 class Chat(BaseModel):
@@ -132,32 +135,32 @@ class Chat(BaseModel):
     '''
     id: "int"
     type: "MessageType"
-    title: Optional["str"]
-    username: Optional["str"]
-    first_name: Optional["str"]
-    last_name: Optional["str"]
-    is_forum: Optional["bool"]
-    photo: Optional["ChatPhoto"]
-    active_usernames: Optional[List["str"]]
-    emoji_status_custom_emoji_id: Optional["str"]
-    bio: Optional["str"]
-    has_private_forwards: Optional["bool"]
-    has_restricted_voice_and_video_messages: Optional["bool"]
-    join_to_send_messages: Optional["bool"]
-    join_by_request: Optional["bool"]
-    description: Optional["str"]
-    invite_link: Optional["str"]
-    pinned_message: Optional["MessageBody"]
-    permissions: Optional["ChatPermissions"]
-    slow_mode_delay: Optional["int"]
-    message_auto_delete_time: Optional["int"]
-    has_aggressive_anti_spam_enabled: Optional["bool"]
-    has_hidden_members: Optional["bool"]
-    has_protected_content: Optional["bool"]
-    sticker_set_name: Optional["str"]
-    can_set_sticker_set: Optional["bool"]
-    linked_chat_id: Optional["int"]
-    location: Optional["ChatLocation"]
+    title: Optional["str"] = None
+    username: Optional["str"] = None
+    first_name: Optional["str"] = None
+    last_name: Optional["str"] = None
+    is_forum: Optional["bool"] = None
+    photo: Optional["ChatPhoto"] = None
+    active_usernames: Optional[List["str"]] = None
+    emoji_status_custom_emoji_id: Optional["str"] = None
+    bio: Optional["str"] = None
+    has_private_forwards: Optional["bool"] = None
+    has_restricted_voice_and_video_messages: Optional["bool"] = None
+    join_to_send_messages: Optional["bool"] = None
+    join_by_request: Optional["bool"] = None
+    description: Optional["str"] = None
+    invite_link: Optional["str"] = None
+    pinned_message: Optional["MessageBody"] = None
+    permissions: Optional["ChatPermissions"] = None
+    slow_mode_delay: Optional["int"] = None
+    message_auto_delete_time: Optional["int"] = None
+    has_aggressive_anti_spam_enabled: Optional["bool"] = None
+    has_hidden_members: Optional["bool"] = None
+    has_protected_content: Optional["bool"] = None
+    sticker_set_name: Optional["str"] = None
+    can_set_sticker_set: Optional["bool"] = None
+    linked_chat_id: Optional["int"] = None
+    location: Optional["ChatLocation"] = None
 
 
 class MessageBody(BaseModel):
@@ -236,81 +239,81 @@ class MessageBody(BaseModel):
         reply_markup: Optional. Inline keyboard attached to the message. login_url buttons are represented as ordinary url buttons.
     '''
 
-    @root_validator(pre=True)
-    def gen_message(cls, values: dict):
-        if "from" in values:
-            values["from_"] = values["from"]
-            del values["from"]
+    @pre_validator
+    def gen_message(cls, values: Any):
+        if isinstance(values, dict) and "from" in values:
+            values = dict(values)
+            values["from_"] = values.pop("from")
         return values
     message_id: "int"
-    message_thread_id: Optional["int"]
-    from_: Optional["User"]
-    sender_chat: Optional["Chat"]
+    message_thread_id: Optional["int"] = None
+    from_: Optional["User"] = None
+    sender_chat: Optional["Chat"] = None
     date: "int"
     chat: "Chat"
-    forward_from: Optional["User"]
-    forward_from_chat: Optional["Chat"]
-    forward_from_message_id: Optional["int"]
-    forward_signature: Optional["str"]
-    forward_sender_name: Optional["str"]
-    forward_date: Optional["int"]
-    is_topic_message: Optional["bool"]
-    is_automatic_forward: Optional["bool"]
-    reply_to_message: Optional["MessageBody"]
-    via_bot: Optional["User"]
-    edit_date: Optional["int"]
-    has_protected_content: Optional["bool"]
-    media_group_id: Optional["str"]
-    author_signature: Optional["str"]
-    text: Optional["str"]
-    entities: Optional[List["MessageEntity"]]
-    animation: Optional["Animation"]
-    audio: Optional["Audio"]
-    document: Optional["Document"]
-    photo: Optional[List["PhotoSize"]]
-    sticker: Optional["Sticker"]
-    video: Optional["Video"]
-    video_note: Optional["VideoNote"]
-    voice: Optional["Voice"]
-    caption: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    has_media_spoiler: Optional["bool"]
-    contact: Optional["Contact"]
-    dice: Optional["Dice"]
-    game: Optional["Game"]
-    poll: Optional["Poll"]
-    venue: Optional["Venue"]
-    location: Optional["Location"]
-    new_chat_members: Optional[List["User"]]
-    left_chat_member: Optional["User"]
-    new_chat_title: Optional["str"]
-    new_chat_photo: Optional[List["PhotoSize"]]
-    delete_chat_photo: Optional["bool"]
-    group_chat_created: Optional["bool"]
-    supergroup_chat_created: Optional["bool"]
-    channel_chat_created: Optional["bool"]
-    message_auto_delete_timer_changed: Optional["MessageAutoDeleteTimerChanged"]
-    migrate_to_chat_id: Optional["int"]
-    migrate_from_chat_id: Optional["int"]
-    pinned_message: Optional["MessageBody"]
-    invoice: Optional["Invoice"]
-    successful_payment: Optional["SuccessfulPayment"]
-    connected_website: Optional["str"]
-    write_access_allowed: Optional["WriteAccessAllowed"]
-    passport_data: Optional["PassportData"]
-    proximity_alert_triggered: Optional["ProximityAlertTriggered"]
-    forum_topic_created: Optional["ForumTopicCreated"]
-    forum_topic_edited: Optional["ForumTopicEdited"]
-    forum_topic_closed: Optional["ForumTopicClosed"]
-    forum_topic_reopened: Optional["ForumTopicReopened"]
-    general_forum_topic_hidden: Optional["GeneralForumTopicHidden"]
-    general_forum_topic_unhidden: Optional["GeneralForumTopicUnhidden"]
-    video_chat_scheduled: Optional["VideoChatScheduled"]
-    video_chat_started: Optional["VideoChatStarted"]
-    video_chat_ended: Optional["VideoChatEnded"]
-    video_chat_participants_invited: Optional["VideoChatParticipantsInvited"]
-    web_app_data: Optional["WebAppData"]
-    reply_markup: Optional["InlineKeyboardMarkup"]
+    forward_from: Optional["User"] = None
+    forward_from_chat: Optional["Chat"] = None
+    forward_from_message_id: Optional["int"] = None
+    forward_signature: Optional["str"] = None
+    forward_sender_name: Optional["str"] = None
+    forward_date: Optional["int"] = None
+    is_topic_message: Optional["bool"] = None
+    is_automatic_forward: Optional["bool"] = None
+    reply_to_message: Optional["MessageBody"] = None
+    via_bot: Optional["User"] = None
+    edit_date: Optional["int"] = None
+    has_protected_content: Optional["bool"] = None
+    media_group_id: Optional["str"] = None
+    author_signature: Optional["str"] = None
+    text: Optional["str"] = None
+    entities: Optional[List["MessageEntity"]] = None
+    animation: Optional["Animation"] = None
+    audio: Optional["Audio"] = None
+    document: Optional["Document"] = None
+    photo: Optional[List["PhotoSize"]] = None
+    sticker: Optional["Sticker"] = None
+    video: Optional["Video"] = None
+    video_note: Optional["VideoNote"] = None
+    voice: Optional["Voice"] = None
+    caption: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    has_media_spoiler: Optional["bool"] = None
+    contact: Optional["Contact"] = None
+    dice: Optional["Dice"] = None
+    game: Optional["Game"] = None
+    poll: Optional["Poll"] = None
+    venue: Optional["Venue"] = None
+    location: Optional["Location"] = None
+    new_chat_members: Optional[List["User"]] = None
+    left_chat_member: Optional["User"] = None
+    new_chat_title: Optional["str"] = None
+    new_chat_photo: Optional[List["PhotoSize"]] = None
+    delete_chat_photo: Optional["bool"] = None
+    group_chat_created: Optional["bool"] = None
+    supergroup_chat_created: Optional["bool"] = None
+    channel_chat_created: Optional["bool"] = None
+    message_auto_delete_timer_changed: Optional["MessageAutoDeleteTimerChanged"] = None
+    migrate_to_chat_id: Optional["int"] = None
+    migrate_from_chat_id: Optional["int"] = None
+    pinned_message: Optional["MessageBody"] = None
+    invoice: Optional["Invoice"] = None
+    successful_payment: Optional["SuccessfulPayment"] = None
+    connected_website: Optional["str"] = None
+    write_access_allowed: Optional["WriteAccessAllowed"] = None
+    passport_data: Optional["PassportData"] = None
+    proximity_alert_triggered: Optional["ProximityAlertTriggered"] = None
+    forum_topic_created: Optional["ForumTopicCreated"] = None
+    forum_topic_edited: Optional["ForumTopicEdited"] = None
+    forum_topic_closed: Optional["ForumTopicClosed"] = None
+    forum_topic_reopened: Optional["ForumTopicReopened"] = None
+    general_forum_topic_hidden: Optional["GeneralForumTopicHidden"] = None
+    general_forum_topic_unhidden: Optional["GeneralForumTopicUnhidden"] = None
+    video_chat_scheduled: Optional["VideoChatScheduled"] = None
+    video_chat_started: Optional["VideoChatStarted"] = None
+    video_chat_ended: Optional["VideoChatEnded"] = None
+    video_chat_participants_invited: Optional["VideoChatParticipantsInvited"] = None
+    web_app_data: Optional["WebAppData"] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
 
 
 class MessageId(BaseModel):
@@ -339,10 +342,10 @@ class MessageEntity(BaseModel):
     type: "MessageEntityType"
     offset: "int"
     length: "int"
-    url: Optional["str"]
-    user: Optional["User"]
-    language: Optional["str"]
-    custom_emoji_id: Optional["str"]
+    url: Optional["str"] = None
+    user: Optional["User"] = None
+    language: Optional["str"] = None
+    custom_emoji_id: Optional["str"] = None
 
 
 class PhotoSize(BaseModel):
@@ -360,7 +363,7 @@ class PhotoSize(BaseModel):
     file_unique_id: "str"
     width: "int"
     height: "int"
-    file_size: Optional["int"]
+    file_size: Optional["int"] = None
 
 
 class Animation(BaseModel):
@@ -383,10 +386,10 @@ class Animation(BaseModel):
     width: "int"
     height: "int"
     duration: "int"
-    thumb: Optional["PhotoSize"]
-    file_name: Optional["str"]
-    mime_type: Optional["str"]
-    file_size: Optional["int"]
+    thumb: Optional["PhotoSize"] = None
+    file_name: Optional["str"] = None
+    mime_type: Optional["str"] = None
+    file_size: Optional["int"] = None
 
 
 class Audio(BaseModel):
@@ -407,12 +410,12 @@ class Audio(BaseModel):
     file_id: "str"
     file_unique_id: "str"
     duration: "int"
-    performer: Optional["str"]
-    title: Optional["str"]
-    file_name: Optional["str"]
-    mime_type: Optional["str"]
-    file_size: Optional["int"]
-    thumb: Optional["PhotoSize"]
+    performer: Optional["str"] = None
+    title: Optional["str"] = None
+    file_name: Optional["str"] = None
+    mime_type: Optional["str"] = None
+    file_size: Optional["int"] = None
+    thumb: Optional["PhotoSize"] = None
 
 
 class Document(BaseModel):
@@ -429,10 +432,10 @@ class Document(BaseModel):
     '''
     file_id: "str"
     file_unique_id: "str"
-    thumb: Optional["PhotoSize"]
-    file_name: Optional["str"]
-    mime_type: Optional["str"]
-    file_size: Optional["int"]
+    thumb: Optional["PhotoSize"] = None
+    file_name: Optional["str"] = None
+    mime_type: Optional["str"] = None
+    file_size: Optional["int"] = None
 
 
 class Video(BaseModel):
@@ -455,10 +458,10 @@ class Video(BaseModel):
     width: "int"
     height: "int"
     duration: "int"
-    thumb: Optional["PhotoSize"]
-    file_name: Optional["str"]
-    mime_type: Optional["str"]
-    file_size: Optional["int"]
+    thumb: Optional["PhotoSize"] = None
+    file_name: Optional["str"] = None
+    mime_type: Optional["str"] = None
+    file_size: Optional["int"] = None
 
 
 class VideoNote(BaseModel):
@@ -477,8 +480,8 @@ class VideoNote(BaseModel):
     file_unique_id: "str"
     length: "int"
     duration: "int"
-    thumb: Optional["PhotoSize"]
-    file_size: Optional["int"]
+    thumb: Optional["PhotoSize"] = None
+    file_size: Optional["int"] = None
 
 
 class Voice(BaseModel):
@@ -495,8 +498,8 @@ class Voice(BaseModel):
     file_id: "str"
     file_unique_id: "str"
     duration: "int"
-    mime_type: Optional["str"]
-    file_size: Optional["int"]
+    mime_type: Optional["str"] = None
+    file_size: Optional["int"] = None
 
 
 class Contact(BaseModel):
@@ -512,9 +515,9 @@ class Contact(BaseModel):
     '''
     phone_number: "str"
     first_name: "str"
-    last_name: Optional["str"]
-    user_id: Optional["int"]
-    vcard: Optional["str"]
+    last_name: Optional["str"] = None
+    user_id: Optional["int"] = None
+    vcard: Optional["str"] = None
 
 
 class Dice(BaseModel):
@@ -582,11 +585,11 @@ class Poll(BaseModel):
     is_anonymous: "bool"
     type: "str"
     allows_multiple_answers: "bool"
-    correct_option_id: Optional["int"]
-    explanation: Optional["str"]
-    explanation_entities: Optional[List["MessageEntity"]]
-    open_period: Optional["int"]
-    close_date: Optional["int"]
+    correct_option_id: Optional["int"] = None
+    explanation: Optional["str"] = None
+    explanation_entities: Optional[List["MessageEntity"]] = None
+    open_period: Optional["int"] = None
+    close_date: Optional["int"] = None
 
 
 class Location(BaseModel):
@@ -603,10 +606,10 @@ class Location(BaseModel):
     '''
     longitude: "float"
     latitude: "float"
-    horizontal_accuracy: Optional["float"]
-    live_period: Optional["int"]
-    heading: Optional["int"]
-    proximity_alert_radius: Optional["int"]
+    horizontal_accuracy: Optional["float"] = None
+    live_period: Optional["int"] = None
+    heading: Optional["int"] = None
+    proximity_alert_radius: Optional["int"] = None
 
 
 class Venue(BaseModel):
@@ -625,10 +628,10 @@ class Venue(BaseModel):
     location: "Location"
     title: "str"
     address: "str"
-    foursquare_id: Optional["str"]
-    foursquare_type: Optional["str"]
-    google_place_id: Optional["str"]
-    google_place_type: Optional["str"]
+    foursquare_id: Optional["str"] = None
+    foursquare_type: Optional["str"] = None
+    google_place_id: Optional["str"] = None
+    google_place_type: Optional["str"] = None
 
 
 class WebAppData(BaseModel):
@@ -678,7 +681,7 @@ class ForumTopicCreated(BaseModel):
     '''
     name: "str"
     icon_color: "int"
-    icon_custom_emoji_id: Optional["str"]
+    icon_custom_emoji_id: Optional["str"] = None
 
 
 class ForumTopicClosed(BaseModel):
@@ -697,8 +700,8 @@ class ForumTopicEdited(BaseModel):
         name: Optional. New name of the topic, if it was edited
         icon_custom_emoji_id: Optional. New identifier of the custom emoji shown as the topic icon, if it was edited; an empty string if the icon was removed
     '''
-    name: Optional["str"]
-    icon_custom_emoji_id: Optional["str"]
+    name: Optional["str"] = None
+    icon_custom_emoji_id: Optional["str"] = None
 
 
 class ForumTopicReopened(BaseModel):
@@ -814,11 +817,11 @@ class ReplyKeyboardMarkup(BaseModel):
         selective: Optional. Use this parameter if you want to show the keyboard to specific users only. Targets: 1) users that are @mentioned in the text of the Message object; 2) if the bot's message is a reply (has reply_to_message_id), sender of the original message.Example: A user requests to change the bot's language, bot replies to the request with a keyboard to select the new language. Other users in the group don't see the keyboard.
     '''
     keyboard: List["KeyboardButton"]
-    is_persistent: Optional["bool"]
-    resize_keyboard: Optional["bool"]
-    one_time_keyboard: Optional["bool"]
-    input_field_placeholder: Optional["str"]
-    selective: Optional["bool"]
+    is_persistent: Optional["bool"] = None
+    resize_keyboard: Optional["bool"] = None
+    one_time_keyboard: Optional["bool"] = None
+    input_field_placeholder: Optional["str"] = None
+    selective: Optional["bool"] = None
 
 
 class KeyboardButton(BaseModel):
@@ -833,10 +836,10 @@ class KeyboardButton(BaseModel):
         web_app: Optional. If specified, the described Web App will be launched when the button is pressed. The Web App will be able to send a &#8220;web_app_data&#8221; service message. Available in private chats only.
     '''
     text: "str"
-    request_contact: Optional["bool"]
-    request_location: Optional["bool"]
-    request_poll: Optional["KeyboardButtonPollType"]
-    web_app: Optional["WebAppInfo"]
+    request_contact: Optional["bool"] = None
+    request_location: Optional["bool"] = None
+    request_poll: Optional["KeyboardButtonPollType"] = None
+    web_app: Optional["WebAppInfo"] = None
 
 
 class KeyboardButtonPollType(BaseModel):
@@ -846,7 +849,7 @@ class KeyboardButtonPollType(BaseModel):
     Arguments:
         type: Optional. If quiz is passed, the user will be allowed to create only polls in the quiz mode. If regular is passed, only regular polls will be allowed. Otherwise, the user will be allowed to create a poll of any type.
     '''
-    type: Optional["str"]
+    type: Optional["str"] = None
 
 
 class ReplyKeyboardRemove(BaseModel):
@@ -858,7 +861,7 @@ class ReplyKeyboardRemove(BaseModel):
         selective: Optional. Use this parameter if you want to remove the keyboard for specific users only. Targets: 1) users that are @mentioned in the text of the Message object; 2) if the bot's message is a reply (has reply_to_message_id), sender of the original message.Example: A user votes in a poll, bot returns confirmation message in reply to the vote and removes the keyboard for that user, while still showing the keyboard with poll options to users who haven't voted yet.
     '''
     remove_keyboard: "bool"
-    selective: Optional["bool"]
+    selective: Optional["bool"] = None
 
 
 class InlineKeyboardMarkup(BaseModel):
@@ -887,14 +890,14 @@ class InlineKeyboardButton(BaseModel):
         pay: Optional. Specify True, to send a Pay button.NOTE: This type of button must always be the first button in the first row and can only be used in invoice messages.
     '''
     text: "str"
-    url: Optional["str"]
-    callback_data: Optional["str"]
-    web_app: Optional["WebAppInfo"]
-    login_url: Optional["LoginUrl"]
-    switch_inline_query: Optional["str"]
-    switch_inline_query_current_chat: Optional["str"]
-    callback_game: Optional["CallbackGame"]
-    pay: Optional["bool"]
+    url: Optional["str"] = None
+    callback_data: Optional["str"] = None
+    web_app: Optional["WebAppInfo"] = None
+    login_url: Optional["LoginUrl"] = None
+    switch_inline_query: Optional["str"] = None
+    switch_inline_query_current_chat: Optional["str"] = None
+    callback_game: Optional["CallbackGame"] = None
+    pay: Optional["bool"] = None
 
 
 class LoginUrl(BaseModel):
@@ -919,19 +922,19 @@ class CallbackQuery(BaseModel):
         game_short_name: Optional. Short name of a Game to be returned, serves as the unique identifier for the game
     '''
 
-    @root_validator(pre=True)
-    def gen_message(cls, values: dict):
-        if "from" in values:
-            values["from_"] = values["from"]
-            del values["from"]
+    @pre_validator
+    def gen_message(cls, values: Any):
+        if isinstance(values, dict) and "from" in values:
+            values = dict(values)
+            values["from_"] = values.pop("from")
         return values
     id: "str"
     from_: "User"
-    message: Optional["MessageBody"]
-    inline_message_id: Optional["str"]
+    message: Optional["MessageBody"] = None
+    inline_message_id: Optional["str"] = None
     chat_instance: "str"
-    data: Optional["str"]
-    game_short_name: Optional["str"]
+    data: Optional["str"] = None
+    game_short_name: Optional["str"] = None
 
 
 class ForceReply(BaseModel):
@@ -944,8 +947,8 @@ class ForceReply(BaseModel):
         selective: Optional. Use this parameter if you want to force reply from specific users only. Targets: 1) users that are @mentioned in the text of the Message object; 2) if the bot's message is a reply (has reply_to_message_id), sender of the original message.
     '''
     force_reply: "bool"
-    input_field_placeholder: Optional["str"]
-    selective: Optional["bool"]
+    input_field_placeholder: Optional["str"] = None
+    selective: Optional["bool"] = None
 
 
 class ChatPhoto(BaseModel):
@@ -984,10 +987,10 @@ class ChatInviteLink(BaseModel):
     creates_join_request: "bool"
     is_primary: "bool"
     is_revoked: "bool"
-    name: Optional["str"]
-    expire_date: Optional["int"]
-    member_limit: Optional["int"]
-    pending_join_request_count: Optional["int"]
+    name: Optional["str"] = None
+    expire_date: Optional["int"] = None
+    member_limit: Optional["int"] = None
+    pending_join_request_count: Optional["int"] = None
 
 
 class ChatAdministratorRights(BaseModel):
@@ -1016,10 +1019,10 @@ class ChatAdministratorRights(BaseModel):
     can_promote_members: "bool"
     can_change_info: "bool"
     can_invite_users: "bool"
-    can_post_messages: Optional["bool"]
-    can_edit_messages: Optional["bool"]
-    can_pin_messages: Optional["bool"]
-    can_manage_topics: Optional["bool"]
+    can_post_messages: Optional["bool"] = None
+    can_edit_messages: Optional["bool"] = None
+    can_pin_messages: Optional["bool"] = None
+    can_manage_topics: Optional["bool"] = None
 
 
 class ChatMember(BaseModel):
@@ -1043,7 +1046,7 @@ class ChatMemberOwner(BaseModel):
     status: "str"
     user: "User"
     is_anonymous: "bool"
-    custom_title: Optional["str"]
+    custom_title: Optional["str"] = None
 
 
 class ChatMemberAdministrator(BaseModel):
@@ -1079,11 +1082,11 @@ class ChatMemberAdministrator(BaseModel):
     can_promote_members: "bool"
     can_change_info: "bool"
     can_invite_users: "bool"
-    can_post_messages: Optional["bool"]
-    can_edit_messages: Optional["bool"]
-    can_pin_messages: Optional["bool"]
-    can_manage_topics: Optional["bool"]
-    custom_title: Optional["str"]
+    can_post_messages: Optional["bool"] = None
+    can_edit_messages: Optional["bool"] = None
+    can_pin_messages: Optional["bool"] = None
+    can_manage_topics: Optional["bool"] = None
+    custom_title: Optional["str"] = None
 
 
 class ChatMemberMember(BaseModel):
@@ -1171,18 +1174,18 @@ class ChatMemberUpdated(BaseModel):
         invite_link: Optional. Chat invite link, which was used by the user to join the chat; for joining by invite link events only.
     '''
 
-    @root_validator(pre=True)
-    def gen_message(cls, values: dict):
-        if "from" in values:
-            values["from_"] = values["from"]
-            del values["from"]
+    @pre_validator
+    def gen_message(cls, values: Any):
+        if isinstance(values, dict) and "from" in values:
+            values = dict(values)
+            values["from_"] = values.pop("from")
         return values
     chat: "Chat"
     from_: "User"
     date: "int"
     old_chat_member: "ChatMember"
     new_chat_member: "ChatMember"
-    invite_link: Optional["ChatInviteLink"]
+    invite_link: Optional["ChatInviteLink"] = None
 
 
 class ChatJoinRequest(BaseModel):
@@ -1197,17 +1200,17 @@ class ChatJoinRequest(BaseModel):
         invite_link: Optional. Chat invite link that was used by the user to send the join request
     '''
 
-    @root_validator(pre=True)
-    def gen_message(cls, values: dict):
-        if "from" in values:
-            values["from_"] = values["from"]
-            del values["from"]
+    @pre_validator
+    def gen_message(cls, values: Any):
+        if isinstance(values, dict) and "from" in values:
+            values = dict(values)
+            values["from_"] = values.pop("from")
         return values
     chat: "Chat"
     from_: "User"
     date: "int"
-    bio: Optional["str"]
-    invite_link: Optional["ChatInviteLink"]
+    bio: Optional["str"] = None
+    invite_link: Optional["ChatInviteLink"] = None
 
 
 class ChatPermissions(BaseModel):
@@ -1225,15 +1228,15 @@ class ChatPermissions(BaseModel):
         can_pin_messages: Optional. True, if the user is allowed to pin messages. Ignored in public supergroups
         can_manage_topics: Optional. True, if the user is allowed to create forum topics. If omitted defaults to the value of can_pin_messages
     '''
-    can_send_messages: Optional["bool"]
-    can_send_media_messages: Optional["bool"]
-    can_send_polls: Optional["bool"]
-    can_send_other_messages: Optional["bool"]
-    can_add_web_page_previews: Optional["bool"]
-    can_change_info: Optional["bool"]
-    can_invite_users: Optional["bool"]
-    can_pin_messages: Optional["bool"]
-    can_manage_topics: Optional["bool"]
+    can_send_messages: Optional["bool"] = None
+    can_send_media_messages: Optional["bool"] = None
+    can_send_polls: Optional["bool"] = None
+    can_send_other_messages: Optional["bool"] = None
+    can_add_web_page_previews: Optional["bool"] = None
+    can_change_info: Optional["bool"] = None
+    can_invite_users: Optional["bool"] = None
+    can_pin_messages: Optional["bool"] = None
+    can_manage_topics: Optional["bool"] = None
 
 
 class ChatLocation(BaseModel):
@@ -1261,7 +1264,7 @@ class ForumTopic(BaseModel):
     message_thread_id: "int"
     name: "str"
     icon_color: "int"
-    icon_custom_emoji_id: Optional["str"]
+    icon_custom_emoji_id: Optional["str"] = None
 
 
 class BotCommand(BaseModel):
@@ -1412,8 +1415,8 @@ class ResponseParameters(BaseModel):
         migrate_to_chat_id: Optional. The group has been migrated to a supergroup with the specified identifier. This number may have more than 32 significant bits and some programming languages may have difficulty/silent defects in interpreting it. But it has at most 52 significant bits, so a signed 64-bit integer or double-precision float type are safe for storing this identifier.
         retry_after: Optional. In case of exceeding flood control, the number of seconds left to wait before the request can be repeated
     '''
-    migrate_to_chat_id: Optional["int"]
-    retry_after: Optional["int"]
+    migrate_to_chat_id: Optional["int"] = None
+    retry_after: Optional["int"] = None
 
 
 class InputMedia(BaseModel):
@@ -1438,10 +1441,10 @@ class InputMediaPhoto(BaseModel):
     '''
     type: "str"
     media: "str"
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    has_spoiler: Optional["bool"]
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    has_spoiler: Optional["bool"] = None
 
 
 class InputMediaVideo(BaseModel):
@@ -1463,15 +1466,15 @@ class InputMediaVideo(BaseModel):
     '''
     type: "str"
     media: "str"
-    thumb: Optional["str"]
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    width: Optional["int"]
-    height: Optional["int"]
-    duration: Optional["int"]
-    supports_streaming: Optional["bool"]
-    has_spoiler: Optional["bool"]
+    thumb: Optional["str"] = None
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    width: Optional["int"] = None
+    height: Optional["int"] = None
+    duration: Optional["int"] = None
+    supports_streaming: Optional["bool"] = None
+    has_spoiler: Optional["bool"] = None
 
 
 class InputMediaAnimation(BaseModel):
@@ -1492,14 +1495,14 @@ class InputMediaAnimation(BaseModel):
     '''
     type: "str"
     media: "str"
-    thumb: Optional["str"]
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    width: Optional["int"]
-    height: Optional["int"]
-    duration: Optional["int"]
-    has_spoiler: Optional["bool"]
+    thumb: Optional["str"] = None
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    width: Optional["int"] = None
+    height: Optional["int"] = None
+    duration: Optional["int"] = None
+    has_spoiler: Optional["bool"] = None
 
 
 class InputMediaAudio(BaseModel):
@@ -1519,13 +1522,13 @@ class InputMediaAudio(BaseModel):
     '''
     type: "str"
     media: "str"
-    thumb: Optional["str"]
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    duration: Optional["int"]
-    performer: Optional["str"]
-    title: Optional["str"]
+    thumb: Optional["str"] = None
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    duration: Optional["int"] = None
+    performer: Optional["str"] = None
+    title: Optional["str"] = None
 
 
 class InputMediaDocument(BaseModel):
@@ -1543,11 +1546,11 @@ class InputMediaDocument(BaseModel):
     '''
     type: "str"
     media: "str"
-    thumb: Optional["str"]
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    disable_content_type_detection: Optional["bool"]
+    thumb: Optional["str"] = None
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    disable_content_type_detection: Optional["bool"] = None
 
 
 class InputFile(BaseModel):
@@ -1585,13 +1588,13 @@ class Sticker(BaseModel):
     height: "int"
     is_animated: "bool"
     is_video: "bool"
-    thumb: Optional["PhotoSize"]
-    emoji: Optional["str"]
-    set_name: Optional["str"]
-    premium_animation: Optional["File"]
-    mask_position: Optional["MaskPosition"]
-    custom_emoji_id: Optional["str"]
-    file_size: Optional["int"]
+    thumb: Optional["PhotoSize"] = None
+    emoji: Optional["str"] = None
+    set_name: Optional["str"] = None
+    premium_animation: Optional["File"] = None
+    mask_position: Optional["MaskPosition"] = None
+    custom_emoji_id: Optional["str"] = None
+    file_size: Optional["int"] = None
 
 
 class StickerSet(BaseModel):
@@ -1613,7 +1616,7 @@ class StickerSet(BaseModel):
     is_animated: "bool"
     is_video: "bool"
     stickers: List["Sticker"]
-    thumb: Optional["PhotoSize"]
+    thumb: Optional["PhotoSize"] = None
 
 
 class MaskPosition(BaseModel):
@@ -1645,18 +1648,18 @@ class InlineQuery(BaseModel):
         location: Optional. Sender location, only for bots that request user location
     '''
 
-    @root_validator(pre=True)
-    def gen_message(cls, values: dict):
-        if "from" in values:
-            values["from_"] = values["from"]
-            del values["from"]
+    @pre_validator
+    def gen_message(cls, values: Any):
+        if isinstance(values, dict) and "from" in values:
+            values = dict(values)
+            values["from_"] = values.pop("from")
         return values
     id: "str"
     from_: "User"
     query: "str"
     offset: "str"
-    chat_type: Optional["str"]
-    location: Optional["Location"]
+    chat_type: Optional["str"] = None
+    location: Optional["Location"] = None
 
 
 class InlineQueryResult(BaseModel):
@@ -1688,13 +1691,13 @@ class InlineQueryResultArticle(BaseModel):
     id: "str"
     title: "str"
     input_message_content: "InputMessageContent"
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    url: Optional["str"]
-    hide_url: Optional["bool"]
-    description: Optional["str"]
-    thumb_url: Optional["str"]
-    thumb_width: Optional["int"]
-    thumb_height: Optional["int"]
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    url: Optional["str"] = None
+    hide_url: Optional["bool"] = None
+    description: Optional["str"] = None
+    thumb_url: Optional["str"] = None
+    thumb_width: Optional["int"] = None
+    thumb_height: Optional["int"] = None
 
 
 class InlineQueryResultPhoto(BaseModel):
@@ -1720,15 +1723,15 @@ class InlineQueryResultPhoto(BaseModel):
     id: "str"
     photo_url: "str"
     thumb_url: "str"
-    photo_width: Optional["int"]
-    photo_height: Optional["int"]
-    title: Optional["str"]
-    description: Optional["str"]
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
+    photo_width: Optional["int"] = None
+    photo_height: Optional["int"] = None
+    title: Optional["str"] = None
+    description: Optional["str"] = None
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
 
 
 class InlineQueryResultGif(BaseModel):
@@ -1754,17 +1757,17 @@ class InlineQueryResultGif(BaseModel):
     type: "str"
     id: "str"
     gif_url: "str"
-    gif_width: Optional["int"]
-    gif_height: Optional["int"]
-    gif_duration: Optional["int"]
+    gif_width: Optional["int"] = None
+    gif_height: Optional["int"] = None
+    gif_duration: Optional["int"] = None
     thumb_url: "str"
-    thumb_mime_type: Optional["str"]
-    title: Optional["str"]
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
+    thumb_mime_type: Optional["str"] = None
+    title: Optional["str"] = None
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
 
 
 class InlineQueryResultMpeg4Gif(BaseModel):
@@ -1790,17 +1793,17 @@ class InlineQueryResultMpeg4Gif(BaseModel):
     type: "str"
     id: "str"
     mpeg4_url: "str"
-    mpeg4_width: Optional["int"]
-    mpeg4_height: Optional["int"]
-    mpeg4_duration: Optional["int"]
+    mpeg4_width: Optional["int"] = None
+    mpeg4_height: Optional["int"] = None
+    mpeg4_duration: Optional["int"] = None
     thumb_url: "str"
-    thumb_mime_type: Optional["str"]
-    title: Optional["str"]
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
+    thumb_mime_type: Optional["str"] = None
+    title: Optional["str"] = None
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
 
 
 class InlineQueryResultVideo(BaseModel):
@@ -1832,13 +1835,13 @@ class InlineQueryResultAudio(BaseModel):
     id: "str"
     audio_url: "str"
     title: "str"
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    performer: Optional["str"]
-    audio_duration: Optional["int"]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    performer: Optional["str"] = None
+    audio_duration: Optional["int"] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
 
 
 class InlineQueryResultVoice(BaseModel):
@@ -1861,12 +1864,12 @@ class InlineQueryResultVoice(BaseModel):
     id: "str"
     voice_url: "str"
     title: "str"
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    voice_duration: Optional["int"]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    voice_duration: Optional["int"] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
 
 
 class InlineQueryResultDocument(BaseModel):
@@ -1892,17 +1895,17 @@ class InlineQueryResultDocument(BaseModel):
     type: "str"
     id: "str"
     title: "str"
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
     document_url: "str"
     mime_type: "str"
-    description: Optional["str"]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
-    thumb_url: Optional["str"]
-    thumb_width: Optional["int"]
-    thumb_height: Optional["int"]
+    description: Optional["str"] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
+    thumb_url: Optional["str"] = None
+    thumb_width: Optional["int"] = None
+    thumb_height: Optional["int"] = None
 
 
 class InlineQueryResultLocation(BaseModel):
@@ -1930,15 +1933,15 @@ class InlineQueryResultLocation(BaseModel):
     latitude: "float"
     longitude: "float"
     title: "str"
-    horizontal_accuracy: Optional["float"]
-    live_period: Optional["int"]
-    heading: Optional["int"]
-    proximity_alert_radius: Optional["int"]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
-    thumb_url: Optional["str"]
-    thumb_width: Optional["int"]
-    thumb_height: Optional["int"]
+    horizontal_accuracy: Optional["float"] = None
+    live_period: Optional["int"] = None
+    heading: Optional["int"] = None
+    proximity_alert_radius: Optional["int"] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
+    thumb_url: Optional["str"] = None
+    thumb_width: Optional["int"] = None
+    thumb_height: Optional["int"] = None
 
 
 class InlineQueryResultVenue(BaseModel):
@@ -1968,15 +1971,15 @@ class InlineQueryResultVenue(BaseModel):
     longitude: "float"
     title: "str"
     address: "str"
-    foursquare_id: Optional["str"]
-    foursquare_type: Optional["str"]
-    google_place_id: Optional["str"]
-    google_place_type: Optional["str"]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
-    thumb_url: Optional["str"]
-    thumb_width: Optional["int"]
-    thumb_height: Optional["int"]
+    foursquare_id: Optional["str"] = None
+    foursquare_type: Optional["str"] = None
+    google_place_id: Optional["str"] = None
+    google_place_type: Optional["str"] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
+    thumb_url: Optional["str"] = None
+    thumb_width: Optional["int"] = None
+    thumb_height: Optional["int"] = None
 
 
 class InlineQueryResultContact(BaseModel):
@@ -2000,13 +2003,13 @@ class InlineQueryResultContact(BaseModel):
     id: "str"
     phone_number: "str"
     first_name: "str"
-    last_name: Optional["str"]
-    vcard: Optional["str"]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
-    thumb_url: Optional["str"]
-    thumb_width: Optional["int"]
-    thumb_height: Optional["int"]
+    last_name: Optional["str"] = None
+    vcard: Optional["str"] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
+    thumb_url: Optional["str"] = None
+    thumb_width: Optional["int"] = None
+    thumb_height: Optional["int"] = None
 
 
 class InlineQueryResultGame(BaseModel):
@@ -2022,7 +2025,7 @@ class InlineQueryResultGame(BaseModel):
     type: "str"
     id: "str"
     game_short_name: "str"
-    reply_markup: Optional["InlineKeyboardMarkup"]
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
 
 
 class InlineQueryResultCachedPhoto(BaseModel):
@@ -2044,13 +2047,13 @@ class InlineQueryResultCachedPhoto(BaseModel):
     type: "str"
     id: "str"
     photo_file_id: "str"
-    title: Optional["str"]
-    description: Optional["str"]
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
+    title: Optional["str"] = None
+    description: Optional["str"] = None
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
 
 
 class InlineQueryResultCachedGif(BaseModel):
@@ -2071,12 +2074,12 @@ class InlineQueryResultCachedGif(BaseModel):
     type: "str"
     id: "str"
     gif_file_id: "str"
-    title: Optional["str"]
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
+    title: Optional["str"] = None
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
 
 
 class InlineQueryResultCachedMpeg4Gif(BaseModel):
@@ -2097,12 +2100,12 @@ class InlineQueryResultCachedMpeg4Gif(BaseModel):
     type: "str"
     id: "str"
     mpeg4_file_id: "str"
-    title: Optional["str"]
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
+    title: Optional["str"] = None
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
 
 
 class InlineQueryResultCachedSticker(BaseModel):
@@ -2119,8 +2122,8 @@ class InlineQueryResultCachedSticker(BaseModel):
     type: "str"
     id: "str"
     sticker_file_id: "str"
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
 
 
 class InlineQueryResultCachedDocument(BaseModel):
@@ -2143,12 +2146,12 @@ class InlineQueryResultCachedDocument(BaseModel):
     id: "str"
     title: "str"
     document_file_id: "str"
-    description: Optional["str"]
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
+    description: Optional["str"] = None
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
 
 
 class InlineQueryResultCachedVideo(BaseModel):
@@ -2171,12 +2174,12 @@ class InlineQueryResultCachedVideo(BaseModel):
     id: "str"
     video_file_id: "str"
     title: "str"
-    description: Optional["str"]
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
+    description: Optional["str"] = None
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
 
 
 class InlineQueryResultCachedVoice(BaseModel):
@@ -2198,11 +2201,11 @@ class InlineQueryResultCachedVoice(BaseModel):
     id: "str"
     voice_file_id: "str"
     title: "str"
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
 
 
 class InlineQueryResultCachedAudio(BaseModel):
@@ -2222,11 +2225,11 @@ class InlineQueryResultCachedAudio(BaseModel):
     type: "str"
     id: "str"
     audio_file_id: "str"
-    caption: Optional["str"]
-    parse_mode: Optional["str"]
-    caption_entities: Optional[List["MessageEntity"]]
-    reply_markup: Optional["InlineKeyboardMarkup"]
-    input_message_content: Optional["InputMessageContent"]
+    caption: Optional["str"] = None
+    parse_mode: Optional["str"] = None
+    caption_entities: Optional[List["MessageEntity"]] = None
+    reply_markup: Optional["InlineKeyboardMarkup"] = None
+    input_message_content: Optional["InputMessageContent"] = None
 
 
 class InputMessageContent(BaseModel):
@@ -2248,9 +2251,9 @@ class InputTextMessageContent(BaseModel):
         disable_web_page_preview: Optional. Disables link previews for links in the sent message
     '''
     message_text: "str"
-    parse_mode: Optional["str"]
-    entities: Optional[List["MessageEntity"]]
-    disable_web_page_preview: Optional["bool"]
+    parse_mode: Optional["str"] = None
+    entities: Optional[List["MessageEntity"]] = None
+    disable_web_page_preview: Optional["bool"] = None
 
 
 class InputLocationMessageContent(BaseModel):
@@ -2267,10 +2270,10 @@ class InputLocationMessageContent(BaseModel):
     '''
     latitude: "float"
     longitude: "float"
-    horizontal_accuracy: Optional["float"]
-    live_period: Optional["int"]
-    heading: Optional["int"]
-    proximity_alert_radius: Optional["int"]
+    horizontal_accuracy: Optional["float"] = None
+    live_period: Optional["int"] = None
+    heading: Optional["int"] = None
+    proximity_alert_radius: Optional["int"] = None
 
 
 class InputVenueMessageContent(BaseModel):
@@ -2291,10 +2294,10 @@ class InputVenueMessageContent(BaseModel):
     longitude: "float"
     title: "str"
     address: "str"
-    foursquare_id: Optional["str"]
-    foursquare_type: Optional["str"]
-    google_place_id: Optional["str"]
-    google_place_type: Optional["str"]
+    foursquare_id: Optional["str"] = None
+    foursquare_type: Optional["str"] = None
+    google_place_id: Optional["str"] = None
+    google_place_type: Optional["str"] = None
 
 
 class InputContactMessageContent(BaseModel):
@@ -2309,8 +2312,8 @@ class InputContactMessageContent(BaseModel):
     '''
     phone_number: "str"
     first_name: "str"
-    last_name: Optional["str"]
-    vcard: Optional["str"]
+    last_name: Optional["str"] = None
+    vcard: Optional["str"] = None
 
 
 class InputInvoiceMessageContent(BaseModel):
@@ -2345,20 +2348,20 @@ class InputInvoiceMessageContent(BaseModel):
     provider_token: "str"
     currency: "str"
     prices: List["LabeledPrice"]
-    max_tip_amount: Optional["int"]
-    suggested_tip_amounts: Optional[List["int"]]
-    provider_data: Optional["str"]
-    photo_url: Optional["str"]
-    photo_size: Optional["int"]
-    photo_width: Optional["int"]
-    photo_height: Optional["int"]
-    need_name: Optional["bool"]
-    need_phone_number: Optional["bool"]
-    need_email: Optional["bool"]
-    need_shipping_address: Optional["bool"]
-    send_phone_number_to_provider: Optional["bool"]
-    send_email_to_provider: Optional["bool"]
-    is_flexible: Optional["bool"]
+    max_tip_amount: Optional["int"] = None
+    suggested_tip_amounts: Optional[List["int"]] = None
+    provider_data: Optional["str"] = None
+    photo_url: Optional["str"] = None
+    photo_size: Optional["int"] = None
+    photo_width: Optional["int"] = None
+    photo_height: Optional["int"] = None
+    need_name: Optional["bool"] = None
+    need_phone_number: Optional["bool"] = None
+    need_email: Optional["bool"] = None
+    need_shipping_address: Optional["bool"] = None
+    send_phone_number_to_provider: Optional["bool"] = None
+    send_email_to_provider: Optional["bool"] = None
+    is_flexible: Optional["bool"] = None
 
 
 class ChosenInlineResult(BaseModel):
@@ -2373,16 +2376,16 @@ class ChosenInlineResult(BaseModel):
         query: The query that was used to obtain the result
     '''
 
-    @root_validator(pre=True)
-    def gen_message(cls, values: dict):
-        if "from" in values:
-            values["from_"] = values["from"]
-            del values["from"]
+    @pre_validator
+    def gen_message(cls, values: Any):
+        if isinstance(values, dict) and "from" in values:
+            values = dict(values)
+            values["from_"] = values.pop("from")
         return values
     result_id: "str"
     from_: "User"
-    location: Optional["Location"]
-    inline_message_id: Optional["str"]
+    location: Optional["Location"] = None
+    inline_message_id: Optional["str"] = None
     query: "str"
 
 
@@ -2393,7 +2396,7 @@ class SentWebAppMessage(BaseModel):
     Arguments:
         inline_message_id: Optional. Identifier of the sent inline message. Available only if there is an inline keyboard attached to the message.
     '''
-    inline_message_id: Optional["str"]
+    inline_message_id: Optional["str"] = None
 
 
 class LabeledPrice(BaseModel):
@@ -2456,10 +2459,10 @@ class OrderInfo(BaseModel):
         email: Optional. User email
         shipping_address: Optional. User shipping address
     '''
-    name: Optional["str"]
-    phone_number: Optional["str"]
-    email: Optional["str"]
-    shipping_address: Optional["ShippingAddress"]
+    name: Optional["str"] = None
+    phone_number: Optional["str"] = None
+    email: Optional["str"] = None
+    shipping_address: Optional["ShippingAddress"] = None
 
 
 class ShippingOption(BaseModel):
@@ -2492,8 +2495,8 @@ class SuccessfulPayment(BaseModel):
     currency: "str"
     total_amount: "int"
     invoice_payload: "str"
-    shipping_option_id: Optional["str"]
-    order_info: Optional["OrderInfo"]
+    shipping_option_id: Optional["str"] = None
+    order_info: Optional["OrderInfo"] = None
     telegram_payment_charge_id: "str"
     provider_payment_charge_id: "str"
 
@@ -2509,11 +2512,11 @@ class ShippingQuery(BaseModel):
         shipping_address: User specified shipping address
     '''
 
-    @root_validator(pre=True)
-    def gen_message(cls, values: dict):
-        if "from" in values:
-            values["from_"] = values["from"]
-            del values["from"]
+    @pre_validator
+    def gen_message(cls, values: Any):
+        if isinstance(values, dict) and "from" in values:
+            values = dict(values)
+            values["from_"] = values.pop("from")
         return values
     id: "str"
     from_: "User"
@@ -2535,19 +2538,19 @@ class PreCheckoutQuery(BaseModel):
         order_info: Optional. Order information provided by the user
     '''
 
-    @root_validator(pre=True)
-    def gen_message(cls, values: dict):
-        if "from" in values:
-            values["from_"] = values["from"]
-            del values["from"]
+    @pre_validator
+    def gen_message(cls, values: Any):
+        if isinstance(values, dict) and "from" in values:
+            values = dict(values)
+            values["from_"] = values.pop("from")
         return values
     id: "str"
     from_: "User"
     currency: "str"
     total_amount: "int"
     invoice_payload: "str"
-    shipping_option_id: Optional["str"]
-    order_info: Optional["OrderInfo"]
+    shipping_option_id: Optional["str"] = None
+    order_info: Optional["OrderInfo"] = None
 
 
 class PassportData(BaseModel):
@@ -2595,14 +2598,14 @@ class EncryptedPassportElement(BaseModel):
         hash: Base64-encoded element hash for using in PassportElementErrorUnspecified
     '''
     type: "str"
-    data: Optional["str"]
-    phone_number: Optional["str"]
-    email: Optional["str"]
-    files: Optional[List["PassportFile"]]
-    front_side: Optional["PassportFile"]
-    reverse_side: Optional["PassportFile"]
-    selfie: Optional["PassportFile"]
-    translation: Optional[List["PassportFile"]]
+    data: Optional["str"] = None
+    phone_number: Optional["str"] = None
+    email: Optional["str"] = None
+    files: Optional[List["PassportFile"]] = None
+    front_side: Optional["PassportFile"] = None
+    reverse_side: Optional["PassportFile"] = None
+    selfie: Optional["PassportFile"] = None
+    translation: Optional[List["PassportFile"]] = None
     hash: "str"
 
 
@@ -2789,9 +2792,9 @@ class Game(BaseModel):
     title: "str"
     description: "str"
     photo: List["PhotoSize"]
-    text: Optional["str"]
-    text_entities: Optional[List["MessageEntity"]]
-    animation: Optional["Animation"]
+    text: Optional["str"] = None
+    text_entities: Optional[List["MessageEntity"]] = None
+    animation: Optional["Animation"] = None
 
 
 class CallbackGame(BaseModel):
@@ -2815,8 +2818,8 @@ class GameHighScore(BaseModel):
     user: "User"
     score: "int"
 
-Update.update_forward_refs()
-Chat.update_forward_refs()
-MessageBody.update_forward_refs()
-InlineKeyboardButton.update_forward_refs()
-InlineKeyboardMarkup.update_forward_refs()
\ No newline at end of file
+model_rebuild(Update)
+model_rebuild(Chat)
+model_rebuild(MessageBody)
+model_rebuild(InlineKeyboardButton)
+model_rebuild(InlineKeyboardMarkup)
\ No newline at end of file
@@ -0,0 +1,185 @@
+"""
+发送图片的预处理
+
+超出 Telegram 照片限制（10 MB、宽高之和超过 10000、宽高比超过 20）的图片要在上传完成后才会被拒绝。
+``PhotoPreprocessor`` 在发送前根据文件头检查需要上传的 photo，把超限的图片在进程池中缩小并重新压缩为 JPEG，
+编码不会阻塞事件循环；处理结果按来源的指纹缓存。缩小无法满足限制（宽高比过大）的图片改为以 document 发送。
+
+缩小与压缩需要安装 Pillow，未安装时超限的图片都以 document 发送。
+"""
+import os
+import base64
+import asyncio
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional, Tuple, Union
+
+from .album import local_path, media_fingerprint
+from .cache import MISSING, LRUCache
+from .message import MessageSegment
+from .sniff import HEADER_SIZE, IMAGE_KINDS, PHOTO_MAX_SIZE, image_size, peek, sniff
+from .utils import log
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = ImageOps = None
+
+# 照片宽高之和与宽高比的上限
+PHOTO_MAX_DIMENSIONS = 10000
+PHOTO_MAX_RATIO = 20
+# 检查尺寸时先读取的长度；JPEG 的 SOF 段在 EXIF 等段之后，不在其中时最多读取到 SIZE_HEADER_SIZE
+SIZE_PROBE_SIZE = 4 * 1024
+SIZE_HEADER_SIZE = 64 * 1024
+# 压缩后仍超出大小时逐步降低质量，低于该值后改为继续缩小
+MIN_QUALITY = 60
+
+
+def photo_fits(size: int, dimensions: Optional[Tuple[int, int]], max_size: int = PHOTO_MAX_SIZE) -> bool:
+    """图片是否满足照片的大小与尺寸限制，尺寸未知时只检查大小"""
+    if size > max_size:
+        return False
+    if dimensions is None:
+        return True
+    width, height = dimensions
+    return width + height <= PHOTO_MAX_DIMENSIONS and max(width, height) <= PHOTO_MAX_RATIO * min(width, height)
+
+
+def shrink_photo(source: Union[str, bytes], max_side: int, quality: int, max_size: int) -> Optional[bytes]:
+    """
+    :说明:
+
+      把图片缩小到最长边不超过 ``max_side`` 且宽高之和不超过 10000，去掉透明通道后压缩为 JPEG；
+      超出 ``max_size`` 时先降低质量再继续缩小。宽高比超过 20 的图片无法通过缩小满足限制，返回 ``None``。
+      在进程池中执行。
+
+    :参数:
+
+      * ``source: Union[str, bytes]``: 本地文件路径、``base64://`` 链接或图片内容
+      * ``max_side: int``: 最长边（像素）
+      * ``quality: int``: JPEG 质量
+      * ``max_size: int``: 最大字节数
+    """
+    if isinstance(source, str) and source.startswith("base64://"):
+        source = base64.b64decode(source[len("base64://"):])
+    with Image.open(source if isinstance(source, str) else BytesIO(source)) as image:
+        image = ImageOps.exif_transpose(image)
+        width, height = image.size
+        if max(width, height) > PHOTO_MAX_RATIO * min(width, height):
+            return None
+        if image.mode != "RGB":
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel("A"))
+        scale = min(1.0, max_side / max(width, height), PHOTO_MAX_DIMENSIONS / (width + height))
+        while True:
+            size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            resized = image.resize(size, Image.LANCZOS) if size != image.size else image
+            q = quality
+            while True:
+                buffer = BytesIO()
+                resized.save(buffer, "JPEG", quality=q, optimize=True)
+                if buffer.tell() <= max_size or q <= MIN_QUALITY:
+                    break
+                q -= 10
+            if buffer.tell() <= max_size:
+                return buffer.getvalue()
+            scale *= 0.75
+
+
+class PhotoPreprocessor:
+    """
+    :说明:
+
+      发送前检查需要上传的 photo 消息段，超出照片限制时替换为缩小后的 JPEG 或改为 document。
+      满足限制的图片只读取文件头检查，不会进入进程池。
+
+    :参数:
+
+      * ``max_side: int``: 缩小后的最长边（像素）
+      * ``quality: int``: JPEG 质量
+      * ``max_size: int``: 缩小后的最大字节数，不超过 10 MB
+      * ``workers: Optional[int]``: 进程数，为 ``None`` 时与 CPU 数相同
+      * ``cache_bytes: int``: 处理结果缓存的总大小（字节）
+    """
+
+    def __init__(self,
+                 max_side: int = 2560,
+                 quality: int = 90,
+                 max_size: int = PHOTO_MAX_SIZE,
+                 workers: Optional[int] = 2,
+                 cache_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_side = max_side
+        self.quality = quality
+        self.max_size = min(max_size, PHOTO_MAX_SIZE)
+        self.workers = workers
+        # 值为处理后的内容，无法缩小为照片时为 None
+        self.cache = LRUCache(maxsize=1024, maxbytes=cache_bytes, sizeof=lambda value: len(value) if value else 0)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        if Image is None:
+            log("WARNING", "Pillow is not installed, oversized photos will be sent as documents")
+
+    async def process(self, ms: MessageSegment) -> MessageSegment:
+        """返回可以直接发送的消息段，不需要处理时原样返回"""
+        if ms.type != "photo":
+            return ms
+        source = ms.data["photo"]
+        key = self._check(source)
+        if key is None:
+            return ms
+        result = self.cache.get(key)
+        if result is MISSING:
+            result = await self._shrink(source)
+            self.cache.set(key, result)
+        if result is None:
+            fields = dict(ms.data)
+            fields["document"] = fields.pop("photo")
+            return MessageSegment("document", fields)
+        fields = dict(ms.data, photo=result)
+        if fields.get("file_name"):
+            fields["file_name"] = os.path.splitext(fields["file_name"])[0] + ".jpg"
+        return MessageSegment("photo", fields)
+
+    def _check(self, source: Any) -> Optional[str]:
+        """
+        超出照片限制的图片返回缓存 key，其余返回 ``None``。
+        只读取（base64 只解码）文件头，大小由文件信息或长度得到，满足限制的图片不会被完整读取或计算指纹
+        """
+        head, size = peek(source, SIZE_PROBE_SIZE)
+        if head is None:
+            return None
+        kind = sniff(head[:HEADER_SIZE])
+        if kind not in IMAGE_KINDS:
+            return None
+        dimensions = image_size(head, kind)
+        if dimensions is None and len(head) == SIZE_PROBE_SIZE:
+            head, _ = peek(source, SIZE_HEADER_SIZE)
+            dimensions = image_size(head, kind)
+        if photo_fits(size, dimensions):
+            return None
+        return media_fingerprint(source)
+
+    async def _shrink(self, source: Any) -> Optional[bytes]:
+        if Image is None:
+            return None
+        # base64 在进程池中解码
+        if isinstance(source, str) and source.startswith("file:///"):
+            data: Union[str, bytes] = local_path(source)
+        elif isinstance(source, str):
+            data = source
+        else:
+            data = source.getvalue() if isinstance(source, BytesIO) else bytes(source)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, shrink_photo, data, self.max_side, self.quality, self.max_size)
+        except Exception as e:
+            log("ERROR", "Preprocessing photo failed, sending it as a document", e)
+            return None
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
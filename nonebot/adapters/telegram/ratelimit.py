@@ -0,0 +1,134 @@
+"""
+发送限流
+
+Telegram 对发送消息有频率限制（全局约 30 条/秒，单个私聊约 1 条/秒，单个群约 20 条/分钟），
+超出后返回 429 与 ``retry_after``。``RateLimiter`` 作为 API 拦截器在发送前按令牌桶排队，
+并在收到 429 时等待 ``retry_after`` 后重试。
+"""
+import time
+import asyncio
+from typing import Any, Dict, Optional
+
+from .cache import LRUCache, MISSING
+from .exception import ActionFailed
+from .interceptor import ApiRequest, ApiResponse, NextCall
+
+# 受限流的 API 前缀，编辑消息与发送计入同一限额
+RATE_LIMITED_PREFIXES = ("send", "forward", "copy", "editMessage")
+
+
+class TokenBucket:
+    """
+    :说明:
+
+      预约式令牌桶：``reserve`` 立即扣除令牌并返回需要等待的秒数，令牌可以为负（表示排队中），
+      因此并发调用无需加锁即可按顺序排队。
+
+    :参数:
+
+      * ``rate: float``: 每秒补充的令牌数
+      * ``capacity: float``: 桶容量，即允许的突发数量
+    """
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, cost: float = 1, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= cost
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def pause(self, seconds: float, now: Optional[float] = None) -> None:
+        """收到 429 后，让之后的预约至少等待 ``seconds`` 秒"""
+        self.reserve(0, now)
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class RateLimiter:
+    """
+    :说明:
+
+      发送限流拦截器。对 ``send*`` / ``forward*`` / ``copy*`` / ``editMessage*`` 调用按全局与 chat 令牌桶排队，
+      ``sendMediaGroup`` 按媒体数量计数；收到 429 时按 ``retry_after`` 暂停该 chat 并重试。
+
+    :参数:
+
+      * ``global_rate: float``: 全局每秒发送数
+      * ``chat_rate: float``: 单个私聊每秒发送数
+      * ``group_rate: float``: 单个群 / 频道每分钟发送数
+      * ``max_retries: int``: 429 后的最大重试次数
+      * ``max_chats: int``: 保留令牌桶的 chat 数量上限
+    """
+
+    def __init__(self,
+                 global_rate: float = 30,
+                 chat_rate: float = 1,
+                 group_rate: float = 20,
+                 max_retries: int = 3,
+                 max_chats: int = 10000) -> None:
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate / 60
+        self.group_capacity = group_rate
+        self.max_retries = max_retries
+        self.buckets = LRUCache(max_chats)
+        self.stats: Dict[str, Any] = {"requests": 0, "delayed": 0, "delay_time": 0.0, "retries": 0}
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+    @staticmethod
+    def is_group(chat_id: Any) -> bool:
+        chat_id = str(chat_id)
+        return chat_id.startswith("-") or chat_id.startswith("@")
+
+    def bucket(self, chat_id: Any) -> TokenBucket:
+        key = str(chat_id)
+        bucket = self.buckets.get(key)
+        if bucket is MISSING:
+            if self.is_group(chat_id):
+                bucket = TokenBucket(self.group_rate, self.group_capacity)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_rate)
+            self.buckets.set(key, bucket)
+        return bucket
+
+    @staticmethod
+    def cost(request: ApiRequest) -> int:
+        if request.api == "sendMediaGroup" and isinstance(request.data.get("media"), list):
+            return max(len(request.data["media"]), 1)
+        return 1
+
+    async def __call__(self, request: ApiRequest, call_next: NextCall) -> ApiResponse:
+        if not request.api.startswith(RATE_LIMITED_PREFIXES):
+            return await call_next(request)
+        self.stats["requests"] += 1
+        chat_id = request.data.get("chat_id")
+        cost = self.cost(request)
+        now = time.monotonic()
+        delay = self.global_bucket.reserve(cost, now)
+        if chat_id is not None:
+            delay = max(delay, self.bucket(chat_id).reserve(cost, now))
+        if delay > 0:
+            self.stats["delayed"] += 1
+            self.stats["delay_time"] += delay
+            await asyncio.sleep(delay)
+        while True:
+            try:
+                return await call_next(request)
+            except ActionFailed as e:
+                if e.errcode != 429 or request.attempt >= self.max_retries:
+                    raise
+                retry_after = e.retry_after or 1
+                if chat_id is not None:
+                    self.bucket(chat_id).pause(retry_after)
+                request.attempt += 1
+                self.stats["retries"] += 1
+                await asyncio.sleep(retry_after)
@@ -0,0 +1,218 @@
+"""
+redis 连接管理
+
+适配器内所有使用 redis 的缓存共享同一个 ``RedisManager``。
+redis 不可用时管理器会标记为不可用，各缓存自动退回纯内存行为，并在后台定期重连。
+"""
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from redis import asyncio as aioredis
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+from .utils import log
+from .exception import RedisUnavailable
+
+T = TypeVar("T")
+
+
+class RedisManager:
+    """
+    :说明:
+
+      redis 连接管理器，支持单机 / TLS / sentinel / cluster，带连接池、健康检查与后台重连。
+
+    :参数:
+
+      * ``url: str``: redis 地址，``rediss://`` 表示使用 TLS
+      * ``db: int``: 使用的 db，url 中指定的 db 优先，cluster 模式下忽略
+      * ``ssl: bool``: 是否使用 TLS
+      * ``ssl_ca_certs: Optional[str]``: TLS CA 证书路径
+      * ``pool_size: int``: 连接池最大连接数
+      * ``sentinels: Optional[List[str]]``: sentinel 地址列表（``host:port``），设置后通过 sentinel 获取主节点
+      * ``sentinel_master: str``: sentinel 中主节点的服务名
+      * ``cluster: bool``: 是否为 redis cluster
+      * ``health_check_interval: float``: 连接可用时的健康检查间隔（秒）
+      * ``reconnect_interval: float``: 连接不可用时的重连间隔（秒）
+    """
+
+    def __init__(self,
+                 url: str = "redis://localhost",
+                 db: int = 0,
+                 ssl: bool = False,
+                 ssl_ca_certs: Optional[str] = None,
+                 pool_size: int = 10,
+                 sentinels: Optional[List[str]] = None,
+                 sentinel_master: str = "mymaster",
+                 cluster: bool = False,
+                 health_check_interval: float = 30,
+                 reconnect_interval: float = 5) -> None:
+        if ssl and url.startswith("redis://"):
+            url = "rediss://" + url[len("redis://"):]
+        self.url = url
+        self.db = db
+        self.ssl = ssl or url.startswith("rediss://")
+        self.ssl_ca_certs = ssl_ca_certs
+        self.pool_size = pool_size
+        self.sentinels = sentinels or []
+        self.sentinel_master = sentinel_master
+        self.cluster = cluster
+        self.health_check_interval = health_check_interval
+        self.reconnect_interval = reconnect_interval
+        self.client: Optional[Redis] = None
+        self.available = False
+        self.stats: Dict[str, int] = {
+            "connects": 0,
+            "connect_failures": 0,
+            "disconnects": 0,
+            "commands": 0,
+            "errors": 0,
+        }
+        self.last_ping_latency: Optional[float] = None
+        self._on_available: List[Callable[[], Awaitable[Any]]] = []
+        self._monitor_task: Optional[asyncio.Task] = None
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """连接状态与计数"""
+        return {"available": self.available, "last_ping_latency": self.last_ping_latency, **self.stats}
+
+    def on_available(self, func: Callable[[], Awaitable[Any]]) -> None:
+        """注册 redis（重新）可用时的回调，例如写回断线期间积压的数据"""
+        self._on_available.append(func)
+
+    def _create_client(self) -> Redis:
+        kwargs: Dict[str, Any] = {"max_connections": self.pool_size}
+        if self.ssl and self.ssl_ca_certs:
+            kwargs["ssl_ca_certs"] = self.ssl_ca_certs
+        if self.cluster:
+            from redis.asyncio.cluster import RedisCluster
+            return RedisCluster.from_url(self.url, **kwargs)
+        if self.sentinels:
+            from redis.asyncio.sentinel import Sentinel
+            hosts: List[Tuple[str, int]] = []
+            for sentinel in self.sentinels:
+                host, _, port = sentinel.rpartition(":")
+                hosts.append((host, int(port)))
+            if self.ssl:
+                kwargs["ssl"] = True
+            return Sentinel(hosts).master_for(self.sentinel_master, db=self.db, **kwargs)
+        return aioredis.from_url(self.url, db=self.db, health_check_interval=self.health_check_interval, **kwargs)
+
+    async def connect(self) -> bool:
+        """建立连接并启动后台健康检查 / 重连任务，返回当前是否可用"""
+        await self._try_connect()
+        if self._monitor_task is None:
+            self._monitor_task = asyncio.create_task(self._monitor())
+        return self.available
+
+    async def close(self) -> None:
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            await asyncio.gather(self._monitor_task, return_exceptions=True)
+            self._monitor_task = None
+        if self.client is not None:
+            await self._close_client(self.client)
+            self.client = None
+        self.available = False
+
+    @staticmethod
+    async def _close_client(client: Redis) -> None:
+        closer = getattr(client, "aclose", None) or client.close
+        try:
+            await closer()
+        except Exception:
+            pass
+
+    async def _try_connect(self) -> bool:
+        try:
+            if self.client is None:
+                self.client = self._create_client()
+            await self.ping()
+        except Exception as e:
+            self.stats["connect_failures"] += 1
+            if self.stats["connect_failures"] == 1:
+                log("WARNING", f"Redis is unavailable ({e}), falling back to in-memory cache")
+            return False
+        self.stats["connects"] += 1
+        self.available = True
+        log("INFO", "Redis connected")
+        for func in self._on_available:
+            try:
+                await func()
+            except Exception as e:
+                log("WARNING", f"Redis reconnect callback failed: {e}")
+        return True
+
+    async def ping(self) -> float:
+        start = time.perf_counter()
+        await self.client.ping()
+        self.last_ping_latency = time.perf_counter() - start
+        return self.last_ping_latency
+
+    def _mark_unavailable(self, e: Exception) -> None:
+        if self.available:
+            self.available = False
+            self.stats["disconnects"] += 1
+            log("WARNING", f"Redis connection lost ({e}), falling back to in-memory cache")
+
+    async def _monitor(self) -> None:
+        while True:
+            if self.available:
+                await asyncio.sleep(self.health_check_interval)
+                try:
+                    await self.ping()
+                except Exception as e:
+                    self._mark_unavailable(e)
+            else:
+                await asyncio.sleep(self.reconnect_interval)
+                await self._try_connect()
+
+    async def run(self, func: Callable[[Redis], Awaitable[T]]) -> T:
+        """
+        :说明:
+
+          使用共享连接执行 redis 操作，并记录计数。
+
+        :异常:
+
+          - ``RedisUnavailable``: redis 当前不可用，或操作时发生连接错误（此时会转入后台重连）
+        """
+        if not self.available:
+            raise RedisUnavailable()
+        self.stats["commands"] += 1
+        try:
+            return await func(self.client)
+        except (RedisConnectionError, RedisTimeoutError, OSError, asyncio.TimeoutError) as e:
+            self.stats["errors"] += 1
+            self._mark_unavailable(e)
+            raise RedisUnavailable(str(e)) from e
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """批量读取，cluster 模式下自动按槽拆分"""
+        if self.cluster:
+            return await self.run(lambda client: client.mget_nonatomic(keys))
+        return await self.run(lambda client: client.mget(keys))
+
+    async def mget_ttl(self, keys: List[str]) -> List[Tuple[Optional[bytes], Optional[float]]]:
+        """
+        :说明:
+
+          批量读取值与剩余有效期（秒，永不过期时为 ``None``），``GET`` 与 ``PTTL`` 在同一个 pipeline 中完成，
+          cluster 模式下 pipeline 自动按槽拆分。
+        """
+        async def read(client: Redis) -> List[Any]:
+            async with client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.get(key)
+                    pipe.pttl(key)
+                return await pipe.execute()
+
+        replies = await self.run(read)
+        return [(value, pttl / 1000 if value is not None and pttl >= 0 else None)
+                for value, pttl in zip(replies[::2], replies[1::2])]
@@ -0,0 +1,385 @@
+"""
+发送消息的渲染
+
+``render_message`` 一次遍历 ``Message`` 即得到可直接发送的请求计划 ``RenderPlan``：调用的 API、JSON 参数、
+实体列表与需要上传的文件。计划不包含 ``chat_id`` 与 ``reply_to_message_id``，可以缓存并反复用于不同的 chat，
+发送时再由 ``Bot.send_plan`` 填入。
+"""
+from io import BytesIO
+from os import path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .album import ALBUM_MEDIA_TYPES, media_fingerprint, sent_file_id
+from .compat import model_dump
+from .exception import MessageNotSupport
+from .entity import MAX_CAPTION_LENGTH, MAX_TEXT_LENGTH, split_text, utf16_len
+from .message import ENTITY_SEGMENT_TYPES, MediaData, Message, MessageSegment
+from .sniff import EXTENSIONS, route_media
+
+MEDIA_TYPES = ("photo", "audio", "document", "video", "animation", "voice", "video_note", "sticker")
+# Telegram 会自动识别的实体，发送时不需要显式给出
+AUTO_ENTITY_TYPES = frozenset({"mention", "hashtag", "cashtag", "bot_command", "url", "email", "phone_number"})
+# 可以通过 editMessageMedia 替换的媒体
+EDITABLE_MEDIA_TYPES = ("photo", "video", "animation", "audio", "document")
+# 各编辑 API 接受的参数
+EDIT_TEXT_KEYS = ("text", "entities", "parse_mode", "disable_web_page_preview", "reply_markup")
+EDIT_CAPTION_KEYS = ("caption", "caption_entities", "parse_mode", "reply_markup")
+# 消息段 data 中不作为 API 参数发送的键
+SEGMENT_ONLY_KEYS = frozenset({"text", "entities", "file_name"})
+
+
+class PlannedRequest:
+    """
+    :说明:
+
+      计划中的一次 API 调用。
+
+    :参数:
+
+      * ``method: str``: API 名称
+      * ``params: Dict[str, Any]``: 除 ``chat_id`` / ``reply_to_message_id`` 外的参数
+      * ``files: Optional[Dict[str, Tuple[Optional[str], Any]]]``: 需要上传的文件，``字段名 -> (文件名, 来源)``，
+        来源为 ``file:///`` / ``base64://`` 链接或 bytes，每次发送时重新打开
+      * ``media: Optional[str]``: 媒体所在的参数名，用于复用已上传文件的 ``file_id``
+      * ``fingerprint: Optional[str]``: 需要上传的媒体的指纹，渲染时计算一次，发送时不再重复计算
+    """
+    __slots__ = ("method", "params", "files", "media", "fingerprint")
+
+    def __init__(self,
+                 method: str,
+                 params: Dict[str, Any],
+                 files: Optional[Dict[str, Tuple[Optional[str], Any]]] = None,
+                 media: Optional[str] = None,
+                 fingerprint: Optional[str] = None) -> None:
+        self.method = method
+        self.params = params
+        self.files = files
+        self.media = media
+        self.fingerprint = fingerprint
+
+    def use_file_id(self, file_id: str) -> None:
+        """
+        :说明:
+
+          媒体上传后改为以 ``file_id`` 发送，之后用同一计划发送时（如群发）不再上传，也不再查找已上传文件的缓存。
+          替换而不是原地修改 ``params`` / ``files``，正在发送的其他请求不受影响。
+        """
+        self.params = {**self.params, self.media: file_id}
+        if self.files:
+            self.files = {k: v for k, v in self.files.items() if k != self.media} or None
+        self.fingerprint = None
+
+    def __repr__(self) -> str:
+        return f"<PlannedRequest {self.method}>"
+
+
+class RenderPlan:
+    """
+    :说明:
+
+      渲染得到的发送计划：按顺序执行的 ``requests``，或以相册发送的 ``album`` 消息段（二者只有其一）。
+    """
+    __slots__ = ("requests", "album")
+
+    def __init__(self,
+                 requests: Optional[List[PlannedRequest]] = None,
+                 album: Optional[List[MessageSegment]] = None) -> None:
+        self.requests = requests or []
+        self.album = album
+
+    def use_file_ids(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        :说明:
+
+          相册发送后把其中需要上传的媒体改为以返回的 ``file_id`` 发送，之后用同一计划发送时（如群发）
+          不再计算指纹、查找已上传文件的缓存或上传。与 ``PlannedRequest.use_file_id`` 相同，替换 ``album`` 而不是原地修改。
+
+        :参数:
+
+          * ``messages: List[Dict[str, Any]]``: 按相册顺序返回的 Message
+        """
+        album = list(self.album)
+        for i, (ms, message) in enumerate(zip(self.album, messages)):
+            source = ms.data[ms.type]
+            if isinstance(source, str) and not source.startswith(("file:///", "base64://")):
+                continue
+            if file_id := sent_file_id(message, ms.type):
+                data = ms.data.copy()
+                data[ms.type] = file_id
+                album[i] = MessageSegment(ms.type, data)
+        self.album = album
+
+    def __repr__(self) -> str:
+        if self.album is not None:
+            return f"<RenderPlan album of {len(self.album)}>"
+        return f"<RenderPlan {', '.join(r.method for r in self.requests)}>"
+
+
+class _TextBuilder:
+    """拼接文本并按 UTF-16 偏移记录实体"""
+    __slots__ = ("parts", "length", "entities", "space")
+
+    def __init__(self) -> None:
+        self.parts: List[str] = []
+        self.length = 0
+        self.entities: List[Dict[str, Any]] = []
+        # 上一段是 @ 时，下一段文本前需要补一个空格
+        self.space = False
+
+    def add(self, text: str) -> int:
+        if self.space and text and not text[0].isspace():
+            self.parts.append(" ")
+            self.length += 1
+        self.space = False
+        start = self.length
+        self.parts.append(text)
+        self.length += utf16_len(text)
+        return start
+
+    def add_mention(self, text: str) -> int:
+        if self.parts and not self.parts[-1][-1:].isspace():
+            self.parts.append(" ")
+            self.length += 1
+        self.space = False
+        start = self.add(text)
+        self.space = True
+        return start
+
+    def extend(self, other: "_TextBuilder") -> None:
+        if not other.parts:
+            return
+        start = self.add("".join(other.parts))
+        self.entities.extend({**e, "offset": e["offset"] + start} for e in other.entities)
+        self.space = other.space
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+def _param(value: Any) -> Any:
+    if isinstance(value, list):
+        return [model_dump(v, exclude_none=True) if isinstance(v, BaseModel) else v for v in value]
+    return value
+
+
+def _entity_dict(entity: Any, shift: int) -> Dict[str, Any]:
+    entity = model_dump(entity, exclude_none=True) if isinstance(entity, BaseModel) else dict(entity)
+    entity["offset"] += shift
+    return entity
+
+
+def _add_text_segment(builder: _TextBuilder, ms: MessageSegment, users: Mapping[str, Dict[str, Any]]) -> None:
+    if ms.type == "at":
+        user_id = str(ms.data["id"])
+        user = users.get(user_id)
+        if user is not None and user.get("username"):
+            builder.add_mention(f"@{user['username']}")
+        elif user is not None or user_id.isdigit():
+            # 没有 username 时直接由 user id 构建 text_mention，不需要查询
+            name = user.get("first_name") if user else None
+            name = name or ms.data.get("text") or user_id
+            start = builder.add_mention(name)
+            builder.entities.append({"type": "text_mention", "offset": start,
+                                     "length": utf16_len(name), "user": user or {"id": int(user_id)}})
+        else:
+            builder.add(ms.data.get("text") or user_id)
+        return
+    text = str(ms.data["text"])
+    start = builder.add(text)
+    if ms.type not in ("text", *AUTO_ENTITY_TYPES):
+        entity = {"type": ms.type, "offset": start, "length": utf16_len(text)}
+        for key in ("url", "language", "custom_emoji_id"):
+            if ms.data.get(key):
+                entity[key] = ms.data[key]
+        builder.entities.append(entity)
+    for nested in ms.data.get("entities") or ():
+        builder.entities.append(_entity_dict(nested, start))
+
+
+def _media_request(ms: MessageSegment, caption: _TextBuilder, params: Dict[str, Any]) -> PlannedRequest:
+    """构建媒体消息段对应的请求，本地文件 / bytes 记录为待上传文件，并根据其真实内容选择发送 API"""
+    type_ = ms.type
+    source = ms.data[type_]
+    # 接收到的媒体只发送 file_id 与另外写入的键，thumb / file_size 等模型字段不能原样发送
+    data = ms.data.overrides() if isinstance(ms.data, MediaData) else ms.data.copy()
+    data.pop(type_, None)
+    params.update((k, _param(v)) for k, v in data.items() if k not in SEGMENT_ONLY_KEYS and not isinstance(v, BaseModel))
+    files: Dict[str, Tuple[Optional[str], Any]] = {}
+    if isinstance(source, BytesIO):
+        source = source.getvalue()
+    if isinstance(source, (bytes, bytearray)) or isinstance(source, str) and source.startswith(("file:///", "base64://")):
+        type_, kind = route_media(type_, source)
+        file_name = ms.data.get("file_name")
+        if file_name is None and kind and not (isinstance(source, str) and source.startswith("file:///")):
+            # 本地文件使用原文件名，其余按识别出的格式补上扩展名
+            file_name = f"file.{EXTENSIONS[kind]}"
+        files[type_] = (file_name, source)
+    elif isinstance(source, str):
+        params[type_] = source
+    else:
+        raise MessageNotSupport()
+    method = "send" + "".join(part.capitalize() for part in type_.split("_"))
+    thumb = params.get("thumb")
+    if isinstance(thumb, str) and thumb.startswith("file:///"):
+        name = path.basename(thumb[len("file:///"):])
+        params["thumb"] = f"attach://{name}"
+        files[name] = (name, thumb)
+    if caption.parts:
+        params["caption"] = params.get("caption", "") + caption.text
+        if caption.entities:
+            shift = utf16_len(params["caption"]) - caption.length
+            params["caption_entities"] = [{**e, "offset": e["offset"] + shift} for e in caption.entities]
+    fingerprint = media_fingerprint(files[type_][1]) if type_ in files else None
+    return PlannedRequest(method, params, files or None, type_, fingerprint)
+
+
+def _text_requests(text: str, entities: List[Dict[str, Any]], params: Dict[str, Any]) -> List[PlannedRequest]:
+    """文本消息的请求，超长时拆分为多条；``reply_markup`` 只放在最后一条"""
+    if "parse_mode" in params or utf16_len(text) <= MAX_TEXT_LENGTH:
+        if entities:
+            params["entities"] = entities
+        return [PlannedRequest("sendMessage", {"text": text, **params})]
+    reply_markup = params.pop("reply_markup", None)
+    requests = []
+    for chunk, chunk_entities in split_text(text, entities):
+        chunk_params = {"text": chunk, **params}
+        if chunk_entities:
+            chunk_params["entities"] = chunk_entities
+        requests.append(PlannedRequest("sendMessage", chunk_params))
+    if reply_markup is not None:
+        requests[-1].params["reply_markup"] = reply_markup
+    return requests
+
+
+def split_caption(data: Dict[str, Any]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    :说明:
+
+      ``caption`` 超出长度上限时把第一段留作 caption（改写 ``data``），返回其余需要以文本消息发送的部分。
+      设置了 ``parse_mode`` 时无法按实际显示长度拆分，不做处理。
+    """
+    caption = data.get("caption")
+    if not caption or "parse_mode" in data or utf16_len(caption) <= MAX_CAPTION_LENGTH:
+        return []
+    chunks = split_text(caption, data.get("caption_entities"), MAX_TEXT_LENGTH, first_limit=MAX_CAPTION_LENGTH)
+    data["caption"], entities = chunks[0]
+    if entities:
+        data["caption_entities"] = entities
+    else:
+        data.pop("caption_entities", None)
+    return chunks[1:]
+
+
+def _caption_overflow(request: PlannedRequest) -> List[PlannedRequest]:
+    """caption 超长时只保留第一段，其余部分作为随后发送的文本消息"""
+    return [PlannedRequest("sendMessage", {"text": text, **({"entities": entities} if entities else {})})
+            for text, entities in split_caption(request.params)]
+
+
+def render_message(message: Message, users: Optional[Mapping[str, Dict[str, Any]]] = None) -> RenderPlan:
+    """
+    :说明:
+
+      一次遍历把消息渲染为发送计划。
+
+      * 文本、实体类型（bold / code / text_link 等）与 ``at`` 消息段拼接为文本并生成对应的实体
+      * 有媒体时文本成为其 caption；多于一个 photo / video / document / audio 时以相册发送，
+        文本成为前一个媒体（之前没有媒体时为第一个媒体）的 caption
+      * ``markup`` 消息段成为 ``reply_markup``
+      * 超出长度上限的文本与 caption 按 ``split_text`` 拆分
+
+    :参数:
+
+      * ``message: Message``: 要发送的消息
+      * ``users: Optional[Mapping[str, dict]]``: ``at`` 的用户 id -> User，有 username 时渲染为 ``@username``，
+        否则渲染为名字加 ``text_mention`` 实体；不在其中的用户直接以 id 构建 ``text_mention``，
+        显示消息段的 ``text``，没有时显示 id
+    """
+    users = users or {}
+    leading = _TextBuilder()
+    media: List[Tuple[MessageSegment, _TextBuilder]] = []
+    params: Dict[str, Any] = {}
+    album_count = 0
+    for ms in message:
+        if ms.type in MEDIA_TYPES:
+            media.append((ms, _TextBuilder()))
+            if ms.type in ALBUM_MEDIA_TYPES:
+                album_count += 1
+        elif ms.type == "text" or ms.type == "at" or ms.type in ENTITY_SEGMENT_TYPES:
+            _add_text_segment(media[-1][1] if media else leading, ms, users)
+            if ms.type == "text":
+                params.update((k, v) for k, v in ms.data.items() if k not in SEGMENT_ONLY_KEYS)
+        elif ms.type == "markup":
+            params["reply_markup"] = {"inline_keyboard": ms.data["inline_keyboard"]}
+
+    if album_count > 1:
+        album: List[MessageSegment] = []
+        for i, (ms, caption) in enumerate(media):
+            if ms.type not in ALBUM_MEDIA_TYPES:
+                continue
+            if not album and leading.parts:
+                leading.extend(caption)
+                caption = leading
+            data = ms.data.copy()
+            if caption.parts:
+                data["caption"] = data.get("caption", "") + caption.text
+                if caption.entities and "caption_entities" not in data:
+                    shift = utf16_len(data["caption"]) - caption.length
+                    data["caption_entities"] = [{**e, "offset": e["offset"] + shift} for e in caption.entities]
+            album.append(MessageSegment(ms.type, data))
+        return RenderPlan(album=album)
+
+    if not media:
+        return RenderPlan(_text_requests(leading.text, leading.entities, params))
+
+    # 只发送最后一个媒体，全部文本作为其 caption
+    for _, caption in media:
+        leading.extend(caption)
+    request = _media_request(media[-1][0], leading, params)
+    return RenderPlan([request, *_caption_overflow(request)])
+
+
+def message_type(message: Dict[str, Any]) -> str:
+    """发送得到的 Message 的内容类型：``text``、媒体类型或 ``other``"""
+    if message.get("text") is not None:
+        return "text"
+    for type_ in MEDIA_TYPES:
+        if message.get(type_):
+            return type_
+    return "other"
+
+
+def edit_request(plan: RenderPlan, last_type: str) -> Optional[PlannedRequest]:
+    """
+    :说明:
+
+      把只有一条请求的发送计划转换为编辑上一条消息的请求（不含 ``chat_id`` / ``message_id``），无法编辑时返回 ``None``。
+
+      * 文本 -> 文本消息：``editMessageText``
+      * 文本 -> 媒体消息：``editMessageCaption``
+      * 媒体 -> 媒体消息：``editMessageMedia``
+    """
+    if plan.album is not None or len(plan.requests) != 1:
+        return None
+    request = plan.requests[0]
+    params = request.params
+    if request.method == "sendMessage":
+        if last_type == "text":
+            return PlannedRequest("editMessageText", {k: params[k] for k in EDIT_TEXT_KEYS if k in params})
+        if last_type in EDITABLE_MEDIA_TYPES:
+            caption = {"caption": params["text"], "caption_entities": params.get("entities"), **params}
+            return PlannedRequest("editMessageCaption",
+                                  {k: caption[k] for k in EDIT_CAPTION_KEYS if caption.get(k) is not None})
+        return None
+    if request.media not in EDITABLE_MEDIA_TYPES or last_type not in EDITABLE_MEDIA_TYPES:
+        return None
+    media = {"type": request.media, "media": params.get(request.media, f"attach://{request.media}")}
+    media.update((k, params[k]) for k in ("caption", "caption_entities", "parse_mode") if k in params)
+    edit_params: Dict[str, Any] = {"media": media}
+    if "reply_markup" in params:
+        edit_params["reply_markup"] = params["reply_markup"]
+    files = {k: v for k, v in (request.files or {}).items() if k == request.media}
+    return PlannedRequest("editMessageMedia", edit_params, files or None)
@@ -0,0 +1,184 @@
+"""
+发送媒体的内容识别
+
+根据文件头的魔数识别需要上传的媒体的真实格式，并结合 Telegram 的大小限制选择发送 API，
+例如 GIF 以 ``sendAnimation`` 发送、超过 10 MB 的图片以 ``sendDocument`` 发送，避免请求失败后再重试。
+只读取文件头，bytes / BytesIO 通过 ``memoryview`` 读取而不复制内容。
+"""
+import os
+import base64
+import struct
+import binascii
+from io import BytesIO
+from typing import Any, Optional, Tuple, Union
+
+# 识别所需的文件头长度
+HEADER_SIZE = 32
+# sendPhoto 上传图片的大小上限
+PHOTO_MAX_SIZE = 10 * 1024 * 1024
+
+IMAGE_KINDS = frozenset({"jpeg", "png", "webp", "bmp"})
+VIDEO_KINDS = frozenset({"mp4", "mov", "webm"})
+# 识别出的格式对应的扩展名，用于生成上传文件名
+EXTENSIONS = {
+    "jpeg": "jpg", "png": "png", "gif": "gif", "webp": "webp", "bmp": "bmp", "tiff": "tiff", "heic": "heic",
+    "mp4": "mp4", "mov": "mov", "webm": "webm", "ogg": "ogg", "mp3": "mp3", "pdf": "pdf", "tgs": "tgs", "zip": "zip",
+}
+# 可以根据内容改变发送 API 的媒体类型，document / audio / voice / video_note 按调用方的选择发送
+ROUTED_TYPES = frozenset({"photo", "animation", "video", "sticker"})
+
+
+def sniff(head: bytes) -> Optional[str]:
+    """根据文件头识别格式，无法识别时返回 ``None``"""
+    if head[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if head[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[:2] == b"BM":
+        return "bmp"
+    if head[:4] in (b"II*\x00", b"MM\x00*"):
+        return "tiff"
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand == b"qt  ":
+            return "mov"
+        if brand in (b"heic", b"heix", b"mif1", b"msf1", b"avif"):
+            return "heic"
+        return "mp4"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:3] == b"ID3" or head[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"):
+        return "mp3"
+    if head[:4] == b"%PDF":
+        return "pdf"
+    if head[:2] == b"\x1f\x8b":
+        # 动态贴纸（tgs）是 gzip 压缩的 lottie
+        return "tgs"
+    if head[:4] == b"PK\x03\x04":
+        return "zip"
+    return None
+
+
+def image_size(data: Union[bytes, memoryview], kind: str) -> Optional[Tuple[int, int]]:
+    """
+    :说明:
+
+      从文件头读取图片的 ``(宽, 高)``，不解码图片。JPEG 需要跳过 SOF 段之前的 EXIF 等段，
+      ``data`` 不包含 SOF 段或格式不支持时返回 ``None``。
+    """
+    try:
+        if kind == "png":
+            return struct.unpack_from(">II", data, 16)
+        if kind == "gif":
+            return struct.unpack_from("<HH", data, 6)
+        if kind == "bmp":
+            width, height = struct.unpack_from("<ii", data, 18)
+            return abs(width), abs(height)
+        if kind == "webp":
+            chunk = bytes(data[12:16])
+            if chunk == b"VP8X":
+                return (int.from_bytes(data[24:27], "little") + 1,
+                        int.from_bytes(data[27:30], "little") + 1)
+            if chunk == b"VP8 ":
+                width, height = struct.unpack_from("<HH", data, 26)
+                return width & 0x3fff, height & 0x3fff
+            if chunk == b"VP8L":
+                bits = int.from_bytes(data[21:25], "little")
+                return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+            return None
+        if kind == "jpeg":
+            i = 2
+            while i + 9 < len(data):
+                if data[i] != 0xff:
+                    return None
+                marker = data[i + 1]
+                if marker == 0xff:
+                    i += 1
+                    continue
+                if marker == 0x01 or 0xd0 <= marker <= 0xd8:
+                    i += 2
+                    continue
+                # SOF0 ~ SOF15，除去 DHT / JPG / DAC
+                if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+                    height, width = struct.unpack_from(">HH", data, i + 5)
+                    return width, height
+                i += 2 + struct.unpack_from(">H", data, i + 2)[0]
+    except struct.error:
+        pass
+    return None
+
+
+def peek(source: Any, head_size: int = HEADER_SIZE) -> Tuple[Optional[bytes], Optional[int]]:
+    """
+    :说明:
+
+      读取需要上传的媒体的文件头（前 ``head_size`` 字节）与大小，返回 ``(文件头, 字节数)``，无法读取时对应项为 ``None``。
+      支持 bytes、BytesIO、``file:///`` 与 ``base64://`` 链接，base64 只解码文件头对应的字符，大小由长度算出。
+    """
+    if isinstance(source, (bytes, bytearray)):
+        view = memoryview(source)
+        return bytes(view[:head_size]), len(view)
+    if isinstance(source, BytesIO):
+        view = source.getbuffer()
+        try:
+            return bytes(view[:head_size]), view.nbytes
+        finally:
+            view.release()
+    if isinstance(source, str) and source.startswith("file:///"):
+        file_path = source[len("file:///"):]
+        if not os.path.exists(file_path) and os.path.exists("/" + file_path):
+            file_path = "/" + file_path
+        try:
+            with open(file_path, "rb") as fp:
+                return fp.read(head_size), os.fstat(fp.fileno()).st_size
+        except OSError:
+            return None, None
+    if isinstance(source, str) and source.startswith("base64://"):
+        # 只解码文件头对应的前几组字符，不复制整个字符串
+        start = len("base64://")
+        try:
+            head = base64.b64decode(source[start:start - (-head_size // 3) * 4])
+        except (binascii.Error, ValueError):
+            return None, None
+        return head[:head_size], (len(source) - start) * 3 // 4 - source[-2:].count("=")
+    return None, None
+
+
+def route_media(type_: str, source: Any) -> Tuple[str, Optional[str]]:
+    """
+    :说明:
+
+      根据媒体的真实内容与大小选择发送类型，返回 ``(媒体类型, 识别出的格式)``。
+
+      * GIF -> ``animation``；sticker 以外的 WEBP / JPEG / PNG / BMP -> ``photo``，超过 10 MB 时 -> ``document``
+      * MP4 / MOV / WEBM -> ``video``（作为 animation 发送时保持 animation，WEBM 贴纸保持 sticker）
+      * 其余可以识别的格式（PDF、HEIC、TIFF 等）-> ``document``
+      * 无法识别、无法读取或不属于 photo / animation / video / sticker 的媒体保持原类型
+    """
+    if type_ not in ROUTED_TYPES:
+        return type_, None
+    head, size = peek(source)
+    kind = sniff(head) if head else None
+    if kind is None:
+        return type_, None
+    if kind == "gif":
+        return "animation", kind
+    if kind in IMAGE_KINDS:
+        if type_ == "sticker" and kind == "webp":
+            return "sticker", kind
+        if size is not None and size > PHOTO_MAX_SIZE:
+            return "document", kind
+        return "photo", kind
+    if kind in VIDEO_KINDS:
+        if type_ == "sticker" and kind == "webm" or type_ == "animation":
+            return type_, kind
+        return "video", kind
+    if kind == "tgs" and type_ == "sticker":
+        return "sticker", kind
+    return "document", kind
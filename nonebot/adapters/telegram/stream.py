@@ -0,0 +1,140 @@
+"""
+流式消息
+
+``MessageStream`` 把逐步产生的文本（进度、LLM 输出、日志）显示为一条不断编辑的消息：
+追加的文本被合并，每条消息每个间隔最多编辑一次，内容未变化时不编辑，超出长度上限时转到新消息继续。
+"""
+import asyncio
+from typing import TYPE_CHECKING, Any, List, Optional
+
+from .entity import MAX_TEXT_LENGTH, split_text, utf16_len
+from .exception import ActionFailed
+from .models import MessageBody
+
+if TYPE_CHECKING:
+    from .bot import Bot
+    from .event import MessageEvent
+
+
+class MessageStream:
+    """
+    :说明:
+
+      流式消息，通过 ``Bot.stream_message`` 创建，作为异步上下文管理器使用::
+
+          async with bot.stream_message(event) as stream:
+              async for token in generate():
+                  stream.append(token)
+
+      ``append`` 只写入缓冲区，由后台任务按间隔发送或编辑；退出上下文时发送剩余内容。
+      新消息通过 ``Bot.send`` 发送，编辑通过 ``editMessageText``，二者都经过适配器的限流。
+      后台发送失败时，之后的 ``append`` / ``set`` 与退出上下文时抛出该异常。
+
+    :参数:
+
+      * ``bot: Bot``: Bot 对象
+      * ``event: MessageEvent``: 触发的事件，消息发送到其所在 chat
+      * ``interval: float``: 同一条消息两次编辑的最小间隔（秒）
+      * ``limit: int``: 每条消息的长度上限（UTF-16 码元）
+      * ``reply_message: bool``: 第一条消息是否回复原消息
+    """
+
+    def __init__(self,
+                 bot: "Bot",
+                 event: "MessageEvent",
+                 interval: float = 1.0,
+                 limit: int = MAX_TEXT_LENGTH,
+                 reply_message: bool = False) -> None:
+        self.bot = bot
+        self.event = event
+        self.interval = interval
+        self.limit = min(limit, MAX_TEXT_LENGTH)
+        self.reply_message = reply_message
+        # 已发送完毕的消息与当前正在编辑的消息
+        self.messages: List[MessageBody] = []
+        self.current: Optional[MessageBody] = None
+        self.text = ""
+        self.edits = 0
+        self._sent_text = ""
+        self._dirty = asyncio.Event()
+        self._closed = False
+        self._task: Optional[asyncio.Task] = None
+
+    def append(self, text: str) -> None:
+        """追加文本"""
+        self._check()
+        if text:
+            self.text += text
+            self._dirty.set()
+
+    def set(self, text: str) -> None:
+        """替换当前消息的全部文本（如进度条）"""
+        self._check()
+        self.text = text
+        self._dirty.set()
+
+    def _check(self) -> None:
+        """已关闭时抛出 ``RuntimeError``，后台任务因发送失败而结束时抛出其异常"""
+        if self._closed:
+            raise RuntimeError("Stream is closed")
+        if self._task is not None and self._task.done() and not self._task.cancelled():
+            error = self._task.exception()
+            if error is not None:
+                raise error
+
+    async def __aenter__(self) -> "MessageStream":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """发送剩余内容并停止后台任务"""
+        if self._closed:
+            return
+        self._closed = True
+        self._dirty.set()
+        if self._task is not None:
+            await self._task
+
+    async def _run(self) -> None:
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+            await self._flush()
+            if self._closed and not self._dirty.is_set():
+                return
+            if not self._closed:
+                # 等待期间追加的文本在下一次编辑中合并发送
+                await asyncio.sleep(self.interval)
+
+    async def _flush(self) -> None:
+        while utf16_len(self.text) > self.limit:
+            text = self.text
+            head = split_text(text, None, self.limit)[0][0]
+            consumed = text.find(head) + len(head)
+            await self._show(head)
+            self.messages.append(self.current)
+            self.current = None
+            self._sent_text = ""
+            # 发送期间追加的文本保留在已发送部分之后；文本被 set 替换时保留全部新文本
+            if self.text.startswith(text):
+                self.text = self.text[consumed:].lstrip()
+        await self._show(self.text)
+
+    async def _show(self, text: str) -> None:
+        if not text.strip() or text == self._sent_text:
+            return
+        if self.current is None:
+            reply = self.reply_message and not self.messages
+            self.current = await self.bot.send(self.event, text, reply_message=reply)
+        else:
+            try:
+                await self.bot.call_api("editMessageText", chat_id=self.current.chat.id,
+                                        message_id=self.current.message_id, text=text)
+            except ActionFailed as e:
+                if "not modified" not in (e.errmsg or ""):
+                    raise
+            self.edits += 1
+        self._sent_text = text
@@ -0,0 +1,92 @@
+"""
+事件注入到处理函数参数时应当共享同一实例，而不是在每次校验时复制整棵模型树
+"""
+import asyncio
+import tracemalloc
+from typing import Any, Callable
+
+import nonebot
+
+nonebot.init(telegram_bot_token="1:test")
+
+from nonebot.adapters import Event as BaseEvent  # noqa: E402
+from nonebot.dependencies import Dependent  # noqa: E402
+from nonebot.params import EventParam  # noqa: E402
+
+from nonebot.adapters.telegram.compat import PYDANTIC_V2, model_validate  # noqa: E402
+from nonebot.adapters.telegram.event import Event, GroupMessageEvent, MessageEvent  # noqa: E402
+
+HANDLERS = 50
+
+if PYDANTIC_V2:
+    from pydantic import TypeAdapter
+
+    def validator(annotation: type) -> Callable[[Any], Any]:
+        """nonebot 校验处理函数参数时使用的 pydantic 校验"""
+        return TypeAdapter(annotation).validate_python
+else:
+    from pydantic import parse_obj_as
+
+    def validator(annotation: type) -> Callable[[Any], Any]:
+        """nonebot 校验处理函数参数时使用的 pydantic 校验"""
+        return lambda value: parse_obj_as(annotation, value)
+
+
+def group_message_event() -> GroupMessageEvent:
+    user = {"id": 10001, "is_bot": False, "first_name": "Alice", "username": "alice"}
+    chat = {"id": -1001234567890, "type": "supergroup", "title": "Test Group"}
+    return model_validate(GroupMessageEvent, {
+        "update_id": 1,
+        "message": {
+            "message_id": 42, "from": user, "chat": chat, "date": 1700000000,
+            "reply_to_message": {"message_id": 41, "from": user, "chat": chat, "date": 1699999999, "text": "hi"},
+            "text": "/echo hello @bob",
+            "entities": [{"type": "bot_command", "offset": 0, "length": 5},
+                         {"type": "mention", "offset": 12, "length": 4}],
+        },
+        "user_id": user["id"],
+        "group_id": chat["id"],
+    })
+
+
+def injected(event: GroupMessageEvent) -> list:
+    received = []
+
+    async def handler(a: BaseEvent, b: Event, c: MessageEvent, d: GroupMessageEvent) -> None:
+        received.extend((a, b, c, d))
+
+    dependent = Dependent.parse(call=handler, allow_types=[EventParam])
+    asyncio.run(dependent(event=event))
+    return received
+
+
+def test_injection_shares_instance():
+    event = group_message_event()
+    received = injected(event)
+    assert len(received) == 4
+    assert all(value is event for value in received)
+
+
+def test_validation_returns_instance():
+    event = group_message_event()
+    for annotation in (Event, MessageEvent, GroupMessageEvent):
+        assert validator(annotation)(event) is event
+
+
+def test_injection_allocations_per_update():
+    event = group_message_event()
+    # 一次分发中每个处理函数的每个事件参数都会校验一次
+    validators = [validator(annotation) for annotation in (Event, MessageEvent, GroupMessageEvent)] * HANDLERS
+    for validate in validators:
+        validate(event)
+    received = []
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        received.extend(validate(event) for validate in validators)
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    # 复制的事件会被 received 持有；共享实例时只多出列表本身（约 1.4 KB）
+    assert retained < 4 * 1024, f"{retained} bytes retained for {len(validators)} parameter validations"
+    assert all(value is event for value in received)
@@ -0,0 +1,247 @@
+"""
+适配器性能基准
+
+用法：python tools/benchmark.py [case ...]，不带参数时运行全部用例。
+需要在已安装 nonebot2 与本适配器的环境中运行，可分别在 pydantic v1 / v2 环境下执行以对比。
+"""
+import sys
+import time
+import asyncio
+import tracemalloc
+from typing import Callable, Dict
+
+import nonebot
+
+nonebot.init(bot_token="benchmark")
+
+from nonebot.adapters.telegram.command import CommandIndex  # noqa: E402
+from nonebot.adapters.telegram.compat import PYDANTIC_V2, model_validate  # noqa: E402
+from nonebot.adapters.telegram.entity import split_text  # noqa: E402
+from nonebot.adapters.telegram.event import GroupMessageEvent  # noqa: E402
+from nonebot.adapters.telegram.message import Message, MessageSegment, MediaData  # noqa: E402
+from nonebot.adapters.telegram.models import PhotoSize, Update  # noqa: E402
+from nonebot.adapters.telegram.preprocess import PhotoPreprocessor  # noqa: E402
+from nonebot.adapters.telegram.render import render_message  # noqa: E402
+
+CASES: Dict[str, Callable[[], None]] = {}
+
+
+def case(func: Callable[[], None]) -> Callable[[], None]:
+    CASES[func.__name__] = func
+    return func
+
+
+def sample_update(update_id: int = 1) -> dict:
+    user = {"id": 10000 + update_id, "is_bot": False,
+            "first_name": "Alice", "username": "alice", "language_code": "en"}
+    chat = {"id": -1001234567890, "type": "supergroup", "title": "Benchmark Group"}
+    reply = {
+        "message_id": 41, "from": user, "chat": chat, "date": 1700000000,
+        "photo": [{"file_id": f"photo{i}", "file_unique_id": f"u{i}", "width": 90 * i,
+                   "height": 90 * i, "file_size": 1000 * i} for i in range(1, 5)],
+        "caption": "look at this",
+    }
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": 42, "from": user, "chat": chat, "date": 1700000001,
+            "reply_to_message": reply,
+            "text": "/echo hello @bob #tag https://example.com",
+            "entities": [
+                {"type": "bot_command", "offset": 0, "length": 5},
+                {"type": "mention", "offset": 12, "length": 4},
+                {"type": "hashtag", "offset": 17, "length": 4},
+                {"type": "url", "offset": 22, "length": 19},
+            ],
+        },
+        "user_id": user["id"],
+        "group_id": chat["id"],
+    }
+
+
+def report(name: str, count: int, elapsed: float) -> None:
+    print(f"{name:<24} {count / elapsed:>12.0f} ops/s  {elapsed / count * 1e6:>8.2f} us/op")
+
+
+@case
+def parse() -> None:
+    """Update / GroupMessageEvent 解析吞吐"""
+    count = 20000
+    payloads = [sample_update(i) for i in range(count)]
+    print(f"pydantic {'v2' if PYDANTIC_V2 else 'v1'}")
+    for model in (Update, GroupMessageEvent):
+        start = time.perf_counter()
+        for payload in payloads:
+            model_validate(model, payload)
+        report(f"parse {model.__name__}", count, time.perf_counter() - start)
+
+
+def traced(build: Callable[[], object]) -> int:
+    """构建对象期间新增的内存（字节），对象在测量期间保持存活"""
+    tracemalloc.start()
+    try:
+        obj = build()  # noqa: F841
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+@case
+def memory() -> None:
+    """100k 消息段（text / at / photo 各占三分之一）的内存占用与纯文本提取"""
+    count = 100000
+    photos = [model_validate(PhotoSize, {"file_id": f"photo{i}", "file_unique_id": f"u{i}",
+                                         "width": 1280, "height": 720, "file_size": 100000 + i})
+              for i in range(count // 3)]
+
+    def as_dicts() -> list:
+        segments = []
+        for i, photo in enumerate(photos):
+            segments.append(MessageSegment("text", {"text": f"hello {i} "}))
+            segments.append(MessageSegment("at", {"id": str(10000 + i)}))
+            data = {"caption": "look"}
+            data.update(photo.dict() if not PYDANTIC_V2 else photo.model_dump())
+            data["photo"] = photo.file_id
+            segments.append(MessageSegment("photo", data))
+        return segments
+
+    def as_payloads() -> list:
+        segments = []
+        for i, photo in enumerate(photos):
+            segments.append(MessageSegment.text(f"hello {i} "))
+            segments.append(MessageSegment.at(10000 + i))
+            segments.append(MessageSegment("photo", MediaData("photo", photo, caption="look")))
+        return segments
+
+    results = {}
+    for name, build in (("dict data", as_dicts), ("typed payloads", as_payloads)):
+        results[name] = traced(build)
+        print(f"{name:<24} {results[name] / 2**20:>9.1f} MiB  {results[name] / count:>8.1f} B/segment")
+    print(f"{'saved':<24} {1 - results['typed payloads'] / results['dict data']:>9.1%}")
+
+    for name, build in (("dict data", as_dicts), ("typed payloads", as_payloads)):
+        message = Message(build())
+        start = time.perf_counter()
+        message.extract_plain_text()
+        report(f"plaintext {name}", len(message), time.perf_counter() - start)
+
+
+@case
+def events() -> None:
+    """每个保留的 GroupMessageEvent 的内存占用：完整事件 / 冻结后"""
+    count = 10000
+    payloads = [sample_update(i) for i in range(count)]
+
+    def live() -> list:
+        events = [model_validate(GroupMessageEvent, payload) for payload in payloads]
+        for event in events:
+            event.get_message()
+        return events
+
+    def frozen() -> list:
+        return [model_validate(GroupMessageEvent, payload).freeze() for payload in payloads]
+
+    results = {}
+    for name, build in (("live event", live), ("frozen event", frozen)):
+        results[name] = traced(build)
+        print(f"{name:<24} {results[name] / count:>9.0f} B/event")
+    print(f"{'saved':<24} {1 - results['frozen event'] / results['live event']:>9.1%}")
+
+    frozen_events = frozen()
+    start = time.perf_counter()
+    for event in frozen_events:
+        event.thaw()
+    report("thaw", count, time.perf_counter() - start)
+
+
+@case
+def command_only() -> None:
+    """telegram_command_only：95% 闲聊时解析前过滤与全部解析的对比"""
+    for name in ("echo", "help", "weather", "roll", "admin"):
+        nonebot.on_command(name)
+    count = 20000
+    payloads = []
+    for i in range(count):
+        payload = sample_update(i)
+        if i % 20:
+            payload["message"]["text"] = "just chatting @bob"
+            payload["message"]["entities"] = [{"type": "mention", "offset": 14, "length": 4}]
+        payloads.append(payload)
+    index = CommandIndex(["/"], ["."])
+
+    start = time.perf_counter()
+    for payload in payloads:
+        model_validate(GroupMessageEvent, payload)
+    report("parse all", count, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    accepted = 0
+    for payload in payloads:
+        if index.accepts(payload["message"], "benchmark_bot"):
+            accepted += 1
+            model_validate(GroupMessageEvent, payload)
+    report("filter then parse", count, time.perf_counter() - start)
+    assert accepted == count // 20
+
+
+@case
+def split() -> None:
+    """长消息拆分：约 40k UTF-16 码元、含 emoji 与 2000 个实体的文本"""
+    paragraph = "Some model output with **markdown** and an emoji 😀 in it. " * 12
+    text = "\n\n".join(paragraph for _ in range(60))
+    entities = [{"type": "bold", "offset": o, "length": 8} for o in range(0, 40000, 20)]
+    count = 200
+    start = time.perf_counter()
+    for _ in range(count):
+        chunks = split_text(text, entities)
+    report(f"split into {len(chunks)}", count, time.perf_counter() - start)
+
+
+@case
+def render() -> None:
+    """发送消息渲染为请求计划的耗时"""
+    users = {"2": {"id": 2, "is_bot": False, "first_name": "Bob", "username": "bob"},
+             "3": {"id": 3, "is_bot": False, "first_name": "Zoë"}}
+    markup = MessageSegment.reply_markup("inline", [[{"text": "ok", "callback_data": "ok"}]])
+    messages = {
+        "text": Message("hello world, this is a reply 😀"),
+        "at+entities": MessageSegment.text("hi") + MessageSegment.at(2) + MessageSegment.at(3)
+        + MessageSegment("bold", {"text": "important"}) + MessageSegment.text(" see https://example.com") + markup,
+        "photo+caption": MessageSegment.photo("AgACAgQAAxkBAAI") + MessageSegment.text("a caption") + markup,
+        "10 mentions": Message([MessageSegment.at(i) for i in range(10)]) + "please review",
+        "album x4": Message([MessageSegment.photo(f"file{i}") for i in range(4)]) + "caption",
+    }
+    count = 20000
+    for name, message in messages.items():
+        start = time.perf_counter()
+        for _ in range(count):
+            render_message(message, users)
+        report(f"render {name}", count, time.perf_counter() - start)
+
+
+@case
+def preprocess() -> None:
+    """发送 photo 前的照片限制检查：满足限制的 5 MB 图片只解析文件头"""
+    padding = b"\0" * (5 * 1024 * 1024)
+    png = b"\x89PNG\r\n\x1a\n\0\0\0\rIHDR" + (1920).to_bytes(4, "big") + (1080).to_bytes(4, "big") + padding
+    # 30 KB 的 EXIF 段之后才是 SOF0
+    jpeg = (b"\xff\xd8\xff\xe1" + (30002).to_bytes(2, "big") + b"\0" * 30000
+            + b"\xff\xc0\0\x11\x08" + (1080).to_bytes(2, "big") + (1920).to_bytes(2, "big") + padding)
+    preprocessor = PhotoPreprocessor()
+    count = 20000
+
+    async def run(ms: MessageSegment) -> None:
+        for _ in range(count):
+            await preprocessor.process(ms)
+
+    for name, data in (("png", png), ("jpeg", jpeg)):
+        ms = MessageSegment.photo(data)
+        start = time.perf_counter()
+        asyncio.run(run(ms))
+        report(f"check {name}", count, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or list(CASES):
+        print(f"== {name}: {CASES[name].__doc__}")
+        CASES[name]()